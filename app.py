@@ -3,6 +3,9 @@ import sys
 import subprocess
 import os
 import time
+import shutil
+import threading
+from collections import deque
 from pathlib import Path
 
 # Force-Link: This ensures the library is in the path even if installed mid-run
@@ -18,10 +21,23 @@ except ImportError:
 
 from news_api import fetch_crime_news
 from blender_generator import generate_blender_script
+from forensic_vision import (
+    get_cache_dir, get_optimized_payload, measure_optimization, build_findings, is_underexposed
+)
+from relevance import score_labels
+from telemetry import TelemetryLedger, GCP_CREDIT_BUDGET, SUMMARY_WINDOW_SECONDS
+from render_quality import assess_render, describe_issues
+from render_dedup import RenderIndex, DEFAULT_MAX_DISTANCE
+from render_worker import get_worker_pool, hidden_window_startupinfo, parse_event
+from render_pool import get_render_plan, host_load
+from render_dispatch import get_render_dispatcher, MAX_ATTEMPTS as RENDER_NODE_ATTEMPTS
+from scene_spec import CONTACT_SHEET_VIEWS, spec_for_case, spec_hash
+from render_jobs import get_render_queue, ACTIVE_STATUSES, QUEUED, RUNNING, DONE, FAILED, CANCELLED
 from dotenv import load_dotenv
 from PIL import Image, ImageDraw, ImageFont
 import io
 import hashlib
+import json
 import random
 
 # Import fpdf2 for PDF generation (with auto-install)
@@ -52,11 +68,14 @@ os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = str(BASE_DIR / 'cloud_key.json')
 # Vision is now available (auto-installed if needed)
 VISION_AVAILABLE = True
 
-# Import PyDrive2 for Google Drive integration
+# Import the Google Drive API client (long-lived, shared session)
 try:
-    from pydrive2.auth import GoogleAuth
-    from pydrive2.drive import GoogleDrive
-    from google.oauth2 import service_account
+    from drive_client import get_drive_session, FolderCache, resolve_folder
+    from upload_engine import upload_artifacts
+    from case_artifacts import build_case_artifacts
+    from archive_queue import get_archive_queue
+    from drive_sync import SyncManifest, MANIFEST_FILENAME, sync_artifacts, reconcile_local
+    from bulk_archive import bulk_archive
     DRIVE_AVAILABLE = True
 except ImportError:
     DRIVE_AVAILABLE = False
@@ -65,6 +84,54 @@ except ImportError:
 EVIDENCE_RENDERS_DIR = BASE_DIR / "evidence_renders"
 EVIDENCE_RENDERS_DIR.mkdir(exist_ok=True)
 
+# Optimized Vision payload cache (downscaled/re-encoded renders)
+VISION_CACHE_DIR = get_cache_dir(EVIDENCE_RENDERS_DIR)
+
+# Persistent API latency/cost ledger (Vision, Drive, News)
+TELEMETRY = TelemetryLedger(BASE_DIR / "telemetry_ledger.sqlite3")
+
+# Perceptual-hash index of renders (reuse findings/archive refs for near-identical scenes)
+RENDER_INDEX = RenderIndex(EVIDENCE_RENDERS_DIR)
+DEDUP_DIR = EVIDENCE_RENDERS_DIR / ".dedup"
+DEDUP_DIR.mkdir(exist_ok=True)
+
+# Persisted Drive state (folder-ID cache)
+DRIVE_STATE_DIR = BASE_DIR / ".drive_state"
+DRIVE_STATE_DIR.mkdir(exist_ok=True)
+DRIVE_ARCHIVE_FOLDER = 'Forensic_Archive'
+
+# Durable background archive queue (jobs survive restarts)
+ARCHIVE_QUEUE_DB = DRIVE_STATE_DIR / "archive_queue.sqlite3"
+
+# Background render jobs: seconds between status polls while a render is queued or running
+RENDER_POLL_SECONDS = 1.0
+RENDER_TIMEOUT_SECONDS = 60
+
+# Blender output lines kept in a finished job's result (the full output is in the job's log ring buffer)
+RENDER_STDOUT_TAIL = 20
+
+# Progressive renders: quick preview at this percentage of the final resolution, shown until the full frame lands
+RENDER_PREVIEW_PERCENTAGE = 25
+
+# Per-job render images; removed after a day
+RENDER_JOBS_DIR = EVIDENCE_RENDERS_DIR / "jobs"
+RENDER_JOBS_DIR.mkdir(exist_ok=True)
+RENDER_OUTPUT_MAX_AGE = 24 * 3600
+
+# Finished renders keyed by scene-spec hash (shared by all cases and sessions)
+RENDER_CACHE_DIR = EVIDENCE_RENDERS_DIR / "spec_cache"
+RENDER_CACHE_DIR.mkdir(exist_ok=True)
+RENDER_CACHE_MAX_FILES = 200
+
+# Remote render nodes (render_node.py): images come back into this content-addressed store
+RENDER_NODE_ARTIFACTS_DIR = EVIDENCE_RENDERS_DIR / "node_artifacts"
+
+# Scene code version folded into the cache key, so edits to the scene script expire cached renders
+RENDER_SCRIPT_DIGEST = hashlib.sha256(
+    b''.join((BASE_DIR / name).read_bytes() for name in ("reconstruct_scene.py", "scene_spec.py")
+             if (BASE_DIR / name).exists())
+).hexdigest()[:16]
+
 # Ensure Forensic_Archive folder exists for local archiving
 FORENSIC_ARCHIVE_DIR = BASE_DIR / "Forensic_Archive"
 FORENSIC_ARCHIVE_DIR.mkdir(exist_ok=True)
@@ -82,9 +149,6 @@ if 'active_case' not in st.session_state:
     st.session_state['active_case'] = False
 
 # Initialize session state for System Health tracking
-if 'gcp_credits' not in st.session_state:
-    st.session_state['gcp_credits'] = 300.0  # Start with $300
-    
 if 'process_states' not in st.session_state:
     st.session_state['process_states'] = {
         'scraper': True,      # Always on
@@ -616,10 +680,38 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Helper functions
-def run_forensic_scan(image_path):
+def detect_labels(client, content):
+    """
+    Run Vision Label Detection on raw image bytes.
+    Returns a list of labels with descriptions and confidence scores (raises on API error).
+    """
+    image = vision.Image(content=content)
+    with TELEMETRY.track('vision', 'label_detection', payload_bytes=len(content)) as call:
+        response = client.label_detection(image=image)
+        call['result_bytes'] = vision.AnnotateImageResponse.pb(response).ByteSize()
+    
+    # Check for errors
+    if response.error.message:
+        raise Exception(response.error.message)
+    
+    # Extract label data
+    return [
+        {
+            'description': label.description,
+            'score': label.score,
+            'mid': label.mid
+        }
+        for label in response.label_annotations
+    ]
+
+def run_forensic_scan(image_path, measure=False):
     """
-    Run Google Vision API Label Detection on the forensic render image.
-    Returns a list of labels with descriptions and confidence scores.
+    Run Google Vision API on the forensic render image in a single annotate call:
+    label detection, image properties (dominant colors/brightness) and object localization.
+    The render is downscaled/re-encoded (and cached) before upload to cut upload time.
+    With measure=True, the original and candidate sizes are also scanned and an
+    optimization report (bytes saved, label agreement) is stored in session state.
+    Returns a structured findings dict (labels, dominant_colors, brightness, objects, underexposed).
     """
     if not VISION_AVAILABLE:
         return None, "Google Cloud Vision API is not available. Please install google-cloud-vision."
@@ -628,189 +720,801 @@ def run_forensic_scan(image_path):
         # Initialize the Vision API client
         client = vision.ImageAnnotatorClient()
         
-        # Read the image file
-        with open(image_path, 'rb') as image_file:
-            content = image_file.read()
-        
-        # Create an image object
-        image = vision.Image(content=content)
-        
-        # Perform label detection
-        response = client.label_detection(image=image)
-        labels = response.label_annotations
-        
-        # Extract label data
-        results = []
-        for label in labels:
-            results.append({
-                'description': label.description,
-                'score': label.score,
-                'mid': label.mid
+        # Measurement mode: compare original vs optimized uploads and recalibrate target size
+        if measure:
+            report = measure_optimization(
+                image_path,
+                lambda content: detect_labels(client, content),
+                VISION_CACHE_DIR
+            )
+            st.session_state['vision_optimization_report'] = report
+        
+        # Get the optimized upload payload (cached per render content)
+        content, payload_info = get_optimized_payload(image_path, VISION_CACHE_DIR)
+        st.session_state['vision_payload_info'] = payload_info
+        
+        # One request, three features
+        with TELEMETRY.track('vision', 'annotate', payload_bytes=len(content)) as call:
+            # A real request is a miss; reused findings are recorded as hits by the caller
+            call['cache_hit'] = False
+            response = client.annotate_image({
+                'image': vision.Image(content=content),
+                'features': [
+                    {'type_': vision.Feature.Type.LABEL_DETECTION, 'max_results': 20},
+                    {'type_': vision.Feature.Type.IMAGE_PROPERTIES},
+                    {'type_': vision.Feature.Type.OBJECT_LOCALIZATION, 'max_results': 10},
+                ]
             })
+            call['result_bytes'] = vision.AnnotateImageResponse.pb(response).ByteSize()
         
         # Check for errors
         if response.error.message:
             return None, f"Error: {response.error.message}"
         
-        return results, None
+        return build_findings(response), None
         
     except Exception as e:
         return None, f"Error running forensic scan: {str(e)}"
 
-def get_or_create_folder(drive, folder_name):
+def get_render_assessment(image_path):
+    """
+    Run the local quality pre-check on a render, cached in session state per file version
+    so reruns do not re-read the image.
+    """
+    stat = os.stat(image_path)
+    cache_key = (str(image_path), stat.st_mtime_ns, stat.st_size)
+    cached = st.session_state.get('render_assessment')
+    if cached and cached.get('key') == cache_key:
+        return cached['assessment']
+    assessment = assess_render(str(image_path))
+    st.session_state['render_assessment'] = {'key': cache_key, 'assessment': assessment}
+    return assessment
+
+def find_reusable_render(action, image_path, attachment):
     """
-    Find or create a folder in Google Drive.
-    Returns the folder ID.
+    Look up an earlier render within the configured pHash distance that already has
+    the given attachment ('findings' or 'archive') and log the decision to the audit trail.
+    Returns (fingerprint, matched entry or None). Dedup errors never block the caller.
     """
     try:
-        # Search for existing folder
-        file_list = drive.ListFile({
-            'q': f"title='{folder_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
-        }).GetList()
-        
-        if file_list:
-            # Folder exists, return its ID
-            return file_list[0]['id']
-        else:
-            # Create new folder
-            folder = drive.CreateFile({
-                'title': folder_name,
-                'mimeType': 'application/vnd.google-apps.folder'
-            })
-            folder.Upload()
-            return folder['id']
-    except Exception as e:
-        raise Exception(f"Error getting/creating folder: {str(e)}")
+        max_distance = st.session_state.get('dedup_max_distance', DEFAULT_MAX_DISTANCE)
+        render_print, matched_sha, distance = RENDER_INDEX.find_match(image_path, max_distance, require=attachment)
+        RENDER_INDEX.audit(action, render_print, matched_sha, distance, 'reuse' if matched_sha else 'new', max_distance)
+        if not matched_sha:
+            return render_print, None
+        entry = dict(RENDER_INDEX.get(matched_sha), sha256=matched_sha, distance=distance)
+        return render_print, entry
+    except Exception:
+        return None, None
 
-def archive_case_to_cloud(render_image_path, case_id, headline, forensic_labels=None):
+def get_pdf_render_image(render_image_path):
     """
-    Archive case files to Google Drive Forensic_Archive folder.
-    Uploads latest_render.png and forensic_findings.txt.
-    Returns dict with file IDs and links.
+    Return a PDF-ready JPEG of the render, reusing the one prepared for a perceptually
+    identical earlier render (fpdf embeds JPEG as-is instead of re-compressing PNG data).
+    Falls back to the original render path.
     """
-    if not DRIVE_AVAILABLE:
-        return None, "PyDrive2 is not available. Please install pydrive2."
-    
     try:
-        # Initialize Google Drive with Service Account
-        gauth = GoogleAuth()
-        gauth.auth_method = 'service'
-        
-        # Load service account credentials from cloud_key.json
-        credentials_path = BASE_DIR / 'cloud_key.json'
-        credentials = service_account.Credentials.from_service_account_file(
-            str(credentials_path),
-            scopes=['https://www.googleapis.com/auth/drive']
+        render_print, matched_sha, _ = RENDER_INDEX.find_match(
+            render_image_path,
+            st.session_state.get('dedup_max_distance', DEFAULT_MAX_DISTANCE),
+            require='pdf_image'
         )
-        
-        # Set credentials
-        gauth.credentials = credentials
-        drive = GoogleDrive(gauth)
-        
-        # Get or create Forensic_Archive folder
-        folder_id = get_or_create_folder(drive, 'Forensic_Archive')
-        
-        results = {}
-        
-        # Upload render image
-        if render_image_path.exists():
-            render_file = drive.CreateFile({
-                'title': f"{case_id}_render.png",
-                'parents': [{'id': folder_id}],
-                'properties': {'Case ID': case_id, 'Headline': headline[:100]}
-            })
-            render_file.SetContentFile(str(render_image_path))
-            render_file.Upload()
-            results['render'] = {
-                'id': render_file['id'],
-                'link': f"https://drive.google.com/file/d/{render_file['id']}/view"
-            }
-        
-        # Upload forensic findings text file
-        findings_text = f"Case ID: {case_id}\n"
-        findings_text += f"Headline: {headline}\n"
-        findings_text += f"Archived: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-        findings_text += "=" * 50 + "\n"
-        findings_text += "AI FORENSIC FINDINGS\n"
-        findings_text += "=" * 50 + "\n\n"
-        
-        if forensic_labels:
-            findings_text += "Label Detections:\n"
-            findings_text += "-" * 50 + "\n"
-            for label in forensic_labels[:10]:
-                description = label.get('description', 'Unknown')
-                score = label.get('score', 0)
-                relevance_score, category = get_relevance_score(description)
-                confidence_pct = int(score * 100)
-                findings_text += f"\n• {description}\n"
-                findings_text += f"  Confidence: {confidence_pct}%\n"
-                findings_text += f"  Relevance: {relevance_score}/100 ({category})\n"
-            
-            # Check for darkness warning
-            has_darkness = any(
-                'dark' in label.get('description', '').lower() or 
-                'black' in label.get('description', '').lower()
-                for label in forensic_labels
-            )
-            if has_darkness:
-                findings_text += "\n⚠️ WARNING: Scene underexposed. Checking 3D lighting...\n"
+        if matched_sha:
+            cached_path = RENDER_INDEX.get(matched_sha)['pdf_image']
+            if os.path.exists(cached_path):
+                return cached_path
+        
+        pdf_image_path = DEDUP_DIR / f"{render_print['sha256'][:32]}.jpg"
+        with Image.open(render_image_path) as img:
+            img.convert('RGB').save(pdf_image_path, format='JPEG', quality=90)
+        RENDER_INDEX.attach(render_print['sha256'], 'pdf_image', str(pdf_image_path))
+        return str(pdf_image_path)
+    except Exception:
+        return str(render_image_path)
+
+def resolve_blender_executable(blender_exe_raw):
+    """
+    Normalize the Blender path from the sidebar: os.path.normpath for Windows
+    compatibility, and on Windows append blender.exe / .exe when missing.
+    """
+    # Path sanitization: Wrap blender_path with os.path.normpath() for Windows compatibility
+    blender_exe = os.path.normpath(blender_exe_raw)
+    
+    # Ensure .exe extension on Windows if not present
+    if os.name == 'nt' and not blender_exe.endswith('.exe') and not blender_exe.endswith('.bat'):
+        # Check if it's a directory path and append blender.exe
+        if os.path.isdir(blender_exe):
+            blender_exe = os.path.join(blender_exe, 'blender.exe')
+        elif os.path.exists(blender_exe + '.exe'):
+            # Path exists if we add .exe
+            blender_exe = blender_exe + '.exe'
+        blender_exe = os.path.normpath(blender_exe)
+    return blender_exe
+
+def get_render_worker_pool(blender_exe):
+    """
+    Process-wide pool of persistent Blender workers for this executable, one per concurrent
+    render slot of the host's render plan (each worker starts on its first render).
+    """
+    return get_worker_pool(blender_exe, BASE_DIR / "reconstruct_scene.py", size=get_render_plan()['workers'],
+                           cwd=str(BASE_DIR))
+
+def render_with_worker(blender_exe, cmd_list, light_boost=1.0, output_path=None, spec=None, cancel_event=None,
+                       preview_percentage=0, views=None, on_line=None):
+    """
+    Render on an idle worker of the persistent Blender worker pool.
+    Returns a CompletedProcess-shaped result (returncode/stdout/stderr) so the
+    render job runner treats warm and cold renders the same way.
+    Cancelling a running render kills the worker; the next job starts a fresh one.
+    on_line receives the worker's output lines while the render runs.
+    """
+    job = {'light_boost': light_boost, 'threads': get_render_plan()['threads']}
+    if output_path:
+        job['output'] = str(output_path)
+    if spec:
+        job['spec'] = spec
+    if preview_percentage:
+        job['preview'] = preview_percentage
+    if views:
+        job['views'] = list(views)
+    with get_render_worker_pool(blender_exe).lease() as worker:
+        reply, error = worker.render(job, timeout=RENDER_TIMEOUT_SECONDS, cancel_event=cancel_event, on_line=on_line)
+        stdout_lines = list(worker.log)[-RENDER_STDOUT_TAIL:]
+    if reply:
+        timings = ', '.join(f"{phase} {seconds:.2f}s" for phase, seconds in reply.get('timings', {}).items())
+        stdout_lines.append(f"Worker render: {timings} | memory {reply.get('memory_mb') or 0:.0f} MB")
+    return subprocess.CompletedProcess(
+        cmd_list,
+        0 if error is None else 1,
+        stdout='\n'.join(stdout_lines),
+        stderr=error or ''
+    )
+
+def get_render_node_dispatcher():
+    """
+    Process-wide dispatcher for remote render nodes (shared by every session; the node list is
+    edited in the sidebar and starts from the RENDER_NODES environment variable).
+    """
+    return get_render_dispatcher('nodes', RENDER_NODE_ARTIFACTS_DIR,
+                                 parse_render_node_urls(os.environ.get('RENDER_NODES', '')))
+
+def parse_render_node_urls(text):
+    """Render node base URLs from whitespace- or comma-separated text (entries without http:// get it)."""
+    urls = []
+    for entry in text.replace(',', ' ').split():
+        urls.append(entry if entry.startswith(('http://', 'https://')) else f"http://{entry}")
+    return urls
+
+def apply_render_node_list():
+    """Sidebar callback: register the render nodes typed into the text area (for every session)."""
+    get_render_node_dispatcher().set_nodes(parse_render_node_urls(st.session_state.get('render_nodes', '')))
+
+def copy_node_artifact(source_path, target_path):
+    """Copy an image from the node artifact store to a job's own path (atomically, like the spec cache)."""
+    temp_path = Path(f"{target_path}.{os.urandom(4).hex()}.tmp")
+    shutil.copyfile(source_path, temp_path)
+    os.replace(temp_path, target_path)
+
+def wait_for_node_jobs(dispatcher, node_job_ids, cancel_event, on_line=None):
+    """
+    Wait for render node jobs, reporting each assignment (and requeue) to on_line.
+    Raises subprocess.TimeoutExpired if they outlast RENDER_TIMEOUT_SECONDS per attempt.
+    Returns the finished job snapshots.
+    """
+    timeout = RENDER_TIMEOUT_SECONDS * RENDER_NODE_ATTEMPTS * max(len(node_job_ids), 1)
+    deadline = time.time() + timeout
+    reported = {}
+    lines = deque(maxlen=RENDER_STDOUT_TAIL)
+    while True:
+        jobs = dispatcher.wait(node_job_ids, timeout=RENDER_POLL_SECONDS, cancel_event=cancel_event)
+        for job in jobs:
+            state = (job['status'], job['node'], job['attempts'])
+            if reported.get(job['id']) == state:
+                continue
+            reported[job['id']] = state
+            line = f"Node job {job['id']}: {job['status']}" + (f" on {job['node']} (attempt {job['attempts']})" if job['node'] else '')
+            if job['error']:
+                line += f" - {job['error']}"
+            lines.append(line)
+            if on_line is not None:
+                on_line(line)
+        if all(job['status'] not in ACTIVE_STATUSES for job in jobs):
+            return jobs, '\n'.join(lines)
+        if time.time() > deadline:
+            for job_id in node_job_ids:
+                dispatcher.cancel(job_id)
+            raise subprocess.TimeoutExpired('render nodes', timeout, output='\n'.join(lines), stderr='')
+
+def render_with_nodes(dispatcher, job_id, spec, cancel_event, preview_percentage=0, views=None, on_line=None):
+    """
+    Render one scene spec on a remote render node and copy the returned images (final, preview and
+    contact-sheet views) to the job's local paths. On remote nodes the preview arrives with the final image.
+    Returns a CompletedProcess-shaped result like render_with_worker.
+    """
+    node_job_id = dispatcher.submit(spec, {
+        'preview': preview_percentage,
+        'views': list(views or []),
+        'timeout': RENDER_TIMEOUT_SECONDS,
+    }, label=job_id)
+    jobs, stdout = wait_for_node_jobs(dispatcher, [node_job_id], cancel_event, on_line)
+    node_job = jobs[0]
+    targets = {'render': render_output_path(job_id), 'preview': render_preview_path(job_id)}
+    targets.update({f"view_{view}": render_view_path(job_id, view) for view in views or []})
+    for kind, artifact_path in node_job['artifacts'].items():
+        if kind in targets:
+            copy_node_artifact(artifact_path, targets[kind])
+    if node_job['timings']:
+        stdout += "\nNode render: " + ', '.join(f"{phase} {seconds:.2f}s" for phase, seconds in node_job['timings'].items())
+    error = None if node_job['status'] == DONE else node_job['error'] or f"Render {node_job['status']} on render nodes"
+    return subprocess.CompletedProcess(['render nodes'], 0 if error is None else 1, stdout=stdout, stderr=error or '')
+
+def render_output_path(job_id):
+    """Image path owned by one render job, so concurrent renders never overwrite each other."""
+    return RENDER_JOBS_DIR / f"render_{job_id}.png"
+
+def render_preview_path(job_id):
+    """Low-resolution preview written by a progressive render job before its final image."""
+    return RENDER_JOBS_DIR / f"render_{job_id}.preview.png"
+
+def render_view_path(job_id, view):
+    """One camera view of a contact-sheet job (the sheet itself is the job's render_output_path)."""
+    return RENDER_JOBS_DIR / f"render_{job_id}.{view}.png"
+
+def prune_render_outputs(max_age=RENDER_OUTPUT_MAX_AGE):
+    """
+    Delete per-job render images (and previews), scene specs, batch files (and stray temp files)
+    and images downloaded from render nodes older than max_age seconds.
+    """
+    cutoff = time.time() - max_age
+    for directory, pattern in ((RENDER_JOBS_DIR, "render_*.png"), (RENDER_JOBS_DIR, "spec_*.json"),
+                               (RENDER_JOBS_DIR, "batch_*.json"), (RENDER_NODE_ARTIFACTS_DIR, "*.png")):
+        for path in directory.glob(pattern):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+def find_cached_render(spec_key):
+    """Cached render for a scene-spec hash, or None. A hit refreshes its age for pruning."""
+    cache_path = RENDER_CACHE_DIR / f"{spec_key}.png"
+    if not cache_path.exists():
+        return None
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+    return cache_path
+
+def store_cached_render(spec_key, image_path):
+    """Copy a finished render into the spec cache (atomically) and drop the least recently used entries."""
+    cache_path = RENDER_CACHE_DIR / f"{spec_key}.png"
+    temp_path = RENDER_CACHE_DIR / f"{spec_key}.{os.urandom(4).hex()}.tmp"
+    try:
+        shutil.copyfile(image_path, temp_path)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        if temp_path.exists():
+            temp_path.unlink()
+        return None
+
+    cached = sorted(RENDER_CACHE_DIR.glob("*.png"), key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in cached[RENDER_CACHE_MAX_FILES:]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+    return cache_path
+
+def run_blender_process(cmd_list, cancel_event, timeout=RENDER_TIMEOUT_SECONDS, on_line=None):
+    """
+    Cold render: one Blender process per render, killed on cancel or timeout.
+    Output is streamed line by line to on_line while Blender runs (stderr merged into stdout).
+    Returns a CompletedProcess whose stdout holds the last RENDER_STDOUT_TAIL lines;
+    raises subprocess.TimeoutExpired on timeout.
+    """
+    process = subprocess.Popen(
+        cmd_list,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        stdin=subprocess.DEVNULL,
+        text=True,
+        bufsize=1,
+        startupinfo=hidden_window_startupinfo(),
+        env=os.environ.copy(),  # Environment passthrough
+        cwd=os.getcwd()  # Ensure it runs in the local project directory, not system root
+    )
+    tail = deque(maxlen=RENDER_STDOUT_TAIL)
+
+    def pump_output():
+        # Drain the pipe as Blender writes (so it never blocks) and forward each line
+        for line in process.stdout:
+            line = line.rstrip()
+            tail.append(line)
+            if on_line is not None:
+                try:
+                    on_line(line)
+                except Exception:
+                    pass
+
+    reader = threading.Thread(target=pump_output, name='blender-output', daemon=True)
+    reader.start()
+    deadline = time.time() + timeout
+    stderr = ''
+    while True:
+        try:
+            process.wait(timeout=RENDER_POLL_SECONDS / 4)
+            break
+        except subprocess.TimeoutExpired:
+            if cancel_event.is_set():
+                process.kill()
+                process.wait()
+                stderr = "Render cancelled"
+                break
+            if time.time() > deadline:
+                process.kill()
+                process.wait()
+                reader.join(timeout=5)
+                raise subprocess.TimeoutExpired(cmd_list, timeout, output='\n'.join(tail), stderr='')
+    reader.join(timeout=5)
+    return subprocess.CompletedProcess(cmd_list, process.returncode, stdout='\n'.join(tail), stderr=stderr)
+
+def describe_render_line(line):
+    """Human-readable form of a line of Blender output (progress events are formatted, other lines kept)."""
+    event = parse_event(line)
+    if event is None:
+        return line
+    kind = event.get('event')
+    if kind == 'log':
+        prefix = '' if event.get('level', 'info') == 'info' else f"{event['level'].upper()}: "
+        return f"{prefix}{event.get('message', '')}"
+    if kind == 'phase':
+        return f"▶ {event.get('name')}"
+    if kind == 'progress':
+        return f"{event.get('stage')}: {event.get('percent')}%"
+    if kind == 'render_settings':
+        width, height = event.get('resolution', [0, 0])
+        return f"{event.get('stage')}: {event.get('engine')} {width}x{height} @ {event.get('percentage')}% -> {event.get('target')}"
+    if kind == 'output':
+        return f"Saved {event.get('stage')}: {event.get('path')} ({event.get('bytes', 0)} bytes)"
+    if kind == 'error':
+        return f"ERROR ({event.get('stage', 'render')}): {event.get('message', '')}"
+    if kind == 'timings':
+        return "Timings: " + ', '.join(f"{phase} {ms:.0f}ms" for phase, ms in event.get('ms', {}).items())
+    if kind == 'frame':
+        return f"Frame #{event.get('index')}: {'ok' if event.get('ok') else 'failed'} ({event.get('output')})"
+    return line
+
+def render_output_listener(job_id):
+    """
+    Callback for a render job's Blender output: every line goes into the job's log ring buffer,
+    and progress events update the job's live progress (phase, stage, percent, last output, error).
+    """
+    queue = get_render_job_queue()
+
+    def on_line(line):
+        queue.append_log(job_id, line)
+        event = parse_event(line)
+        if event is None:
+            return
+        kind = event.get('event')
+        if kind == 'phase':
+            queue.update_progress(job_id, phase=event.get('name'))
+        elif kind == 'progress':
+            queue.update_progress(job_id, stage=event.get('stage'), percent=event.get('percent'))
+        elif kind == 'output':
+            queue.update_progress(job_id, output=event.get('path'), output_stage=event.get('stage'))
+        elif kind == 'frame':
+            queue.update_progress(job_id, frames_done=event.get('index', 0) + 1)
+        elif kind == 'error':
+            queue.update_progress(job_id, error=event.get('message'))
+
+    return on_line
+
+def run_render_job(job, cancel_event):
+    """
+    Render queue runner (background thread - no Streamlit calls here).
+    Returns (result, error); result holds returncode, stdout, stderr and seconds.
+    """
+    params = job['params']
+    if params.get('batch'):
+        return run_render_batch(job, cancel_event)
+    output_path = render_output_path(job['id'])
+    on_line = render_output_listener(job['id'])
+    # Each render gets its share of the cores, so concurrent renders do not oversubscribe them
+    cmd_list = params['cmd_list'] + ['--output', str(output_path), '--threads', str(get_render_plan()['threads'])]
+    if params.get('spec'):
+        # Spec goes in a file: JSON on the command line does not survive Windows quoting
+        spec_path = RENDER_JOBS_DIR / f"spec_{job['id']}.json"
+        spec_path.write_text(json.dumps(params['spec']), encoding='utf-8')
+        cmd_list += ['--spec', str(spec_path)]
+    preview_percentage = params.get('preview_percentage', 0)
+    if preview_percentage:
+        cmd_list += ['--preview-percentage', str(preview_percentage)]
+    views = params.get('views') or []
+    if views:
+        # Contact sheet: every view rendered from one scene build, tiled into output_path
+        cmd_list += ['--views', ','.join(views)]
+    started = time.perf_counter()
+    try:
+        if params.get('use_nodes') and params.get('spec'):
+            # Remote render nodes: the spec travels over HTTP, the images come back by content hash
+            result = render_with_nodes(get_render_node_dispatcher(), job['id'], params['spec'], cancel_event,
+                                       preview_percentage, views, on_line)
+        elif params.get('use_worker'):
+            # Warm worker: no Blender startup per render
+            result = render_with_worker(params['blender_exe'], cmd_list, params.get('light_boost', 1.0),
+                                        output_path, params.get('spec'), cancel_event, preview_percentage, views,
+                                        on_line)
         else:
-            findings_text += "No forensic scan data available.\n"
-        
-        # Create temporary text file
-        findings_file_path = EVIDENCE_RENDERS_DIR / f"{case_id}_findings.txt"
-        with open(findings_file_path, 'w', encoding='utf-8') as f:
-            f.write(findings_text)
-        
-        # Upload findings file
-        findings_file = drive.CreateFile({
-            'title': f"{case_id}_findings.txt",
-            'parents': [{'id': folder_id}],
-            'properties': {'Case ID': case_id, 'Headline': headline[:100]}
-        })
-        findings_file.SetContentFile(str(findings_file_path))
-        findings_file.Upload()
-        results['findings'] = {
-            'id': findings_file['id'],
-            'link': f"https://drive.google.com/file/d/{findings_file['id']}/view"
+            result = run_blender_process(cmd_list, cancel_event, on_line=on_line)
+    except subprocess.TimeoutExpired as timeout_error:
+        return {
+            'returncode': None,
+            'image_path': None,
+            'stdout': timeout_error.output or '',
+            'stderr': timeout_error.stderr or '',
+            'seconds': time.perf_counter() - started,
+        }, f"Blender process timed out after {RENDER_TIMEOUT_SECONDS} seconds"
+
+    report = {
+        'returncode': result.returncode,
+        'image_path': str(output_path) if output_path.exists() else None,
+        'view_paths': {view: str(render_view_path(job['id'], view)) for view in views
+                       if render_view_path(job['id'], view).exists()},
+        'stdout': result.stdout or '',
+        'stderr': result.stderr or '',
+        'seconds': time.perf_counter() - started,
+    }
+    if result.returncode != 0:
+        return report, f"Blender render failed with return code: {result.returncode}"
+    if report['image_path'] and params.get('spec_hash'):
+        store_cached_render(params['spec_hash'], output_path)
+    return report, None
+
+def run_render_batch(job, cancel_event):
+    """
+    Render several cases' scene specs in one Blender invocation (reconstruct_scene.py --batch,
+    or a 'batch' request to the persistent worker). Each finished frame goes into the spec cache.
+    Returns (result, error); result holds per-frame results, stdout/stderr and seconds.
+    """
+    params = job['params']
+    frames = [
+        {'spec': frame['spec'], 'output': str(RENDER_JOBS_DIR / f"render_{job['id']}_{index:03d}.png")}
+        for index, frame in enumerate(params['batch'])
+    ]
+    timeout = RENDER_TIMEOUT_SECONDS * max(len(frames), 1)
+    started = time.perf_counter()
+    stdout, stderr, summary = '', '', None
+    if params.get('use_nodes'):
+        # One node job per frame, so the frames spread across every render node
+        dispatcher = get_render_node_dispatcher()
+        node_job_ids = [dispatcher.submit(frame['spec'], {'timeout': RENDER_TIMEOUT_SECONDS}, label=f"{job['id']}#{index}")
+                        for index, frame in enumerate(frames)]
+        try:
+            node_jobs, stdout = wait_for_node_jobs(dispatcher, node_job_ids, cancel_event,
+                                                   render_output_listener(job['id']))
+            results = []
+            for index, (frame, node_job) in enumerate(zip(frames, node_jobs)):
+                ok = node_job['status'] == DONE and 'render' in node_job['artifacts']
+                if ok:
+                    copy_node_artifact(node_job['artifacts']['render'], frame['output'])
+                results.append({'index': index, 'output': frame['output'], 'ok': ok,
+                                'error': None if ok else node_job['error'] or f"Render {node_job['status']}",
+                                'timings': node_job['timings'], 'node': node_job['node']})
+            summary = {'frames': results}
+        except subprocess.TimeoutExpired as timeout_error:
+            stdout = timeout_error.output or ''
+            stderr = f"Render nodes timed out after {timeout_error.timeout} seconds"
+    elif params.get('use_worker'):
+        with get_render_worker_pool(params['blender_exe']).lease() as worker:
+            summary, error = worker.render_batch(frames, timeout=timeout, cancel_event=cancel_event,
+                                                 on_line=render_output_listener(job['id']),
+                                                 threads=get_render_plan()['threads'])
+            stdout = '\n'.join(list(worker.log)[-RENDER_STDOUT_TAIL:])
+        stderr = error or ''
+    else:
+        batch_path = RENDER_JOBS_DIR / f"batch_{job['id']}.json"
+        report_path = RENDER_JOBS_DIR / f"batch_{job['id']}_report.json"
+        batch_path.write_text(json.dumps(frames), encoding='utf-8')
+        cmd_list = params['cmd_list'] + ['--batch', str(batch_path), '--report', str(report_path),
+                                         '--threads', str(get_render_plan()['threads'])]
+        try:
+            result = run_blender_process(cmd_list, cancel_event, timeout=timeout,
+                                         on_line=render_output_listener(job['id']))
+            stdout, stderr = result.stdout or '', result.stderr or ''
+        except subprocess.TimeoutExpired as timeout_error:
+            stdout, stderr = timeout_error.output or '', timeout_error.stderr or ''
+        if report_path.exists():
+            summary = json.loads(report_path.read_text(encoding='utf-8'))
+
+    frame_results = (summary or {}).get('frames', [])
+    for frame, frame_result in zip(params['batch'], frame_results):
+        if frame_result.get('ok'):
+            store_cached_render(frame['spec_hash'], frame_result['output'])
+    rendered = sum(1 for frame_result in frame_results if frame_result.get('ok'))
+    report = {
+        'returncode': 0 if rendered == len(frames) else 1,
+        'image_path': None,
+        'frames': frame_results,
+        'render_share': (summary or {}).get('render_share'),
+        'stdout': stdout,
+        'stderr': stderr,
+        'seconds': time.perf_counter() - started,
+    }
+    if rendered < len(frames):
+        return report, f"Batch rendered {rendered}/{len(frames)} frames"
+    return report, None
+
+def prepare_blender_command():
+    """
+    Validate the Forensic Architect script and the Blender path from the sidebar.
+    Returns (blender_exe, cmd_list) with the base Blender command; stops the script with an error on failure.
+    """
+    # Use reconstruct_scene.py for Forensic Architect (using normalized absolute path)
+    script_path = BASE_DIR / "reconstruct_scene.py"
+    
+    if not script_path.exists():
+        st.error(f"❌ Forensic Architect script not found at: {script_path.absolute()}")
+        st.stop()
+    
+    # Launch Blender in background
+    blender_exe_raw = st.session_state.get('blender_path', r'C:\Program Files\Blender Foundation\Blender 5.0\blender.exe')
+    
+    blender_exe = resolve_blender_executable(blender_exe_raw)
+    
+    # HARD-CODE BLENDER VALIDATION: Verify executable exists before queueing
+    if blender_exe != 'blender':  # Allow 'blender' command if in PATH
+        if not os.path.exists(blender_exe):
+            st.error(f"❌ Blender Validation Failed: Executable not found at: {blender_exe}")
+            st.error(f"Please check the Blender path in the sidebar. Current path: {blender_exe_raw}")
+            st.stop()
+    
+    # Create command as list with proper argument separation
+    script_path_str = os.path.normpath(str(script_path.absolute()))
+    # Separate --python and script path into distinct strings
+    cmd_list = [
+        blender_exe,
+        '--background',
+        '--factory-startup',
+        '--python',
+        script_path_str,
+        '--'  # Buffer: stop looking for Blender flags
+    ]
+    return blender_exe, cmd_list
+
+def get_render_job_queue():
+    """
+    Process-wide background render queue with one worker thread per concurrent render in the
+    host's render plan (sized from cores and memory); excess jobs wait in the queue.
+    """
+    return get_render_queue('blender', run_render_job, workers=get_render_plan()['workers'])
+
+def get_render_session_id():
+    """Stable ID for this browser session, used as the owner of its render jobs."""
+    if 'render_session_id' not in st.session_state:
+        st.session_state['render_session_id'] = os.urandom(8).hex()
+    return st.session_state['render_session_id']
+
+def apply_render_result(job):
+    """
+    Apply a finished render job to the session: Live Status Log, render view status,
+    pixel-art fallback on failure and the auto boosted-lighting re-render.
+    """
+    params = job['params']
+    result = job['result'] or {}
+
+    if params.get('batch'):
+        # Batch renders only fill the cache; the render view keeps the current case
+        frame_times = [frame['timings'].get('render', 0.0) for frame in result.get('frames', [])]
+        log_lines = [f"Batch: {len(frame_times)}/{len(params['batch'])} frames in {result.get('seconds', 0):.1f}s"]
+        if frame_times:
+            log_lines.append(f"Per-frame render: {min(frame_times):.2f}-{max(frame_times):.2f}s")
+        if result.get('render_share') is not None:
+            log_lines.append(f"Time spent rendering: {result['render_share'] * 100:.0f}%")
+        st.session_state['blender_stdout'] = log_lines
+        return
+
+    # Store the last output lines for the Live Status Log (whether success or failure)
+    output_lines = get_render_job_queue().log_lines(job['id']) if job.get('id') else []
+    if not output_lines and result.get('stdout'):
+        output_lines = result['stdout'].strip().split('\n')
+    readable_lines = [describe_render_line(line) for line in output_lines if line.strip()]
+    if readable_lines:
+        st.session_state['blender_stdout'] = readable_lines[-3:]
+
+    image_path = Path(result['image_path']) if result.get('image_path') else None
+    if job['status'] == FAILED:
+        # Blender crash/failure: pixel art shows in the render view
+        status = 'Blender Error - Using Pixel Art'
+    elif image_path is not None and image_path.exists():
+        status = 'Complete'
+        # Auto re-render once with boosted lighting if the local check finds a dark frame
+        if st.session_state.get('auto_boost_rerender', False) and params.get('light_boost', 1.0) <= 1.0:
+            assessment = get_render_assessment(image_path)
+            if set(assessment['issues']) & {'black_frame', 'underexposed'}:
+                st.session_state['pending_light_boost'] = assessment['light_boost']
+                st.session_state['rerender_article_idx'] = params['article_idx']
+    else:
+        # Return code 0 but no image written
+        status = 'Failed - Using Pixel Art'
+
+    st.session_state['current_render'] = {
+        'headline': params['headline'],
+        'description': params['description'],
+        'status': status,
+        'article_idx': params['article_idx'],
+        'case_id': params.get('case_id'),
+        'image_path': str(image_path) if status == 'Complete' else None,
+        'view_paths': result.get('view_paths') if status == 'Complete' else None
+    }
+
+def case_id_for_article(article):
+    """
+    Stable case ID derived from the article itself (its URL, else its title), so re-fetching
+    the news never maps a different article onto an already archived case.
+    """
+    key = article.get('url') or article.get('title') or ''
+    return f"CASE-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:10].upper()}"
+
+def get_render_case_id(render_info):
+    """Case ID of a render (set when it was queued; falls back to the headline's ID)."""
+    return render_info.get('case_id') or case_id_for_article({'title': render_info.get('headline', '')})
+
+def get_render_article(render_info):
+    """
+    The fetched article a render was made for, matched by case ID (a re-fetch may have moved it),
+    or a stand-in built from the render's headline and description.
+    """
+    case_id = get_render_case_id(render_info)
+    for article in st.session_state.get('articles') or []:
+        if case_id_for_article(article) == case_id:
+            return article
+    return {'title': render_info.get('headline', ''), 'description': render_info.get('description', '')}
+
+def get_session_render_path():
+    """This session's current render image, or None if it has none on disk."""
+    render_info = st.session_state.get('current_render') or {}
+    if not render_info.get('image_path'):
+        return None
+    image_path = Path(render_info['image_path'])
+    return image_path if image_path.exists() else None
+
+def get_session_preview_path():
+    """Preview image of this session's render in progress, or None (no preview yet or progressive mode off)."""
+    render_info = st.session_state.get('current_render') or {}
+    if not render_info.get('preview_path') or render_info.get('image_path'):
+        return None
+    preview_path = Path(render_info['preview_path'])
+    return preview_path if preview_path.exists() else None
+
+def poll_render_jobs():
+    """
+    Apply this session's render jobs that finished since the last rerun and set the
+    BLENDER LED while any are queued or running. Returns the session's jobs, newest first.
+    """
+    jobs = get_render_job_queue().jobs_for(get_render_session_id())
+    applied = st.session_state.setdefault('applied_render_jobs', set())
+    # Oldest first, so the newest finished render ends up in the render view
+    for job in reversed(jobs):
+        if job['status'] in (DONE, FAILED) and job['id'] not in applied:
+            applied.add(job['id'])
+            apply_render_result(job)
+
+    process_states = st.session_state.get('process_states', {'scraper': True, 'vision_ai': False, 'blender': False})
+    process_states['blender'] = any(job['status'] in ACTIVE_STATUSES for job in jobs)
+    st.session_state['process_states'] = process_states
+    return jobs
+
+def get_archive_drive():
+    """
+    Return the shared Drive session and persisted folder-ID cache.
+    The session is created once per process, so repeat archives skip authentication.
+    """
+    session = get_drive_session(BASE_DIR / 'cloud_key.json')
+    folder_cache = FolderCache(DRIVE_STATE_DIR / "folders.json")
+    return session, folder_cache
+
+def upload_archive_job(job, artifacts):
+    """
+    Archive queue handler: upload a job's pending artifacts to the Forensic_Archive folder
+    concurrently, straight from memory (resumable chunked uploads for large artifacts).
+    Returns (results, errors) keyed by artifact.
+    """
+    # Shared Drive session (authenticated once per process) and cached folder ID
+    session, folder_cache = get_archive_drive()
+    
+    # Resolve the Forensic_Archive folder (persisted cache - no lookup on repeat archives)
+    with TELEMETRY.track('drive', 'folder_lookup') as call:
+        _, call['cache_hit'] = resolve_folder(session, DRIVE_ARCHIVE_FOLDER, folder_cache)
+    
+    if job['meta'].get('incremental'):
+        # Content-hash sync: skip unchanged artifacts, update changed ones in place
+        report = sync_artifacts(
+            session, DRIVE_ARCHIVE_FOLDER, folder_cache, get_sync_manifest(), artifacts, telemetry=TELEMETRY
+        )
+    else:
+        report = upload_artifacts(
+            session, DRIVE_ARCHIVE_FOLDER, folder_cache, artifacts, telemetry=TELEMETRY
+        )
+    results = {
+        key: {
+            'id': result['id'],
+            'link': result['link'],
+            'bytes': result['bytes'],
+            'seconds': round(result['seconds'], 3),
+            'chunk_retries': result['chunk_retries'],
+            'action': report.get('actions', {}).get(key, 'create')
         }
-        
-        # Clean up temporary file
-        if findings_file_path.exists():
-            findings_file_path.unlink()
-        
-        return results, None
-        
-    except Exception as e:
-        return None, f"Error archiving to cloud: {str(e)}"
+        for key, result in report['results'].items()
+    }
+    reused_render = job['meta'].get('reused_render')
+    if reused_render:
+        # Same render archived for an earlier case: link its Drive file instead of uploading a copy
+        results['render'] = {
+            'id': reused_render['id'],
+            'link': reused_render['link'],
+            'bytes': reused_render.get('bytes', 0),
+            'seconds': 0.0,
+            'chunk_retries': 0,
+            'action': 'reuse'
+        }
+    return results, report['errors']
+
+def record_archive_done(job, results):
+    """Attach the Drive references of a finished archive job to its render in the dedup index."""
+    render_sha = job['meta'].get('render_sha256')
+    if render_sha:
+        RENDER_INDEX.attach(render_sha, 'archive', results)
+
+def get_sync_manifest():
+    """Local manifest of artifact content hashes uploaded to Drive."""
+    return SyncManifest(DRIVE_STATE_DIR / MANIFEST_FILENAME)
 
-def get_relevance_score(label_description):
+def get_case_archive_queue():
+    """Process-wide durable archive queue (background workers shared by every session)."""
+    return get_archive_queue(ARCHIVE_QUEUE_DB, upload_archive_job, on_done=record_archive_done)
+
+def archive_case_to_cloud(render_image_path, case_id, headline, forensic_labels=None, forensic_findings=None,
+                          pdf_bytes=None, render_sha=None, incremental=False, reused_render=None):
     """
-    Map Vision API labels to relevance scores for forensic cases.
-    Returns a relevance score (0-100) and category.
+    Queue case files for archiving to the Google Drive Forensic_Archive folder.
+    The render, findings report (text + JSON) and case PDF are built in memory and
+    persisted with the job; background workers upload them and retry on failure.
+    With incremental=True, artifacts are stamped with the render time and synced by
+    content hash (unchanged files are skipped, changed ones updated in place).
+    reused_render is the Drive result of a perceptually identical render archived earlier:
+    the render is not uploaded again and the case's render entry points at that file.
+    Returns (job_id, error).
     """
-    label_lower = label_description.lower()
-    
-    # High relevance categories
-    if any(term in label_lower for term in ['technology', 'computer', 'electronics', 'device', 'phone', 'laptop']):
-        return 85, "Technology Evidence"
-    if any(term in label_lower for term in ['room', 'interior', 'building', 'architecture', 'structure']):
-        return 75, "Scene Analysis"
-    if any(term in label_lower for term in ['light', 'illumination', 'bright', 'dark', 'shadow']):
-        return 70, "Lighting Analysis"
-    if any(term in label_lower for term in ['floor', 'wall', 'ceiling', 'surface']):
-        return 65, "Surface Analysis"
-    if any(term in label_lower for term in ['sphere', 'circle', 'object', 'marker']):
-        return 80, "Evidence Marker"
-    
-    # Medium relevance
-    if any(term in label_lower for term in ['furniture', 'table', 'chair', 'desk']):
-        return 60, "Furniture"
-    if any(term in label_lower for term in ['color', 'gray', 'grey', 'blue', 'red']):
-        return 50, "Color Analysis"
-    
-    # Default medium relevance
-    return 40, "General Detection"
+    if not DRIVE_AVAILABLE:
+        return None, "Google Drive API client is not available. Please install google-api-python-client."
+    
+    try:
+        # Build every artifact in memory - no temporary files
+        render_bytes = None
+        if render_image_path.exists() and not reused_render:
+            render_bytes = render_image_path.read_bytes()
+        archived_at = None
+        if incremental and render_image_path.exists():
+            archived_at = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(render_image_path.stat().st_mtime))
+        artifacts = build_case_artifacts(
+            case_id, headline,
+            render_bytes=render_bytes,
+            forensic_labels=forensic_labels,
+            forensic_findings=forensic_findings,
+            pdf_bytes=pdf_bytes,
+            archived_at=archived_at
+        )
+        job_id = get_case_archive_queue().enqueue(
+            case_id, artifacts,
+            meta={'headline': headline, 'render_sha256': render_sha, 'incremental': incremental,
+                  'reused_render': reused_render}
+        )
+        return job_id, None
+        
+    except Exception as e:
+        return None, f"Error queuing cloud archive: {str(e)}"
 
 class NoirPDF(FPDF):
     """Custom PDF class with Noir/Retro 1980s police report styling"""
@@ -880,7 +1584,8 @@ class NoirPDF(FPDF):
         self.multi_cell(0, 5, text)
         self.ln(2)
 
-def generate_case_pdf(case_id, article, pixel_art_bytes=None, render_image_path=None, forensic_labels=None):
+def generate_case_pdf(case_id, article, pixel_art_bytes=None, render_image_path=None, forensic_labels=None, forensic_findings=None,
+                      report_time=None):
     """
     Generate a Noir/Retro style PDF case file.
     
@@ -890,6 +1595,9 @@ def generate_case_pdf(case_id, article, pixel_art_bytes=None, render_image_path=
         pixel_art_bytes: BytesIO object containing the pixel art image
         render_image_path: Path to the 3D render image (if exists)
         forensic_labels: List of AI Vision labels with scores
+        forensic_findings: Structured findings dict from run_forensic_scan (brightness, objects)
+        report_time: Report timestamp (epoch seconds, e.g. the render time); defaults to now.
+            A fixed time makes the PDF byte-identical for unchanged evidence, so incremental sync skips it
     
     Returns:
         BytesIO object containing the PDF bytes
@@ -907,9 +1615,11 @@ def generate_case_pdf(case_id, article, pixel_art_bytes=None, render_image_path=
         pdf.cell(0, 10, f'CASE ID: {case_id}', 0, 1, 'C')
         pdf.ln(5)
         
-        # Date stamp
-        from datetime import datetime
-        current_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Date stamp (also the PDF creation date, which fpdf2 would otherwise set to now)
+        from datetime import datetime, timezone
+        report_time = time.time() if report_time is None else report_time
+        current_date = datetime.fromtimestamp(report_time).strftime("%Y-%m-%d %H:%M:%S")
+        pdf.set_creation_date(datetime.fromtimestamp(report_time, timezone.utc))
         pdf.set_font('Courier', '', 9)
         pdf.set_text_color(100, 100, 100)
         pdf.cell(0, 5, f'Report Generated: {current_date}', 0, 1, 'C')
@@ -1019,12 +1729,7 @@ def generate_case_pdf(case_id, article, pixel_art_bytes=None, render_image_path=
             pdf.ln(2)
             
             # Check for darkness warning
-            has_darkness = any(
-                'dark' in label.get('description', '').lower() or 
-                'black' in label.get('description', '').lower()
-                for label in forensic_labels
-            )
-            if has_darkness:
+            if is_underexposed(forensic_findings):
                 pdf.set_font('Courier', 'B', 9)
                 pdf.set_text_color(200, 100, 0)
                 pdf.cell(0, 5, '⚠️ WARNING: Scene underexposed. Checking 3D lighting...', 0, 1)
@@ -1032,11 +1737,12 @@ def generate_case_pdf(case_id, article, pixel_art_bytes=None, render_image_path=
                 pdf.ln(2)
             
             # Display top 15 labels
-            for i, label in enumerate(forensic_labels[:15], 1):
+            top_labels = forensic_labels[:15]
+            relevance_scores = score_labels(top_labels)
+            for i, (label, (relevance_score, category)) in enumerate(zip(top_labels, relevance_scores), 1):
                 description = label.get('description', 'Unknown')
                 score = label.get('score', 0)
                 confidence_pct = int(score * 100)
-                relevance_score, category = get_relevance_score(description)
                 
                 pdf.set_font('Courier', 'B', 9)
                 pdf.cell(0, 5, f'{i}. {description}', 0, 1)
@@ -1045,6 +1751,21 @@ def generate_case_pdf(case_id, article, pixel_art_bytes=None, render_image_path=
                 pdf.cell(0, 4, f'   Confidence: {confidence_pct}% | Relevance: {relevance_score}/100 ({category})', 0, 1)
                 pdf.set_text_color(0, 0, 0)
                 pdf.ln(1)
+            
+            # Localized objects and exposure data
+            if forensic_findings and forensic_findings.get('objects'):
+                pdf.ln(2)
+                pdf.set_font('Courier', 'B', 10)
+                pdf.cell(0, 5, 'Localized Objects:', 0, 1)
+                pdf.set_font('Courier', '', 8)
+                for obj in forensic_findings['objects']:
+                    box = obj['box'] or []
+                    box_text = ', '.join(f'{v:.2f}' for v in box)
+                    pdf.cell(0, 4, pdf.sanitize_text(f"   {obj['name']} ({int(obj['score'] * 100)}%) box=[{box_text}]"), 0, 1)
+            if forensic_findings and forensic_findings.get('brightness') is not None:
+                pdf.ln(2)
+                pdf.set_font('Courier', '', 8)
+                pdf.cell(0, 4, f"Scene Brightness: {int(forensic_findings['brightness'] * 100)}%", 0, 1)
         else:
             pdf.set_font('Courier', '', 9)
             pdf.set_text_color(150, 150, 150)
@@ -1070,6 +1791,49 @@ def generate_case_pdf(case_id, article, pixel_art_bytes=None, render_image_path=
     except Exception as e:
         return None, f"Error generating PDF: {str(e)}"
 
+def build_case_pdf(render_info):
+    """
+    Case PDF for this session's current render: its article, pixel art, the render and the
+    session's forensic findings, dated with the render time. Returns (pdf_bytes, case_id, error).
+    """
+    article = get_render_article(render_info)
+    # Stable case ID and the render time as the report date: the same evidence gives the same PDF
+    case_id = get_render_case_id(render_info)
+    
+    # Generate pixel art for PDF
+    article_text = f"{article.get('title', '')} {article.get('description', '')}"
+    category = st.session_state.get('crime_category', 'Domestic')
+    pixel_art_bytes = generate_procedural_pixel_art(article_text, case_id, category=category)
+    
+    # Check for 3D render
+    render_image_path = get_session_render_path()
+    render_path_str = get_pdf_render_image(render_image_path) if render_image_path else None
+    
+    pdf_bytes, pdf_error = generate_case_pdf(
+        case_id=case_id,
+        article=article,
+        pixel_art_bytes=pixel_art_bytes,
+        render_image_path=render_path_str,
+        forensic_labels=st.session_state.get('forensic_scan_labels', None),
+        forensic_findings=st.session_state.get('forensic_findings', None),
+        report_time=render_image_path.stat().st_mtime if render_image_path else None
+    )
+    return pdf_bytes, case_id, pdf_error
+
+def get_case_pdf_for_archive(render_info):
+    """
+    PDF bytes to archive with the current render: the exported PDF if it was built for this
+    case and this render, otherwise a fresh one. None if the PDF cannot be generated.
+    """
+    latest_pdf = st.session_state.get('latest_case_pdf')
+    render_image_path = get_session_render_path()
+    if (latest_pdf and latest_pdf.get('case_id') == get_render_case_id(render_info)
+            and latest_pdf.get('article_idx') == render_info.get('article_idx')
+            and latest_pdf.get('render_path') == (str(render_image_path) if render_image_path else None)):
+        return latest_pdf['bytes']
+    pdf_bytes, _, pdf_error = build_case_pdf(render_info)
+    return pdf_bytes.getvalue() if pdf_bytes and not pdf_error else None
+
 def generate_procedural_pixel_art(article_text, case_id="", category="Domestic"):
     """
     Generate unique procedural pixel art using a Layered Composition approach.
@@ -1082,10 +1846,9 @@ def generate_procedural_pixel_art(article_text, case_id="", category="Domestic")
         category: Crime department category ('International', 'Domestic', or 'White Collar')
     """
     # Seed Logic: Use case_id as seed to ensure consistency - same case looks same across runs
-    if case_id:
-        seed = hash(case_id) % (2**32)
-    else:
-        seed = hash(article_text) % (2**32)
+    # (a digest, not hash(): string hashes are randomized per process)
+    seed_text = case_id or article_text
+    seed = int(hashlib.sha1(seed_text.encode('utf-8')).hexdigest()[:8], 16)
     random.seed(seed)
     
     # SIZE & CLARITY: Internal drawing canvas is 256x256 (scaled to 512x512) for sharp pixel DNA
@@ -1783,6 +2546,10 @@ else:
     st.title("🔍 Digital Detective - Evidence Room Generator")
     st.markdown("<p style='color: #00D4FF; margin-bottom: 2rem;'>3D Evidence Room Generator & Analysis System</p>", unsafe_allow_html=True)
 
+# Background renders: pick up finished jobs before the sidebar draws the BLENDER LED
+session_render_jobs = poll_render_jobs()
+render_jobs_active = any(job['status'] in ACTIVE_STATUSES for job in session_render_jobs)
+
 # Sidebar for API key configuration (shown only when active_case is True)
 if active_case:
     with st.sidebar:
@@ -1818,6 +2585,69 @@ if active_case:
         help="Path to Blender executable (e.g., 'blender' if in PATH, or full path like 'C:/Program Files/Blender Foundation/Blender 5.0/blender.exe')"
     )
     st.session_state['blender_path'] = blender_path
+    st.checkbox(
+        "♨️ Persistent Blender worker",
+        value=True,
+        key="persistent_blender_worker",
+        help="Keep headless Blender workers running and send renders to them over a local socket, instead of starting Blender for every render."
+    )
+    if st.session_state.get('persistent_blender_worker', True):
+        worker_status = get_render_worker_pool(resolve_blender_executable(blender_path)).status()
+        if worker_status['alive']:
+            st.caption(
+                f"Workers warm {worker_status['alive_workers']}/{worker_status['size']} | {worker_status['jobs_served']} jobs | "
+                f"{worker_status['memory_mb'] or 0:.0f} MB | {worker_status['restarts']} restarts"
+            )
+        elif worker_status['last_restart_reason']:
+            st.caption(f"Worker stopped ({worker_status['last_restart_reason']}) - restarts on next render")
+        else:
+            st.caption("Worker starts with the first render")
+    # Render pool sized from this host's cores and memory
+    render_plan = get_render_plan()
+    render_usage = get_render_job_queue().utilization()
+    load = host_load()
+    remote_note = f", {render_usage['remote']} on render nodes" if render_usage['remote'] else ""
+    st.caption(
+        f"Render pool: {render_plan['workers']} x {render_plan['threads']} threads "
+        f"({render_plan['cpus']} cores, limited by {render_plan['limited_by']}) | "
+        f"{render_usage['running']} running, {render_usage['queued']} queued{remote_note} | "
+        f"{render_usage['busy_share'] * 100:.0f}% busy, {render_usage['jobs_per_minute']:.1f} jobs/min (5 min)"
+        + (f" | load {load * 100:.0f}%" if load is not None else "")
+    )
+    # Remote render nodes (python render_node.py on other machines, or several ports on this one)
+    render_dispatcher = get_render_node_dispatcher()
+    if 'render_nodes' not in st.session_state:
+        st.session_state['render_nodes'] = '\n'.join(node['url'] for node in render_dispatcher.nodes())
+    st.text_area(
+        "🖧 Render nodes",
+        key="render_nodes",
+        height=68,
+        on_change=apply_render_node_list,
+        placeholder="http://10.0.0.12:8801",
+        help="One render node URL per line (start nodes with 'python render_node.py --host 0.0.0.0' and the same "
+             "RENDER_NODE_TOKEN as this app). "
+             "While a node is alive, scene renders go to the nodes instead of local Blender; the list is shared by every session."
+    )
+    dispatch_error = render_dispatcher.stats()['last_error']
+    if dispatch_error:
+        st.caption(f"⚠️ Dispatcher error {time.strftime('%H:%M:%S', time.localtime(dispatch_error['at']))}: "
+                   f"{dispatch_error['error']}")
+    for node in render_dispatcher.nodes():
+        if node['alive']:
+            st.caption(f"🟢 {node['node_id']} ({node['url']}) | {node['busy']}/{node['slots']} busy | {node['jobs_done']} jobs")
+        else:
+            st.caption(f"🔴 {node['url']} | {node['error'] or 'waiting for heartbeat'}")
+    st.checkbox(
+        "⚡ Progressive render (quick preview first)",
+        value=True,
+        key="progressive_render",
+        help=f"Show a {RENDER_PREVIEW_PERCENTAGE}% resolution preview within a second or two, then swap in the full-quality frame when it is ready."
+    )
+    st.checkbox(
+        "💡 Auto re-render dark scenes",
+        key="auto_boost_rerender",
+        help="If the local quality check finds a black or underexposed render, re-render once with boosted lighting."
+    )
     
     st.divider()
     st.markdown("### Department (Category)")
@@ -1849,81 +2679,280 @@ if active_case:
     if 'forensic_scan_labels' in st.session_state and st.session_state['forensic_scan_labels'] is not None:
         labels = st.session_state['forensic_scan_labels']
         
-        # Check for darkness/black warnings
-        has_darkness = any(
-            'dark' in label.get('description', '').lower() or 
-            'black' in label.get('description', '').lower()
-            for label in labels
-        )
+        findings = st.session_state.get('forensic_findings')
         
-        if has_darkness:
+        # Exposure check from image properties (not label strings)
+        if is_underexposed(findings):
             st.warning("⚠️ WARNING: Scene underexposed. Checking 3D lighting...")
         
         # Display labels with relevance scores
         st.markdown("**AI Vision Detections:**")
-        for label in labels[:10]:  # Show top 10 labels
+        top_labels = labels[:10]  # Show top 10 labels
+        for label, (relevance_score, category) in zip(top_labels, score_labels(top_labels)):
             description = label.get('description', 'Unknown')
             score = label.get('score', 0)
-            relevance_score, category = get_relevance_score(description)
             
             # Format display
             confidence_pct = int(score * 100)
             st.markdown(f"• **{description}**")
             st.caption(f"  Confidence: {confidence_pct}% | Relevance: {relevance_score}/100 ({category})")
+        
+        if findings:
+            if findings.get('reused_from'):
+                st.caption(f"♻️ Reused findings from a matching render ({findings['reused_from']['distance']} bits apart)")
+            if findings.get('objects'):
+                st.markdown("**Localized Objects:**")
+                for obj in findings['objects']:
+                    st.caption(f"• {obj['name']} ({int(obj['score'] * 100)}%)")
+            if findings.get('brightness') is not None:
+                st.caption(f"Scene Brightness: {int(findings['brightness'] * 100)}%")
+            if findings.get('dominant_colors'):
+                swatches = ''.join(
+                    f'<span style="display:inline-block;width:18px;height:18px;margin-right:4px;'
+                    f'border:1px solid #00D4FF;background:{color["hex"]};"></span>'
+                    for color in findings['dominant_colors'][:6]
+                )
+                st.markdown(swatches, unsafe_allow_html=True)
+        
+        # Upload optimization stats for the last scan
+        payload_info = st.session_state.get('vision_payload_info')
+        if payload_info:
+            saved_pct = 100 - int(100 * payload_info['optimized_bytes'] / max(1, payload_info['original_bytes']))
+            cache_note = " (cached)" if payload_info.get('cache_hit') else ""
+            st.caption(
+                f"Upload: {payload_info['optimized_bytes'] // 1024} KB {payload_info['format']} "
+                f"@ {payload_info['optimized_size'][0]}x{payload_info['optimized_size'][1]} "
+                f"- {saved_pct}% smaller{cache_note}"
+            )
     
     elif 'forensic_scan_error' in st.session_state and st.session_state['forensic_scan_error']:
         st.error(f"❌ {st.session_state['forensic_scan_error']}")
     else:
         st.info("👆 Generate a render and click 'RUN AI FORENSIC SCAN' to analyze the scene.")
     
+    # Measurement mode: scan original + downscaled candidates and compare label sets
+    st.checkbox(
+        "📏 Measure upload optimization",
+        key="vision_measure_mode",
+        help="Next scan also uploads the original and candidate sizes, reports bytes saved and label agreement, and recalibrates the upload size. Costs extra API calls."
+    )
+    optimization_report = st.session_state.get('vision_optimization_report')
+    if optimization_report:
+        with st.expander("Upload Optimization Report"):
+            st.caption(f"Original upload: {optimization_report['original_bytes'] // 1024} KB, "
+                       f"{optimization_report['reference_label_count']} labels")
+            for candidate in optimization_report['candidates']:
+                st.caption(
+                    f"{candidate['long_edge']}px {candidate['format']}: "
+                    f"{candidate['optimized_bytes'] // 1024} KB "
+                    f"(saved {candidate['bytes_saved'] // 1024} KB) | "
+                    f"Agreement: {int(candidate['agreement'] * 100)}%"
+                )
+                if candidate['lost_labels']:
+                    st.caption(f"  Lost: {', '.join(candidate['lost_labels'])}")
+            if optimization_report['selected_long_edge'] is None:
+                st.warning(f"No candidate size kept {int(optimization_report['min_agreement'] * 100)}% label "
+                           "agreement - scans keep uploading the original render.")
+            else:
+                st.markdown(f"**Selected upload size:** {optimization_report['selected_long_edge']}px")
+    
+    st.divider()
+    st.markdown("### 🧬 Render Dedup")
+    st.slider(
+        "Match distance (bits)",
+        min_value=0,
+        max_value=16,
+        value=DEFAULT_MAX_DISTANCE,
+        key="dedup_max_distance",
+        help="Maximum pHash/dHash Hamming distance for a render to reuse an earlier render's scan and archive results. 0 = exact matches only."
+    )
+    with st.expander("Reuse Audit Trail"):
+        if st.button("Re-index evidence_renders/", key="rebuild_render_index"):
+            st.caption(f"{RENDER_INDEX.rebuild()} renders indexed")
+        audit_records = RENDER_INDEX.read_audit(limit=15)
+        if audit_records:
+            for record in reversed(audit_records):
+                matched = f" ← {record['matched_sha256'][:10]} ({record['distance']} bits)" if record['matched_sha256'] else ""
+                st.caption(f"{record['ts']} | {record['action']} | {record['decision'].upper()} {record['render_sha256'][:10]}{matched}")
+        else:
+            st.caption("No reuse decisions recorded yet.")
+    
     st.divider()
     st.markdown("### ☁️ Cloud Archive")
     
     # Check if there's a current render and render image
-    render_image_path_check = EVIDENCE_RENDERS_DIR / "latest_render.png"
-    has_render = render_image_path_check.exists()
+    render_image_path_check = get_session_render_path()
+    has_render = render_image_path_check is not None
     has_current_case = 'current_render' in st.session_state and st.session_state['current_render']
     
     if has_render and has_current_case:
         render_info = st.session_state['current_render']
-        case_id = f"CASE-{render_info.get('article_idx', 0)}-{int(time.time())}"
         headline = render_info.get('headline', 'Unknown Case')
         
-        # Archive button
+        incremental_sync = st.checkbox(
+            "🔁 Incremental sync (skip unchanged files)",
+            value=True,
+            key="archive_incremental_sync",
+            help="Archive under a stable case ID and compare MD5 checksums with Drive: unchanged files are skipped and changed ones are updated in place instead of uploading new copies."
+        )
+        case_id = get_render_case_id(render_info)
+        if not incremental_sync:
+            case_id = f"{case_id}-{int(time.time())}"
+        
+        # Archive button - queues the job; background workers do the upload
         if st.button("☁️ ARCHIVE CASE TO CLOUD", use_container_width=True, key="archive_to_cloud"):
-            with st.spinner("Uploading case files to Google Drive..."):
-                forensic_labels = st.session_state.get('forensic_scan_labels', None)
-                results, error = archive_case_to_cloud(
-                    render_image_path_check,
-                    case_id,
-                    headline,
-                    forensic_labels
-                )
-                if error:
-                    st.session_state['archive_error'] = error
-                    st.session_state['archive_results'] = None
-                else:
-                    st.session_state['archive_results'] = results
-                    st.session_state['archive_error'] = None
-                    st.session_state['archive_case_id'] = case_id
+            forensic_labels = st.session_state.get('forensic_scan_labels', None)
+            forensic_findings = st.session_state.get('forensic_findings', None)
+            render_print, reusable = find_reusable_render('archive', render_image_path_check, 'archive')
+            reused_render = None
+            if reusable:
+                # Near-identical render already archived (often another case with the same scene spec):
+                # point this case's render at that Drive file and reuse its findings if this session has none.
+                # The case's own findings, metadata and PDF are always archived.
+                reused_render = reusable['archive'].get('render')
+                if not forensic_labels and reusable.get('findings'):
+                    forensic_findings = reusable['findings']
+                    forensic_labels = forensic_findings.get('labels')
+            job_id, error = archive_case_to_cloud(
+                render_image_path_check,
+                case_id,
+                headline,
+                forensic_labels,
+                forensic_findings,
+                # Only a PDF of this case and this render; otherwise one is generated for it
+                pdf_bytes=get_case_pdf_for_archive(render_info),
+                render_sha=render_print['sha256'] if render_print else None,
+                incremental=incremental_sync,
+                reused_render=reused_render
+            )
+            st.session_state['archive_error'] = error
+            if job_id:
+                if 'archive_jobs' not in st.session_state:
+                    st.session_state['archive_jobs'] = []
+                st.session_state['archive_jobs'].insert(0, job_id)
             st.rerun()
         
-        # Display archive results
-        if 'archive_results' in st.session_state and st.session_state['archive_results']:
-            st.success("✅ Case archived successfully!")
-            results = st.session_state['archive_results']
-            st.markdown("**Drive Links:**")
-            if 'render' in results:
-                st.markdown(f"• [Render Image]({results['render']['link']})")
-            if 'findings' in results:
-                st.markdown(f"• [Forensic Findings]({results['findings']['link']})")
-            if 'archive_case_id' in st.session_state:
-                st.caption(f"Case ID: {st.session_state['archive_case_id']}")
-        elif 'archive_error' in st.session_state and st.session_state['archive_error']:
+        if 'archive_error' in st.session_state and st.session_state['archive_error']:
             st.error(f"❌ {st.session_state['archive_error']}")
     else:
         st.info("👆 Generate a render to archive cases to the cloud.")
     
+    # Archive queue status (shared by every session; jobs survive restarts)
+    if DRIVE_AVAILABLE:
+        archive_queue = get_case_archive_queue()
+        queue_stats = archive_queue.stats()
+        col_depth, col_flight, col_failed = st.columns(3)
+        with col_depth:
+            st.metric("Queued", queue_stats['depth'])
+        with col_flight:
+            st.metric("In Flight", queue_stats['in_flight'])
+        with col_failed:
+            st.metric("Failed", queue_stats['failed'])
+        
+        status_icons = {'queued': '⏳', 'running': '📤', 'done': '✅', 'failed': '❌'}
+        for job_id in st.session_state.get('archive_jobs', [])[:5]:
+            job = archive_queue.get_job(job_id)
+            if not job:
+                continue
+            st.markdown(f"{status_icons.get(job['status'], '•')} **{job['case_id']}** - {job['status'].upper()}")
+            if job['status'] == 'queued' and job['attempts']:
+                retry_in = max(0, int(job['next_attempt_at'] - time.time()))
+                st.caption(f"Attempt {job['attempts']}/{job['max_attempts']} failed - retrying in {retry_in}s")
+                st.caption(f"Last error: {job['last_error']}")
+            elif job['status'] == 'failed':
+                st.caption(f"Gave up after {job['attempts']} attempts: {job['last_error']}")
+                if st.button("🔁 Retry", key=f"retry_archive_{job_id}"):
+                    archive_queue.retry_now(job_id)
+                    st.rerun()
+            elif job['status'] == 'done':
+                results = job['results'] or {}
+                links = {
+                    'render': 'Render Image',
+                    'findings': 'Forensic Findings',
+                    'findings_json': 'Findings (JSON)',
+                    'pdf': 'Case File PDF'
+                }
+                for key, label in links.items():
+                    if key in results:
+                        st.markdown(f"• [{label}]({results[key]['link']})")
+                total_bytes = sum(result.get('bytes', 0) for result in results.values())
+                chunk_retries = sum(result.get('chunk_retries', 0) for result in results.values())
+                st.caption(
+                    f"Uploaded {total_bytes // 1024} KB in {job['attempts']} attempt(s) "
+                    f"({chunk_retries} chunk retries)"
+                )
+                actions = [result.get('action', 'create') for result in results.values()]
+                if 'reuse' in actions:
+                    st.caption("♻️ Render matches an earlier archived render - linked to its Drive file")
+                if job['meta'].get('incremental'):
+                    st.caption(
+                        f"Sync: {actions.count('create')} new, {actions.count('update')} updated, "
+                        f"{actions.count('skip')} unchanged"
+                    )
+        
+        if queue_stats['depth'] or queue_stats['in_flight']:
+            if st.button("🔄 Refresh Archive Status", use_container_width=True, key="refresh_archive_status"):
+                st.rerun()
+        
+        # Reconcile the local Forensic_Archive against the Drive folder (one paged listing)
+        with st.expander("🔁 Reconcile Local Archive", expanded=False):
+            if st.button("Compare with Drive", use_container_width=True, key="reconcile_archive"):
+                try:
+                    session, folder_cache = get_archive_drive()
+                    with TELEMETRY.track('drive', 'reconcile'):
+                        st.session_state['archive_reconcile'] = reconcile_local(
+                            session, DRIVE_ARCHIVE_FOLDER, folder_cache, get_sync_manifest(), FORENSIC_ARCHIVE_DIR
+                        )
+                    st.session_state['archive_reconcile_error'] = None
+                except Exception as e:
+                    st.session_state['archive_reconcile'] = None
+                    st.session_state['archive_reconcile_error'] = f"Reconcile failed: {str(e)}"
+            
+            reconcile = st.session_state.get('archive_reconcile')
+            if reconcile:
+                st.caption(
+                    f"In sync: {len(reconcile['in_sync'])} | Changed: {len(reconcile['changed'])} | "
+                    f"Local only: {len(reconcile['local_only'])} | Drive only: {len(reconcile['remote_only'])}"
+                )
+                for title in reconcile['changed'][:10]:
+                    st.caption(f"✏️ {title}")
+                for title in reconcile['local_only'][:10]:
+                    st.caption(f"⬆️ {title}")
+                if reconcile['manifest_drift']:
+                    st.warning(f"⚠️ {len(reconcile['manifest_drift'])} file(s) changed in Drive since they were synced")
+                
+                # Catch up on the backlog: batched metadata, bounded concurrent uploads
+                backlog = len(reconcile['changed']) + len(reconcile['local_only'])
+                if backlog and st.button(f"⬆️ Bulk archive {backlog} local file(s)", use_container_width=True, key="bulk_archive"):
+                    progress_bar = st.progress(0.0, text="Creating Drive metadata...")
+                    
+                    def show_bulk_progress(done, total, bytes_done):
+                        progress_bar.progress(done / total, text=f"{done}/{total} files | {bytes_done // 1024} KB uploaded")
+                    
+                    try:
+                        session, folder_cache = get_archive_drive()
+                        with TELEMETRY.track('drive', 'bulk_archive'):
+                            bulk_report = bulk_archive(
+                                session, DRIVE_ARCHIVE_FOLDER, folder_cache, get_sync_manifest(),
+                                FORENSIC_ARCHIVE_DIR, telemetry=TELEMETRY, progress=show_bulk_progress
+                            )
+                        st.session_state['bulk_archive_report'] = bulk_report
+                        st.session_state['archive_reconcile'] = None
+                    except Exception as e:
+                        st.error(f"❌ Bulk archive failed: {str(e)}")
+            
+            bulk_report = st.session_state.get('bulk_archive_report')
+            if bulk_report:
+                st.caption(
+                    f"Last bulk run: {bulk_report['created']} new, {bulk_report['updated']} updated, "
+                    f"{bulk_report['skipped']} unchanged | {bulk_report['bytes'] // 1024} KB in {bulk_report['seconds']:.1f}s "
+                    f"({bulk_report['throughput_mbps']} MB/s, {bulk_report['batches']} metadata batches)"
+                )
+                for key, error in bulk_report['errors'].items():
+                    st.caption(f"❌ {key}: {error}")
+            elif st.session_state.get('archive_reconcile_error'):
+                st.error(f"❌ {st.session_state['archive_reconcile_error']}")
+    
     st.divider()
     st.markdown("### 📊 Live Status Log")
     if 'blender_stdout' in st.session_state and st.session_state['blender_stdout']:
@@ -1934,14 +2963,35 @@ if active_case:
     st.divider()
     st.markdown("### 🏥 System Health")
     
-    # GCP Credit Monitor
+    # GCP Credit Monitor (estimated spend from the persistent telemetry ledger)
     st.markdown('<div class="credit-meter">', unsafe_allow_html=True)
     st.markdown("**GCP Credit Monitor**")
-    credit_amount = st.session_state.get('gcp_credits', 300.0)
+    try:
+        credit_amount = max(0.0, GCP_CREDIT_BUDGET - TELEMETRY.total_cost())
+    except Exception:
+        credit_amount = GCP_CREDIT_BUDGET
     st.markdown(f'<div class="credit-amount">${credit_amount:.2f}</div>', unsafe_allow_html=True)
-    st.caption("$0.05 deducted per AI scan")
+    st.caption("Estimated from logged Vision/Drive/News calls")
     st.markdown('</div>', unsafe_allow_html=True)
     
+    # API Telemetry: latency percentiles, bytes and cost per service
+    with st.expander(f"📈 API Telemetry (last {SUMMARY_WINDOW_SECONDS // 3600} h)"):
+        try:
+            telemetry_summary = TELEMETRY.summarize(since=time.time() - SUMMARY_WINDOW_SECONDS)
+        except Exception as e:
+            telemetry_summary = []
+            st.caption(f"Telemetry unavailable: {str(e)}")
+        if telemetry_summary:
+            for row in telemetry_summary:
+                hit_rate = f" | hit {int(row['cache_hit_rate'] * 100)}%" if row['cache_hit_rate'] is not None else ""
+                st.markdown(f"**{row['service'].upper()} · {row['operation']}** ({row['calls']} calls, {row['errors']} errors)")
+                st.caption(
+                    f"p50 {row['p50_ms']:.0f} ms | p90 {row['p90_ms']:.0f} ms | p99 {row['p99_ms']:.0f} ms{hit_rate}\n\n"
+                    f"Sent {row['payload_kb']} KB | Received {row['result_kb']} KB | ${row['cost_usd']:.4f}"
+                )
+        else:
+            st.caption("No API calls recorded yet.")
+    
     # Process Status LEDs
     st.markdown("**Process Status**")
     process_states = st.session_state.get('process_states', {
@@ -2001,29 +3051,9 @@ if active_case:
         article_idx = render_info.get('article_idx', 0)
         
         if article_idx < len(st.session_state['articles']):
-            article = st.session_state['articles'][article_idx]
-            case_id = f"CASE-{article_idx}-{int(time.time())}"
-            
-            # Generate pixel art for PDF
-            article_text = f"{article.get('title', '')} {article.get('description', '')}"
-            category = st.session_state.get('crime_category', 'Domestic')
-            pixel_art_bytes = generate_procedural_pixel_art(article_text, f"CASE-{article_idx}", category=category)
-            
-            # Check for 3D render
-            render_image_path = EVIDENCE_RENDERS_DIR / "latest_render.png"
-            render_path_str = str(render_image_path) if render_image_path.exists() else None
-            
-            # Get forensic labels
-            forensic_labels = st.session_state.get('forensic_scan_labels', None)
-            
             # Generate PDF
-            pdf_bytes, pdf_error = generate_case_pdf(
-                case_id=case_id,
-                article=article,
-                pixel_art_bytes=pixel_art_bytes,
-                render_image_path=render_path_str,
-                forensic_labels=forensic_labels
-            )
+            pdf_bytes, case_id, pdf_error = build_case_pdf(render_info)
+            render_image_path = get_session_render_path()
             
             if pdf_bytes and not pdf_error:
                 # Save PDF to Forensic_Archive folder for local archiving
@@ -2034,6 +3064,14 @@ if active_case:
                     with open(pdf_path, 'wb') as f:
                         f.write(pdf_bytes.read())
                     pdf_bytes.seek(0)  # Reset again for download button
+                    # Keep the latest case PDF in memory for cloud archiving, with the case and render it shows
+                    st.session_state['latest_case_pdf'] = {
+                        'filename': pdf_filename,
+                        'bytes': pdf_bytes.getvalue(),
+                        'case_id': case_id,
+                        'article_idx': article_idx,
+                        'render_path': str(render_image_path) if render_image_path else None,
+                    }
                 except Exception as e:
                     st.warning(f"⚠️ Could not save PDF to archive: {str(e)}")
                 
@@ -2106,9 +3144,9 @@ else:
             st.markdown(f"**Active Case:** {render_info.get('headline', 'No case')}")
             st.markdown(f"**Status:** {render_info.get('status', 'Processing')}")
             
-            # Check for rendered image (using normalized absolute path)
-            render_image_path = EVIDENCE_RENDERS_DIR / "latest_render.png"
-            if render_image_path.exists():
+            # Check for this session's rendered image
+            render_image_path = get_session_render_path()
+            if render_image_path:
                 # Add cache buster timestamp to force refresh
                 image_path_with_cache = f"{str(render_image_path)}?t={int(time.time())}"
                 try:
@@ -2118,35 +3156,86 @@ else:
                     st.warning(f"⚠️ Image display error: {str(img_error)}")
                     # Fallback: try without cache buster
                     st.image(str(render_image_path), caption="Forensic Scene Reconstruction", use_container_width=True)
+
+                # Contact sheet: the individual camera views at full size
+                view_paths = {view: path for view, path in (render_info.get('view_paths') or {}).items() if os.path.exists(path)}
+                if view_paths:
+                    with st.expander(f"📸 Camera views ({len(view_paths)})"):
+                        for view_col, (view, view_path) in zip(st.columns(len(view_paths)), view_paths.items()):
+                            with view_col:
+                                st.image(view_path, caption=view.capitalize(), use_container_width=True)
+
+                # Local quality pre-check (milliseconds, no API call)
+                assessment = get_render_assessment(render_image_path)
+                quality_stats = assessment.get('stats', {})
+                if quality_stats.get('mean_luminance') is not None:
+                    st.caption(
+                        f"Local check: luminance {int(quality_stats['mean_luminance'] * 100)}% | "
+                        f"contrast {quality_stats['std_luminance']:.3f} | "
+                        f"edge energy {quality_stats['edge_energy']:.4f} | "
+                        f"{quality_stats['file_bytes'] // 1024} KB"
+                    )
+                for issue_text in describe_issues(assessment['issues']):
+                    st.warning(f"⚠️ Local check: {issue_text}")
+                
+                # Offer a boosted-lighting re-render for dark frames
+                if set(assessment['issues']) & {'black_frame', 'underexposed'}:
+                    if st.button(f"💡 RE-RENDER WITH BOOSTED LIGHTING (x{assessment['light_boost']})", use_container_width=True, key="rerender_boosted"):
+                        st.session_state['pending_light_boost'] = assessment['light_boost']
+                        st.session_state['rerender_article_idx'] = render_info.get('article_idx', 0)
+                        st.rerun()
+                
+                # Gate the paid scan on the local check unless the analyst overrides it
+                scan_allowed = assessment['scan_ok']
+                if not scan_allowed:
+                    st.error("❌ Render failed the local quality check - AI scan blocked to save API credits.")
+                    scan_allowed = st.checkbox("Scan anyway", key="override_quality_gate")
                 
                 # AI Forensic Scan button
-                if st.button("🔍 RUN AI FORENSIC SCAN", use_container_width=True, key="run_forensic_scan"):
+                if st.button("🔍 RUN AI FORENSIC SCAN", use_container_width=True, key="run_forensic_scan", disabled=not scan_allowed):
                     # Activate VISION AI LED
                     process_states = st.session_state.get('process_states', {'scraper': True, 'vision_ai': False, 'blender': False})
                     process_states['vision_ai'] = True
                     st.session_state['process_states'] = process_states
                     
                     with st.spinner("Analyzing forensic scene with AI Vision..."):
-                        labels, error = run_forensic_scan(str(render_image_path))
+                        measure_mode = st.session_state.get('vision_measure_mode', False)
+                        render_print, reusable = find_reusable_render('scan', render_image_path, 'findings')
+                        if reusable and not measure_mode:
+                            # Near-identical render already scanned - reuse its findings, skip the API call
+                            findings = dict(reusable['findings'])
+                            findings['reused_from'] = {'sha256': reusable['sha256'], 'distance': reusable['distance']}
+                            error = None
+                            TELEMETRY.record('vision', 'annotate', 0, cache_hit=True)
+                        else:
+                            findings, error = run_forensic_scan(str(render_image_path), measure=measure_mode)
+                            if not error and render_print:
+                                RENDER_INDEX.attach(render_print['sha256'], 'findings', findings)
                         if error:
                             st.session_state['forensic_scan_error'] = error
                             st.session_state['forensic_scan_labels'] = None
+                            st.session_state['forensic_findings'] = None
                         else:
-                            st.session_state['forensic_scan_labels'] = labels
+                            # Annotate the findings with the local pre-check results
+                            findings['local_quality'] = assessment
+                            st.session_state['forensic_scan_labels'] = findings['labels']
+                            st.session_state['forensic_findings'] = findings
                             st.session_state['forensic_scan_error'] = None
-                            # Deduct credits for successful scan
-                            current_credits = st.session_state.get('gcp_credits', 300.0)
-                            st.session_state['gcp_credits'] = max(0.0, current_credits - 0.05)
                     
                     # Deactivate VISION AI LED after scan
                     process_states['vision_ai'] = False
                     st.session_state['process_states'] = process_states
                     st.rerun()
+            elif get_session_preview_path():
+                # Progressive render: the quick preview stands in until the full frame is applied
+                st.image(str(get_session_preview_path()), caption=f"Preview ({RENDER_PREVIEW_PERCENTAGE}% resolution) - final render in progress",
+                         use_container_width=True)
+                st.info("⚡ Preview shown - the full-quality render replaces it when ready.")
             else:
                 # Generate procedural pixel art as preliminary visual evidence
                 render_info = st.session_state['current_render']
                 article_text = f"{render_info.get('headline', '')} {render_info.get('description', '')}"
-                case_id = f"CASE-{render_info.get('article_idx', 0)}"
+                case_id = get_render_case_id(render_info)
                 category = st.session_state.get('crime_category', 'Domestic')
                 st.markdown("### 🎨 Preliminary Visual Evidence")
                 pixel_art = generate_procedural_pixel_art(article_text, case_id, category=category)
@@ -2169,7 +3258,7 @@ else:
                     
                     # Generate and display preliminary pixel art visual evidence
                     article_text = f"{article.get('title', '')} {article.get('description', '')}"
-                    case_id = f"CASE-{selected_idx}"
+                    case_id = case_id_for_article(article)
                     category = st.session_state.get('crime_category', 'Domestic')
                     st.markdown("### 🎨 Preliminary Visual Evidence")
                     pixel_art = generate_procedural_pixel_art(article_text, case_id, category=category)
@@ -2267,7 +3356,9 @@ else:
             with st.spinner("Fetching crime news..."):
                 try:
                     category = st.session_state.get('crime_category', 'Domestic')
-                    articles = fetch_crime_news(st.session_state['news_api_key'], category=category)
+                    with TELEMETRY.track('news', 'fetch') as call:
+                        articles = fetch_crime_news(st.session_state['news_api_key'], category=category)
+                        call['result_bytes'] = len(json.dumps(articles, default=str))
                     st.session_state['articles'] = articles
                     st.success(f"✅ Found {len(articles)} articles!")
                 except Exception as e:
@@ -2303,213 +3394,170 @@ else:
                 
                 st.divider()
                 
-                # Generate Evidence Room button
-                if st.button("🏛️ GENERATE EVIDENCE ROOM", key=f"generate_{selected_idx}", use_container_width=True):
+                # Boosted-lighting re-render requested by the local quality check
+                rerender_requested = st.session_state.get('rerender_article_idx') == selected_idx
+                light_boost = st.session_state.get('pending_light_boost', 1.0) if rerender_requested else 1.0
+                st.session_state.pop('rerender_article_idx', None)
+                st.session_state.pop('pending_light_boost', None)
+                
+                # Generate Evidence Room button: queues a background render and returns immediately
+                generate_clicked = st.button("🏛️ GENERATE EVIDENCE ROOM", key=f"generate_{selected_idx}", use_container_width=True)
+                contact_sheet_clicked = st.button(
+                    "📸 CONTACT SHEET (TOP / CORNER / CLOSE-UP)",
+                    key=f"contact_sheet_{selected_idx}",
+                    use_container_width=True,
+                    help="Render the scene from three cameras in one Blender run and tile them into a contact sheet."
+                )
+                if generate_clicked or contact_sheet_clicked or rerender_requested:
                     headline = article.get('title', 'Evidence Room')
                     description = article.get('description', '')
+                    views = list(CONTACT_SHEET_VIEWS) if contact_sheet_clicked else []
                     
-                    # Activate BLENDER LED
-                    process_states = st.session_state.get('process_states', {'scraper': True, 'vision_ai': False, 'blender': False})
-                    process_states['blender'] = True
-                    st.session_state['process_states'] = process_states
+                    # Scene spec for this case; an identical scene rendered before is served from the cache
+                    scene_spec = spec_for_case(st.session_state.get('crime_category', 'Domestic'), light_boost,
+                                               analyze_modus_operandi(article))
+                    spec_key = spec_hash(scene_spec, salt=RENDER_SCRIPT_DIGEST)
+                    render_params = {
+                        'spec': scene_spec,
+                        # The spec cache holds single frames only; contact sheets always render
+                        'spec_hash': None if views else spec_key,
+                        'views': views,
+                        'light_boost': light_boost,
+                        'headline': headline,
+                        'description': description,
+                        'article_idx': selected_idx,
+                        'case_id': case_id_for_article(article),
+                    }
+                    cached_render = None if views else find_cached_render(spec_key)
+                    if cached_render:
+                        apply_render_result({
+                            'params': render_params,
+                            'status': DONE,
+                            'result': {
+                                'image_path': str(cached_render),
+                                'stdout': f"Render cache hit {spec_key[:12]} - Blender skipped",
+                            },
+                        })
+                        st.rerun()
                     
-                    with st.spinner("Generating Evidence Room..."):
-                        try:
-                            # Use reconstruct_scene.py for Forensic Architect (using normalized absolute path)
-                            script_path = BASE_DIR / "reconstruct_scene.py"
-                            
-                            if not script_path.exists():
-                                st.error(f"❌ Forensic Architect script not found at: {script_path.absolute()}")
-                                st.stop()
-                            
-                            # Launch Blender in background
-                            blender_exe_raw = st.session_state.get('blender_path', r'C:\Program Files\Blender Foundation\Blender 5.0\blender.exe')
-                            
-                            # Path sanitization: Wrap blender_path with os.path.normpath() for Windows compatibility
-                            blender_exe = os.path.normpath(blender_exe_raw)
-                            
-                            # Ensure .exe extension on Windows if not present
-                            if os.name == 'nt' and not blender_exe.endswith('.exe') and not blender_exe.endswith('.bat'):
-                                # Check if it's a directory path and append blender.exe
-                                if os.path.isdir(blender_exe):
-                                    blender_exe = os.path.join(blender_exe, 'blender.exe')
-                                elif os.path.exists(blender_exe + '.exe'):
-                                    # Path exists if we add .exe
-                                    blender_exe = blender_exe + '.exe'
-                                blender_exe = os.path.normpath(blender_exe)
-                            
-                            # HARD-CODE BLENDER VALIDATION: Verify executable exists before running
-                            if blender_exe != 'blender':  # Allow 'blender' command if in PATH
-                                if not os.path.exists(blender_exe):
-                                    st.error(f"❌ Blender Validation Failed: Executable not found at: {blender_exe}")
-                                    st.error(f"Please check the Blender path in the sidebar. Current path: {blender_exe_raw}")
-                                    st.stop()
-                                else:
-                                    st.success(f"✅ Blender Validation: Executable found at: {blender_exe}")
-                            else:
-                                st.info(f"⚠️ Using 'blender' command (assuming it's in system PATH)")
-                            
-                            # Create command as list with proper argument separation
-                            script_path_str = os.path.normpath(str(script_path.absolute()))
-                            # Separate --python and script path into distinct strings
-                            cmd_list = [
-                                blender_exe,
-                                '--background',
-                                '--factory-startup',
-                                '--python',
-                                script_path_str,
-                                '--'  # Buffer: stop looking for Blender flags
-                            ]
-                            
-                            # Diagnostic: Display the exact command being executed
-                            cmd_str_display = ' '.join(cmd_list)
-                            st.info(f"🔧 Executing command: `{cmd_str_display}`")
-                            
-                            # Setup Windows startup info to hide console window
-                            startupinfo = None
-                            if os.name == 'nt':
-                                startupinfo = subprocess.STARTUPINFO()
-                                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                                startupinfo.wShowWindow = subprocess.SW_HIDE
-                            
-                            # Run Blender with timeout and error capture
-                            # Wrap in try/except to capture stdout even if it fails
-                            result = None
-                            try:
-                                result = subprocess.run(
-                                    cmd_list,
-                                    shell=True,  # Set shell=True for Windows to properly initialize executable
-                                    capture_output=True,
-                                    text=True,
-                                    timeout=60,  # Increased timeout for render (EEVEE should be fast, but safety buffer)
-                                    startupinfo=startupinfo,
-                                    env=os.environ.copy(),  # Environment passthrough
-                                    cwd=os.getcwd()  # Ensure it runs in the local project directory, not system root
-                                )
-                            except subprocess.TimeoutExpired as timeout_error:
-                                st.error("❌ Blender process timed out after 60 seconds")
-                                st.error(f"Timeout Error: {str(timeout_error)}")
-                                if hasattr(timeout_error, 'stdout') and timeout_error.stdout:
-                                    st.error("Blender Output (before timeout):")
-                                    st.code(timeout_error.stdout, language='text')
-                                raise
-                            except Exception as subprocess_error:
-                                st.error(f"❌ Blender subprocess execution failed: {str(subprocess_error)}")
-                                st.error(f"Error Type: {type(subprocess_error).__name__}")
-                                # Try to capture any available output
-                                if hasattr(subprocess_error, 'stdout') and subprocess_error.stdout:
-                                    st.error("Blender Output (on error):")
-                                    st.code(subprocess_error.stdout, language='text')
-                                raise
-                            
-                            # After subprocess completes (success or failure), display stdout if it failed
-                            if result is None:
-                                st.error("❌ Blender subprocess returned None. Execution may have failed.")
-                                st.stop()
-                            
-                            # Display stdout in st.error if subprocess failed (even if returncode != 0)
-                            if result.returncode != 0:
-                                st.error(f"❌ Blender render failed with return code: {result.returncode}")
-                                if result.stdout:
-                                    st.error("Blender Standard Output (stdout):")
-                                    st.code(result.stdout, language='text')
-                                if result.stderr:
-                                    st.error("Blender Error Output (stderr):")
-                                    st.code(result.stderr, language='text')
-                            
-                            # Store stdout for Live Status Log (whether success or failure)
-                            if result.stdout:
-                                stdout_lines = result.stdout.strip().split('\n')
-                                st.session_state['blender_stdout'] = stdout_lines[-3:] if len(stdout_lines) > 3 else stdout_lines
-                            
-                            # Store render info in session state
-                            st.session_state['current_render'] = {
-                                'headline': headline,
-                                'description': description,
-                                'status': 'Completed' if result.returncode == 0 else 'Error',
-                                'article_idx': selected_idx
-                            }
-                            
-                            # Deactivate BLENDER LED after render completes
-                            process_states = st.session_state.get('process_states', {'scraper': True, 'vision_ai': False, 'blender': False})
-                            process_states['blender'] = False
-                            st.session_state['process_states'] = process_states
-                            
-                            # Wait handshake: Give file system time to release the image file
-                            # Windows sometimes takes a millisecond to "release" the file handle after Blender closes
-                            if result.returncode == 0:
-                                time.sleep(1)  # Wait protocol: 1 second delay to ensure file system has released the image
-                            
-                            # Check if the rendered image file exists (using normalized absolute path)
-                            image_path = EVIDENCE_RENDERS_DIR / "latest_render.png"
-                            
-                            # Check for Blender crash/failure
-                            if result.returncode != 0:
-                                st.error('❌ Blender Crash Detected')
-                                if result.stderr:
-                                    st.code(result.stderr)
-                                if result.stdout:
-                                    st.code(result.stdout)
-                                # Generate procedural pixel art on error
-                                st.warning("⚠️ Generating preliminary visual evidence...")
-                                article_text = f"{headline} {description}"
-                                case_id = f"CASE-{selected_idx}"
-                                category = st.session_state.get('crime_category', 'Domestic')
-                                pixel_art = generate_procedural_pixel_art(article_text, case_id, category=category)
-                                st.image(pixel_art, caption="Preliminary Visual Evidence - Pixel Art", use_container_width=True)
-                                # Set current_render so pixel art shows in render view
-                                st.session_state['current_render'] = {
-                                    'headline': headline,
-                                    'description': description,
-                                    'status': 'Blender Error - Using Pixel Art',
-                                    'article_idx': selected_idx
-                                }
-                                st.rerun()
+                    blender_exe, cmd_list = prepare_blender_command()
+                    if light_boost > 1.0:
+                        cmd_list += ['--light-boost', str(light_boost)]
+                    
+                    prune_render_outputs()
+                    preview_percentage = RENDER_PREVIEW_PERCENTAGE if st.session_state.get('progressive_render', True) and not views else 0
+                    # Live render nodes take the render; it does not wait for a local render slot
+                    use_nodes = bool(get_render_node_dispatcher().stats()['nodes'])
+                    job_id = get_render_job_queue().submit(
+                        get_render_session_id(),
+                        dict(
+                            render_params,
+                            cmd_list=cmd_list,
+                            blender_exe=blender_exe,
+                            use_worker=st.session_state.get('persistent_blender_worker', True),
+                            use_nodes=use_nodes,
+                            preview_percentage=preview_percentage
+                        ),
+                        label=f"Contact sheet: {headline}" if views else headline,
+                        remote=use_nodes
+                    )
+                    st.session_state['current_render'] = {
+                        'headline': headline,
+                        'description': description,
+                        'status': 'Queued',
+                        'article_idx': selected_idx,
+                        'case_id': render_params['case_id'],
+                        'preview_path': str(render_preview_path(job_id)) if preview_percentage else None
+                    }
+                    # Rerun so the queue panel and the BLENDER LED pick up the new job
+                    st.rerun()
+
+                # Pre-render every fetched article in one Blender run (fills the spec cache)
+                if st.button("🎞️ PRE-RENDER ALL ARTICLES", key="prerender_all_articles", use_container_width=True,
+                             help="Render each distinct article scene in a single batch Blender run; later GENERATE clicks for these cases return from the cache."):
+                    category = st.session_state.get('crime_category', 'Domestic')
+                    batch, seen = [], set()
+                    for article_idx, batch_article in enumerate(st.session_state['articles']):
+                        batch_spec = spec_for_case(category, 1.0, analyze_modus_operandi(batch_article))
+                        batch_key = spec_hash(batch_spec, salt=RENDER_SCRIPT_DIGEST)
+                        # Cases with the same scene render once; cached scenes are skipped
+                        if batch_key in seen or find_cached_render(batch_key):
+                            continue
+                        seen.add(batch_key)
+                        batch.append({'spec': batch_spec, 'spec_hash': batch_key, 'article_idx': article_idx})
+
+                    if not batch:
+                        st.info(f"✅ All {len(st.session_state['articles'])} article scenes are already cached.")
+                    else:
+                        blender_exe, cmd_list = prepare_blender_command()
+                        prune_render_outputs()
+                        use_nodes = bool(get_render_node_dispatcher().stats()['nodes'])
+                        get_render_job_queue().submit(
+                            get_render_session_id(),
+                            {
+                                'batch': batch,
+                                'cmd_list': cmd_list,
+                                'blender_exe': blender_exe,
+                                'use_worker': st.session_state.get('persistent_blender_worker', True),
+                                'use_nodes': use_nodes,
+                            },
+                            label=f"Batch: {len(batch)} scenes",
+                            remote=use_nodes
+                        )
+                        st.rerun()
+
+                # Render queue for this session: status, timings and cancellation
+                if session_render_jobs:
+                    st.markdown("**🎬 Render Queue**")
+                    status_icons = {QUEUED: '⏳', RUNNING: '🔶', DONE: '✅', FAILED: '❌', CANCELLED: '🚫'}
+                    now = time.time()
+                    for job in session_render_jobs[:5]:
+                        job_col, action_col = st.columns([0.75, 0.25])
+                        with job_col:
+                            boost = job['params'].get('light_boost', 1.0)
+                            boost_note = f" (light x{boost})" if boost > 1.0 else ""
+                            st.markdown(f"{status_icons.get(job['status'], '•')} `{job['id']}` {job['label'][:50]}{boost_note}")
+                            if job['status'] == QUEUED:
+                                st.caption(f"Queued - position {job.get('position', '?')}")
+                            elif job['status'] == RUNNING:
+                                # Live progress streamed from Blender's progress events
+                                progress = job.get('progress') or {}
+                                step = progress.get('stage') or progress.get('phase') or 'starting Blender'
+                                st.caption(f"Rendering... {now - job['started_at']:.0f}s | {step}")
+                                if progress.get('percent') is not None and progress['percent'] >= 0:
+                                    st.progress(min(progress['percent'], 100) / 100.0)
+                            elif job['status'] == DONE:
+                                st.caption(f"Done in {job['result']['seconds']:.1f}s")
+                                if job['result'].get('frames'):
+                                    st.caption(' | '.join(
+                                        f"#{frame['index']} {frame['timings'].get('render', 0):.2f}s"
+                                        for frame in job['result']['frames']
+                                    ))
+                            elif job['status'] == FAILED:
+                                st.caption(f"Failed: {job['error']}")
                             else:
-                                # Return code is 0, check if image exists
-                                if image_path.exists():
-                                    st.success("✅ Evidence Room generated successfully!")
-                                    # CRITICAL: Set current_render in session state so the render view displays
-                                    st.session_state['current_render'] = {
-                                        'headline': headline,
-                                        'description': description,
-                                        'status': 'Complete',
-                                        'article_idx': selected_idx
-                                    }
-                                    # Force immediate rerun to show the render
-                                    st.rerun()
-                                else:
-                                    st.error('❌ Forensic Render Failed. Check Logs below:')
-                                    if result.stdout:
-                                        st.code(result.stdout)  # This will show us why it didn't save
-                                    if result.stderr:
-                                        st.code(result.stderr)  # Also show stderr for debugging
-                                    # Generate procedural pixel art
-                                    st.warning("⚠️ Generating preliminary visual evidence...")
-                                    article_text = f"{headline} {description}"
-                                    case_id = f"CASE-{selected_idx}"
-                                    category = st.session_state.get('crime_category', 'Domestic')
-                                    pixel_art = generate_procedural_pixel_art(article_text, case_id, category=category)
-                                    st.image(pixel_art, caption="Preliminary Visual Evidence - Pixel Art", use_container_width=True)
-                                    # Set current_render even on failure so pixel art shows in render view
-                                    st.session_state['current_render'] = {
-                                        'headline': headline,
-                                        'description': description,
-                                        'status': 'Failed - Using Pixel Art',
-                                        'article_idx': selected_idx
-                                    }
+                                st.caption("Cancelled")
+                            # Full Blender output from the job's log ring buffer (live while rendering)
+                            job_log = get_render_job_queue().log_lines(job['id'])
+                            result = job['result'] or {}
+                            if job_log or result.get('stderr'):
+                                with st.expander(f"Blender output ({len(job_log)} lines)"):
+                                    st.code(' '.join(job['params']['cmd_list']), language='text')
+                                    if job_log:
+                                        st.code('\n'.join(describe_render_line(line) for line in job_log), language='text')
+                                    if result.get('stderr'):
+                                        st.code(result['stderr'], language='text')
+                        with action_col:
+                            if job['status'] in ACTIVE_STATUSES:
+                                if st.button("✖ Cancel", key=f"cancel_render_{job['id']}"):
+                                    get_render_job_queue().cancel(job['id'])
                                     st.rerun()
-                            
-                            # Note: rerun() is called conditionally above when render succeeds
-                            # This prevents double rerun and ensures render view updates correctly
-                            
-                        except FileNotFoundError:
-                            st.error(f"❌ Blender not found at '{blender_exe}'. Check the sidebar.")
-                        except Exception as e:
-                            st.error(f"❌ Error: {str(e)}")
         else:
             st.info("👆 Click 'FETCH NEWS' to load crime articles")
         
         st.markdown('</div>', unsafe_allow_html=True)
 
-
+# Keep polling while this session has renders queued or running (also keeps the BLENDER LED pulsing)
+if render_jobs_active:
+    time.sleep(RENDER_POLL_SECONDS)
+    st.rerun()
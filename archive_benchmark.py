@@ -0,0 +1,250 @@
+"""
+Archive Benchmark - End-to-end timing of the cloud archive pipeline against a local fake Drive.
+Starts fake_drive.FakeDriveServer in-process (tunable latency, bandwidth and failure
+injection) and measures:
+    single - build + upload one case's artifacts (what the archive queue worker does)
+    sync   - re-archive of unchanged cases in incremental mode
+    queue  - jobs through the durable archive queue: enqueue cost and time to done
+    bulk   - bulk_archive over a directory of synthetic case PDFs
+
+Usage:
+    python archive_benchmark.py [--cases 20] [--latency-ms 40] [--failure-rate 0.05] [--json report.json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from archive_queue import ArchiveQueue
+from bulk_archive import bulk_archive
+from case_artifacts import build_case_artifacts
+from drive_client import DriveSession, FolderCache
+from drive_sync import SyncManifest, MANIFEST_FILENAME, sync_artifacts
+from fake_drive import FakeDriveServer
+from telemetry import percentile
+from upload_engine import DEFAULT_MAX_WORKERS, upload_artifacts
+
+ARCHIVE_FOLDER = 'Forensic_Archive'
+
+SAMPLE_LABELS = [
+    {'description': 'Room', 'score': 0.93, 'mid': '/m/06ht1'},
+    {'description': 'Knife', 'score': 0.71, 'mid': '/m/04ctx'},
+    {'description': 'Floor', 'score': 0.66, 'mid': '/m/01lynh'},
+]
+
+
+def latency_summary(samples_ms):
+    """p50/p90/p99/max of a list of latencies in milliseconds."""
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {'count': 0}
+    return {
+        'count': len(ordered),
+        'p50_ms': round(percentile(ordered, 50), 1),
+        'p90_ms': round(percentile(ordered, 90), 1),
+        'p99_ms': round(percentile(ordered, 99), 1),
+        'max_ms': round(ordered[-1], 1),
+    }
+
+
+def synthetic_case(index, render_kb, pdf_kb):
+    """Artifacts for a synthetic case (random bytes stand in for the render and PDF)."""
+    return build_case_artifacts(
+        f"CASE-BENCH-{index}",
+        f"Benchmark case {index}",
+        render_bytes=os.urandom(render_kb * 1024),
+        forensic_labels=SAMPLE_LABELS,
+        forensic_findings={'brightness': 0.42, 'objects': []},
+        pdf_bytes=os.urandom(pdf_kb * 1024),
+        archived_at='2024-01-01 00:00:00'
+    )
+
+
+class Harness:
+    """Fake Drive server plus a fresh Drive state directory per scenario."""
+
+    def __init__(self, args):
+        self.args = args
+        self.server = FakeDriveServer(
+            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, bandwidth_mbps=args.bandwidth_mbps,
+            failure_rate=args.failure_rate, seed=args.seed
+        ).start()
+        self.session = DriveSession(api_endpoint=self.server.endpoint)
+        self.work_dir = Path(tempfile.mkdtemp(prefix='archive_bench_'))
+
+    def fresh_state(self, name):
+        """Reset the fake Drive and return (folder_cache, manifest, scenario_dir)."""
+        self.server.state.reset()
+        scenario_dir = self.work_dir / name
+        scenario_dir.mkdir()
+        return FolderCache(scenario_dir / "folders.json"), SyncManifest(scenario_dir / MANIFEST_FILENAME), scenario_dir
+
+    def server_stats(self):
+        stats = self.server.state.stats
+        return {
+            'requests': stats['requests'],
+            'failures_injected': stats['failures_injected'],
+            'mb_received': round(stats['bytes_received'] / (1024.0 * 1024.0), 2),
+            'by_kind': dict(stats['by_kind']),
+        }
+
+    def close(self):
+        self.server.stop()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+def run_single(harness):
+    """Upload each case's artifacts in turn (the queue worker's critical path)."""
+    args = harness.args
+    folder_cache, _, _ = harness.fresh_state('single')
+    latencies, total_bytes, chunk_retries, failed = [], 0, 0, 0
+    start = time.perf_counter()
+    for index in range(args.cases):
+        artifacts = synthetic_case(index, args.render_kb, args.pdf_kb)
+        case_start = time.perf_counter()
+        report = upload_artifacts(harness.session, ARCHIVE_FOLDER, folder_cache, artifacts, args.workers)
+        latencies.append((time.perf_counter() - case_start) * 1000.0)
+        total_bytes += report['bytes']
+        chunk_retries += report['chunk_retries']
+        failed += 1 if report['errors'] else 0
+    elapsed = time.perf_counter() - start
+    return {
+        'cases': args.cases,
+        'failed_cases': failed,
+        'latency': latency_summary(latencies),
+        'throughput_mbps': round(total_bytes / (1024.0 * 1024.0) / elapsed, 3),
+        'chunk_retries': chunk_retries,
+        'server': harness.server_stats(),
+    }
+
+
+def run_sync(harness):
+    """Archive every case once, then again unchanged - the second pass should upload nothing."""
+    args = harness.args
+    folder_cache, manifest, _ = harness.fresh_state('sync')
+    cases = [synthetic_case(index, args.render_kb, args.pdf_kb) for index in range(args.cases)]
+    passes = {}
+    for name in ('first', 'repeat'):
+        latencies, uploaded, skipped = [], 0, 0
+        for artifacts in cases:
+            case_start = time.perf_counter()
+            report = sync_artifacts(harness.session, ARCHIVE_FOLDER, folder_cache, manifest, artifacts, args.workers)
+            latencies.append((time.perf_counter() - case_start) * 1000.0)
+            uploaded += report['bytes']
+            skipped += report['skipped_bytes']
+        passes[name] = {
+            'latency': latency_summary(latencies),
+            'uploaded_mb': round(uploaded / (1024.0 * 1024.0), 2),
+            'skipped_mb': round(skipped / (1024.0 * 1024.0), 2),
+        }
+    passes['server'] = harness.server_stats()
+    return passes
+
+
+def run_queue(harness):
+    """Push cases through the durable archive queue and time enqueue and completion."""
+    args = harness.args
+    folder_cache, _, scenario_dir = harness.fresh_state('queue')
+
+    def handler(job, artifacts):
+        report = upload_artifacts(harness.session, ARCHIVE_FOLDER, folder_cache, artifacts, args.workers)
+        return report['results'], report['errors']
+
+    queue = ArchiveQueue(scenario_dir / "archive_queue.sqlite3", handler, workers=args.queue_workers,
+                         retry_base=args.retry_base).start()
+    enqueue_ms, job_ids = [], []
+    start = time.perf_counter()
+    for index in range(args.cases):
+        artifacts = synthetic_case(index, args.render_kb, args.pdf_kb)
+        enqueue_start = time.perf_counter()
+        job_ids.append(queue.enqueue(f"CASE-BENCH-{index}", artifacts))
+        enqueue_ms.append((time.perf_counter() - enqueue_start) * 1000.0)
+
+    deadline = time.time() + args.timeout
+    while time.time() < deadline:
+        stats = queue.stats()
+        if stats['depth'] == 0 and stats['in_flight'] == 0:
+            break
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    queue.stop()
+
+    jobs = [queue.get_job(job_id) for job_id in job_ids]
+    done = [job for job in jobs if job['status'] == 'done']
+    return {
+        'cases': args.cases,
+        'enqueue_latency': latency_summary(enqueue_ms),
+        'job_latency': latency_summary([(job['updated_at'] - job['created_at']) * 1000.0 for job in done]),
+        'done': len(done),
+        'failed': sum(1 for job in jobs if job['status'] == 'failed'),
+        'unfinished': sum(1 for job in jobs if job['status'] in ('queued', 'running')),
+        'retried_jobs': sum(1 for job in done if job['attempts'] > 1),
+        'seconds': round(elapsed, 3),
+        'server': harness.server_stats(),
+    }
+
+
+def run_bulk(harness):
+    """Bulk archive a directory of synthetic PDFs."""
+    args = harness.args
+    folder_cache, manifest, scenario_dir = harness.fresh_state('bulk')
+    local_dir = scenario_dir / "Forensic_Archive"
+    local_dir.mkdir()
+    for index in range(args.bulk_files):
+        (local_dir / f"CASE-BULK-{index}_Case_File.pdf").write_bytes(os.urandom(args.pdf_kb * 1024))
+
+    report = bulk_archive(harness.session, ARCHIVE_FOLDER, folder_cache, manifest, local_dir,
+                          max_workers=args.workers)
+    report['failed_files'] = len(report.pop('errors'))
+    report['server'] = harness.server_stats()
+    return report
+
+
+SCENARIOS = {'single': run_single, 'sync': run_sync, 'queue': run_queue, 'bulk': run_bulk}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the archive pipeline against a local fake Drive.")
+    parser.add_argument('--scenarios', default='single,sync,queue,bulk', help="Comma-separated scenarios to run")
+    parser.add_argument('--cases', type=int, default=10, help="Cases per single/sync/queue scenario")
+    parser.add_argument('--bulk-files', type=int, default=100, help="PDFs in the bulk scenario")
+    parser.add_argument('--render-kb', type=int, default=1536, help="Synthetic render size (KB)")
+    parser.add_argument('--pdf-kb', type=int, default=256, help="Synthetic case PDF size (KB)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS, help="Concurrent uploads per case")
+    parser.add_argument('--queue-workers', type=int, default=2, help="Archive queue worker threads")
+    parser.add_argument('--retry-base', type=float, default=0.5, help="Archive queue retry backoff base (seconds)")
+    parser.add_argument('--latency-ms', type=float, default=40.0, help="Fake Drive latency per request")
+    parser.add_argument('--jitter-ms', type=float, default=10.0, help="Fake Drive random extra latency")
+    parser.add_argument('--bandwidth-mbps', type=float, default=None, help="Fake Drive upload bandwidth (MB/s)")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Fraction of requests failed with 503")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--timeout', type=float, default=300.0, help="Queue scenario drain timeout (seconds)")
+    parser.add_argument('--json', default=None, help="Write the full report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    harness = Harness(args)
+    report = {'config': vars(args), 'results': {}}
+    try:
+        for name in [name.strip() for name in args.scenarios.split(',') if name.strip()]:
+            print(f"== {name} ==")
+            result = SCENARIOS[name](harness)
+            report['results'][name] = result
+            print(json.dumps(result, indent=2))
+    finally:
+        harness.close()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+"""
+Archive Queue - Durable background job queue for cloud archiving.
+Archive jobs (with their in-memory artifacts) are persisted in a local SQLite
+database and processed by background worker threads, so a slow Drive never
+freezes the UI and a process restart never loses a request. Failed uploads are
+retried with exponential backoff; artifacts that already uploaded are not re-sent.
+Several processes may share one database: a claimed job is leased to its process
+(renewed by a heartbeat) and only jobs whose lease expired are taken over.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_ATTEMPTS = 6
+
+# Retry backoff: BASE * 2^(attempt-1) seconds, capped
+RETRY_BASE_SECONDS = 5.0
+RETRY_MAX_SECONDS = 600.0
+
+# How often idle workers poll for due jobs (seconds)
+POLL_INTERVAL = 1.0
+
+# A running job belongs to its process for this long (seconds), renewed every third of it;
+# jobs whose lease runs out (the process died) are requeued
+LEASE_SECONDS = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS archive_jobs (
+    id TEXT PRIMARY KEY,
+    case_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    last_error TEXT,
+    meta_json TEXT,
+    result_json TEXT,
+    owner TEXT,
+    lease_expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_archive_jobs_due ON archive_jobs (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_archive_jobs_case ON archive_jobs (case_id);
+CREATE TABLE IF NOT EXISTS archive_artifacts (
+    job_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    title TEXT NOT NULL,
+    mimetype TEXT NOT NULL,
+    properties_json TEXT,
+    data BLOB,
+    result_json TEXT,
+    PRIMARY KEY (job_id, key)
+);
+"""
+
+# Columns added after the first release (ALTER TABLE on older databases)
+MIGRATIONS = {
+    'owner': "ALTER TABLE archive_jobs ADD COLUMN owner TEXT",
+    'lease_expires_at': "ALTER TABLE archive_jobs ADD COLUMN lease_expires_at REAL",
+}
+
+
+def retry_delay(attempts, base=RETRY_BASE_SECONDS):
+    """Backoff before the next attempt after `attempts` failures."""
+    return min(RETRY_MAX_SECONDS, base * (2 ** max(0, attempts - 1)))
+
+
+class ArchiveQueue:
+    """
+    SQLite-backed archive job queue with background workers.
+    handler(job, artifacts) uploads the pending artifacts and returns (results, errors),
+    both dicts keyed by artifact key. Successful artifacts are recorded immediately;
+    the job is retried (only for the failed artifacts) until max_attempts.
+    on_done(job, results) is called once a job has uploaded every artifact.
+    """
+
+    def __init__(self, db_path, handler, on_done=None, workers=DEFAULT_WORKERS,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, retry_base=RETRY_BASE_SECONDS, lease_seconds=LEASE_SECONDS):
+        self.db_path = Path(db_path)
+        self.handler = handler
+        self.on_done = on_done
+        self.worker_count = workers
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.lease_seconds = lease_seconds
+        # Lease owner: this queue in this process on this host
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._claim_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(archive_jobs)")}
+            for column, statement in MIGRATIONS.items():
+                if column not in columns:
+                    conn.execute(statement)
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection, commit and close it."""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # -- Producer side -------------------------------------------------
+
+    def enqueue(self, case_id, artifacts, meta=None):
+        """
+        Persist an archive job and its artifacts (memory artifacts from upload_engine).
+        Returns the job ID.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO archive_jobs (id, case_id, status, attempts, max_attempts, next_attempt_at, "
+                "created_at, updated_at, meta_json) VALUES (?, ?, 'queued', 0, ?, ?, ?, ?, ?)",
+                (job_id, case_id, self.max_attempts, now, now, now, json.dumps(meta or {}, default=str))
+            )
+            conn.executemany(
+                "INSERT INTO archive_artifacts (job_id, key, title, mimetype, properties_json, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (job_id, key, artifact['title'], artifact['mimetype'],
+                     json.dumps(artifact.get('properties') or {}), sqlite3.Binary(artifact['data']))
+                    for key, artifact in artifacts.items()
+                ]
+            )
+        self._wake.set()
+        return job_id
+
+    # -- Worker side ---------------------------------------------------
+
+    def start(self):
+        """Recover interrupted jobs and start the background workers and lease heartbeat (idempotent)."""
+        if self._threads:
+            return self
+        self.recover()
+        for index in range(self.worker_count):
+            thread = threading.Thread(target=self._worker_loop, name=f"archive-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._heartbeat_loop, name="archive-lease-heartbeat", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=5.0):
+        """Stop the workers (in-flight jobs finish their current attempt)."""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._stop.clear()
+
+    def recover(self):
+        """
+        Requeue jobs left 'running' by a process that died (their lease expired; jobs from
+        before leases have none). Jobs another live process is uploading are left alone.
+        Returns the number recovered.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE archive_jobs SET status='queued', next_attempt_at=?, updated_at=?, owner=NULL, "
+                "lease_expires_at=NULL WHERE status='running' AND (lease_expires_at IS NULL OR lease_expires_at < ?)",
+                (now, now, now)
+            )
+            return cursor.rowcount
+
+    def renew_leases(self):
+        """Extend the leases of this queue's running jobs. Returns the number renewed."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE archive_jobs SET lease_expires_at=? WHERE status='running' AND owner=?",
+                (time.time() + self.lease_seconds, self.owner)
+            )
+            return cursor.rowcount
+
+    def _claim(self):
+        """
+        Atomically move the next due job to 'running' under this queue's lease (taking over
+        jobs whose owner's lease expired). Returns the job row dict or None.
+        """
+        now = time.time()
+        with self._claim_lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, case_id, attempts, max_attempts, meta_json, status FROM archive_jobs "
+                "WHERE (status='queued' AND next_attempt_at <= ?) "
+                "OR (status='running' AND lease_expires_at IS NOT NULL AND lease_expires_at < ?) "
+                "ORDER BY next_attempt_at LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row is None:
+                return None
+            claimed = conn.execute(
+                "UPDATE archive_jobs SET status='running', updated_at=?, owner=?, lease_expires_at=? "
+                "WHERE id=? AND status=? AND (status='queued' OR lease_expires_at < ?)",
+                (now, self.owner, now + self.lease_seconds, row[0], row[5], now)
+            ).rowcount
+        if not claimed:
+            return None  # Another process took it first
+        return {
+            'id': row[0],
+            'case_id': row[1],
+            'attempts': row[2],
+            'max_attempts': row[3],
+            'meta': json.loads(row[4] or '{}'),
+        }
+
+    def _pending_artifacts(self, job_id):
+        """Artifacts of a job that have not uploaded yet."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, title, mimetype, properties_json, data FROM archive_artifacts "
+                "WHERE job_id=? AND result_json IS NULL",
+                (job_id,)
+            ).fetchall()
+        return {
+            row[0]: {
+                'title': row[1],
+                'mimetype': row[2],
+                'properties': json.loads(row[3] or '{}'),
+                'data': bytes(row[4]),
+            }
+            for row in rows
+        }
+
+    def _process(self, job):
+        """Run one attempt of a job and record success, retry or failure."""
+        pending = self._pending_artifacts(job['id'])
+        try:
+            results, errors = self.handler(job, pending) if pending else ({}, {})
+        except Exception as e:
+            results, errors = {}, {key: str(e) for key in pending} or {'job': str(e)}
+
+        now = time.time()
+        with self._connect() as conn:
+            # Record finished artifacts and drop their payload - retries only re-send the rest
+            for key, result in results.items():
+                conn.execute(
+                    "UPDATE archive_artifacts SET result_json=?, data=NULL WHERE job_id=? AND key=?",
+                    (json.dumps(result, default=str), job['id'], key)
+                )
+
+            if not errors:
+                all_results = {
+                    key: json.loads(result_json)
+                    for key, result_json in conn.execute(
+                        "SELECT key, result_json FROM archive_artifacts WHERE job_id=?", (job['id'],)
+                    )
+                }
+                conn.execute(
+                    "UPDATE archive_jobs SET status='done', attempts=?, updated_at=?, last_error=NULL, "
+                    "result_json=?, owner=NULL, lease_expires_at=NULL WHERE id=? AND owner=?",
+                    (job['attempts'] + 1, now, json.dumps(all_results, default=str), job['id'], self.owner)
+                )
+            else:
+                all_results = None
+                attempts = job['attempts'] + 1
+                message = '; '.join(f"{key}: {error}" for key, error in errors.items())[:1000]
+                if attempts >= job['max_attempts']:
+                    conn.execute(
+                        "UPDATE archive_jobs SET status='failed', attempts=?, updated_at=?, last_error=?, "
+                        "owner=NULL, lease_expires_at=NULL WHERE id=? AND owner=?",
+                        (attempts, now, message, job['id'], self.owner)
+                    )
+                else:
+                    conn.execute(
+                        "UPDATE archive_jobs SET status='queued', attempts=?, next_attempt_at=?, updated_at=?, "
+                        "last_error=?, owner=NULL, lease_expires_at=NULL WHERE id=? AND owner=?",
+                        (attempts, now + retry_delay(attempts, self.retry_base), now, message, job['id'], self.owner)
+                    )
+
+        if all_results is not None and self.on_done:
+            try:
+                self.on_done(job, all_results)
+            except Exception:
+                pass  # Post-processing must never fail a job that already uploaded
+
+    def _worker_loop(self):
+        """Claim and process due jobs until stopped."""
+        while not self._stop.is_set():
+            job = None
+            try:
+                job = self._claim()
+            except sqlite3.Error:
+                pass  # Database busy - try again on the next poll
+            if job is None:
+                self._wake.wait(POLL_INTERVAL)
+                self._wake.clear()
+                continue
+            self._process(job)
+
+    def _heartbeat_loop(self):
+        """Renew this queue's leases until stopped, so long uploads are not taken over."""
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                self.renew_leases()
+            except sqlite3.Error:
+                pass  # Database busy - the lease has two more renewals before it expires
+
+    # -- Status ----------------------------------------------------------
+
+    def retry_now(self, job_id):
+        """Requeue a failed or backing-off job for immediate processing."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE archive_jobs SET status='queued', next_attempt_at=?, "
+                "max_attempts=MAX(max_attempts, attempts + 1), updated_at=? "
+                "WHERE id=? AND status IN ('queued', 'failed')",
+                (time.time(), time.time(), job_id)
+            )
+        self._wake.set()
+
+    def stats(self):
+        """Queue depth, in-flight count and totals per status."""
+        with self._connect() as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM archive_jobs GROUP BY status").fetchall())
+        return {
+            'depth': counts.get('queued', 0),
+            'in_flight': counts.get('running', 0),
+            'done': counts.get('done', 0),
+            'failed': counts.get('failed', 0),
+        }
+
+    def get_job(self, job_id):
+        """Status dict for one job (None if unknown)."""
+        jobs = self._select_jobs("WHERE id=?", (job_id,))
+        return jobs[0] if jobs else None
+
+    def jobs_for_case(self, case_id):
+        """All jobs for a case, newest first."""
+        return self._select_jobs("WHERE case_id=? ORDER BY created_at DESC", (case_id,))
+
+    def recent_jobs(self, limit=10):
+        """Most recent jobs, newest first."""
+        return self._select_jobs("ORDER BY created_at DESC LIMIT ?", (limit,))
+
+    def _select_jobs(self, clause, params):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, case_id, status, attempts, max_attempts, next_attempt_at, created_at, "
+                f"updated_at, last_error, meta_json, result_json FROM archive_jobs {clause}",
+                params
+            ).fetchall()
+        return [
+            {
+                'id': row[0],
+                'case_id': row[1],
+                'status': row[2],
+                'attempts': row[3],
+                'max_attempts': row[4],
+                'next_attempt_at': row[5],
+                'created_at': row[6],
+                'updated_at': row[7],
+                'last_error': row[8],
+                'meta': json.loads(row[9] or '{}'),
+                'results': json.loads(row[10]) if row[10] else None,
+            }
+            for row in rows
+        ]
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_archive_queue(db_path, handler, on_done=None, workers=DEFAULT_WORKERS):
+    """
+    Return the process-wide queue for a database, creating and starting it on first use.
+    Every Streamlit session shares the same workers.
+    """
+    key = str(Path(db_path).resolve())
+    with _queues_lock:
+        queue = _queues.get(key)
+        if queue is None:
+            queue = ArchiveQueue(db_path, handler, on_done=on_done, workers=workers).start()
+            _queues[key] = queue
+        return queue
@@ -0,0 +1,196 @@
+"""
+Bulk Archive - Push the local Forensic_Archive backlog to Drive in one run.
+The folder is resolved and listed once, unchanged files are skipped by MD5,
+metadata for new files is created in Drive batch requests (up to 100 per HTTP
+round trip), and file content is then streamed from disk with bounded concurrency.
+
+Usage:
+    python bulk_archive.py [--dir Forensic_Archive] [--workers 4] [--dry-run]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from googleapiclient.http import BatchHttpRequest
+
+from drive_client import FolderCache, get_drive_session, resolve_folder
+from drive_sync import SyncManifest, MANIFEST_FILENAME, list_folder, plan_sync
+from upload_engine import (DEFAULT_MAX_WORKERS, MAX_CHUNK_RETRIES, backoff_delay, build_file_body,
+                           file_artifact, is_retriable, upload_artifacts)
+
+# Drive accepts at most 100 calls per batch request
+BATCH_SIZE = 100
+
+DEFAULT_FOLDER = 'Forensic_Archive'
+
+
+def collect_local_artifacts(local_dir, pattern='*.pdf', mimetype='application/pdf'):
+    """File artifacts for every matching file in the local archive, keyed by file name."""
+    return {
+        path.name: file_artifact(path.name, path, mimetype, {'Source': 'bulk_archive'})
+        for path in sorted(Path(local_dir).glob(pattern))
+    }
+
+
+def create_metadata_batched(session, folder_id, artifacts, batch_size=BATCH_SIZE):
+    """
+    Create empty Drive files for the given artifacts in batch requests.
+    A failed batch, or individual calls failing with a retriable error, are retried
+    with backoff; other per-call errors are reported.
+    Returns ({key: file_id}, {key: error}, number_of_batches).
+    """
+    file_ids = {}
+    errors = {}
+    batches = 0
+    pending = list(artifacts)
+    attempt = 0
+    while pending:
+        retry = []
+        for start in range(0, len(pending), batch_size):
+            keys = pending[start:start + batch_size]
+
+            def on_response(request_id, response, exception):
+                if exception is None:
+                    file_ids[request_id] = response['id']
+                elif is_retriable(exception) and attempt < MAX_CHUNK_RETRIES:
+                    retry.append(request_id)
+                else:
+                    errors[request_id] = str(exception)
+
+            batch = BatchHttpRequest(callback=on_response, batch_uri=session.batch_uri)
+            for key in keys:
+                artifact = artifacts[key]
+                batch.add(
+                    session.service.files().insert(
+                        body=build_file_body(artifact['title'], folder_id, artifact.get('properties')),
+                        fields='id'
+                    ),
+                    request_id=key
+                )
+            batches += 1
+            try:
+                session.ensure_fresh()
+                batch.execute(http=session.http())
+            except Exception as e:
+                if not is_retriable(e) or attempt >= MAX_CHUNK_RETRIES:
+                    errors.update({key: str(e) for key in keys if key not in file_ids})
+                    continue
+                retry.extend(key for key in keys if key not in file_ids and key not in retry)
+        pending = retry
+        if pending:
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+    return file_ids, errors, batches
+
+
+def bulk_archive(session, folder_name, folder_cache, manifest, local_dir, pattern='*.pdf',
+                 max_workers=DEFAULT_MAX_WORKERS, telemetry=None, progress=None, dry_run=False):
+    """
+    Archive every local file matching pattern into the Drive folder.
+    progress(done, total, bytes_done) is called as each upload finishes.
+
+    Returns a report dict: counts per action, uploaded bytes, wall time, throughput (MB/s),
+    metadata batches, chunk retries and per-file errors.
+    """
+    start = time.perf_counter()
+    artifacts = collect_local_artifacts(local_dir, pattern)
+
+    folder_id, _ = resolve_folder(session, folder_name, folder_cache)
+    remote = list_folder(session, folder_id)
+    plan = plan_sync(artifacts, remote)
+
+    to_create = {key: artifacts[key] for key, step in plan.items() if step['action'] == 'create'}
+    to_update = {key: artifacts[key] for key, step in plan.items() if step['action'] == 'update'}
+    report = {
+        'files': len(artifacts),
+        'created': len(to_create),
+        'updated': len(to_update),
+        'skipped': len(artifacts) - len(to_create) - len(to_update),
+        'bytes': 0,
+        'seconds': 0.0,
+        'throughput_mbps': None,
+        'batches': 0,
+        'chunk_retries': 0,
+        'errors': {},
+    }
+    if dry_run or not (to_create or to_update):
+        report['seconds'] = round(time.perf_counter() - start, 3)
+        return report
+
+    # Phase 1: metadata for new files, batched
+    file_ids, errors, report['batches'] = create_metadata_batched(session, folder_id, to_create)
+    report['errors'].update(errors)
+
+    # Phase 2: stream content into the new and changed files with bounded concurrency
+    pending = {key: dict(artifact, file_id=file_ids[key]) for key, artifact in to_create.items() if key in file_ids}
+    pending.update({key: dict(artifact, file_id=plan[key]['file_id']) for key, artifact in to_update.items()})
+    total = len(pending)
+    state = {'done': 0, 'bytes': 0}
+
+    def on_upload(key, result, error):
+        state['done'] += 1
+        if result:
+            state['bytes'] += result['bytes']
+        if progress is not None:
+            progress(state['done'], total, state['bytes'])
+
+    upload_report = upload_artifacts(
+        session, folder_name, folder_cache, pending, max_workers, telemetry, progress=on_upload
+    )
+    report['errors'].update(upload_report['errors'])
+    manifest.record({
+        artifacts[key]['title']: (result['id'], plan[key]['md5'])
+        for key, result in upload_report['results'].items()
+    })
+
+    elapsed = time.perf_counter() - start
+    report['bytes'] = upload_report['bytes']
+    report['seconds'] = round(elapsed, 3)
+    report['throughput_mbps'] = round(report['bytes'] / (1024.0 * 1024.0) / elapsed, 3) if elapsed > 0 else None
+    report['chunk_retries'] = upload_report['chunk_retries']
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk archive local case files to Google Drive.")
+    parser.add_argument('--dir', default=DEFAULT_FOLDER, help="Local archive directory (default: Forensic_Archive)")
+    parser.add_argument('--pattern', default='*.pdf', help="File glob within the directory (default: *.pdf)")
+    parser.add_argument('--folder', default=DEFAULT_FOLDER, help="Drive folder title (default: Forensic_Archive)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS, help="Concurrent uploads")
+    parser.add_argument('--credentials', default='cloud_key.json', help="Service-account key file")
+    parser.add_argument('--endpoint', default=None, help="Alternative Drive API endpoint (e.g. a local fake Drive)")
+    parser.add_argument('--state-dir', default='.drive_state', help="Folder cache and sync manifest directory")
+    parser.add_argument('--dry-run', action='store_true', help="Only report what would be uploaded")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    state_dir = Path(args.state_dir)
+    session = get_drive_session(args.credentials if not args.endpoint else None, args.endpoint)
+    folder_cache = FolderCache(state_dir / "folders.json")
+    manifest = SyncManifest(state_dir / MANIFEST_FILENAME)
+
+    def show_progress(done, total, bytes_done):
+        print(f"\r[{done}/{total}] {bytes_done / (1024.0 * 1024.0):.1f} MB uploaded", end='', flush=True)
+
+    report = bulk_archive(
+        session, args.folder, folder_cache, manifest, args.dir, args.pattern,
+        max_workers=args.workers, progress=show_progress, dry_run=args.dry_run
+    )
+    print()
+    print(f"Files: {report['files']} | New: {report['created']} | Changed: {report['updated']} | "
+          f"Unchanged: {report['skipped']}")
+    if not args.dry_run:
+        print(f"Uploaded {report['bytes'] / (1024.0 * 1024.0):.1f} MB in {report['seconds']:.1f}s "
+              f"({report['throughput_mbps']} MB/s, {report['batches']} metadata batches, "
+              f"{report['chunk_retries']} chunk retries)")
+    for key, error in report['errors'].items():
+        print(f"FAILED {key}: {error}", file=sys.stderr)
+    return 1 if report['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
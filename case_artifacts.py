@@ -0,0 +1,121 @@
+"""
+Case Artifacts - Builds the in-memory files archived for a case.
+The findings report (text), a structured JSON findings document, the render
+bytes and the case PDF are all produced as upload artifacts, so nothing is
+written to a temporary file on the way to Drive.
+"""
+
+import json
+import time
+
+from forensic_vision import is_underexposed
+from relevance import score_labels
+from upload_engine import memory_artifact
+
+# Number of labels included in the archived findings
+ARCHIVE_LABEL_LIMIT = 10
+
+
+def build_findings_text(case_id, headline, forensic_labels=None, forensic_findings=None, archived_at=None):
+    """Plain-text findings report (the format analysts read in Drive)."""
+    archived_at = archived_at or time.strftime('%Y-%m-%d %H:%M:%S')
+    findings_text = f"Case ID: {case_id}\n"
+    findings_text += f"Headline: {headline}\n"
+    findings_text += f"Archived: {archived_at}\n\n"
+    findings_text += "=" * 50 + "\n"
+    findings_text += "AI FORENSIC FINDINGS\n"
+    findings_text += "=" * 50 + "\n\n"
+
+    if forensic_labels:
+        findings_text += "Label Detections:\n"
+        findings_text += "-" * 50 + "\n"
+        top_labels = forensic_labels[:ARCHIVE_LABEL_LIMIT]
+        for label, (relevance_score, category) in zip(top_labels, score_labels(top_labels)):
+            description = label.get('description', 'Unknown')
+            score = label.get('score', 0)
+            confidence_pct = int(score * 100)
+            findings_text += f"\n• {description}\n"
+            findings_text += f"  Confidence: {confidence_pct}%\n"
+            findings_text += f"  Relevance: {relevance_score}/100 ({category})\n"
+
+        # Object localization and exposure from the structured findings
+        if forensic_findings:
+            if forensic_findings.get('objects'):
+                findings_text += "\nLocalized Objects:\n"
+                findings_text += "-" * 50 + "\n"
+                for obj in forensic_findings['objects']:
+                    findings_text += f"• {obj['name']} ({int(obj['score'] * 100)}%) box={obj['box']}\n"
+            if forensic_findings.get('brightness') is not None:
+                findings_text += f"\nScene Brightness: {int(forensic_findings['brightness'] * 100)}%\n"
+
+        # Check for darkness warning
+        if is_underexposed(forensic_findings):
+            findings_text += "\n⚠️ WARNING: Scene underexposed. Checking 3D lighting...\n"
+    else:
+        findings_text += "No forensic scan data available.\n"
+
+    return findings_text
+
+
+def build_findings_document(case_id, headline, forensic_labels=None, forensic_findings=None, archived_at=None):
+    """Machine-readable findings document (labels with relevance, colors, objects, exposure)."""
+    labels = []
+    if forensic_labels:
+        top_labels = forensic_labels[:ARCHIVE_LABEL_LIMIT]
+        for label, (relevance_score, category) in zip(top_labels, score_labels(top_labels)):
+            labels.append({
+                'description': label.get('description', 'Unknown'),
+                'confidence': label.get('score', 0),
+                'mid': label.get('mid'),
+                'relevance': relevance_score,
+                'category': category,
+            })
+
+    findings = forensic_findings or {}
+    return {
+        'case_id': case_id,
+        'headline': headline,
+        'archived_at': archived_at or time.strftime('%Y-%m-%d %H:%M:%S'),
+        'labels': labels,
+        'objects': findings.get('objects', []),
+        'dominant_colors': findings.get('dominant_colors', []),
+        'brightness': findings.get('brightness'),
+        'underexposed': is_underexposed(forensic_findings),
+        'local_quality': findings.get('local_quality'),
+    }
+
+
+def build_case_artifacts(case_id, headline, render_bytes=None, forensic_labels=None,
+                         forensic_findings=None, pdf_bytes=None, archived_at=None):
+    """
+    All uploadable artifacts for a case, keyed by result name
+    ('render', 'findings', 'findings_json', 'pdf'), built entirely in memory.
+    Pass a fixed archived_at (e.g. the render time) to get byte-identical findings
+    for unchanged evidence, so incremental sync can skip them.
+    """
+    properties = {'Case ID': case_id, 'Headline': headline[:100]}
+    archived_at = archived_at or time.strftime('%Y-%m-%d %H:%M:%S')
+    artifacts = {}
+
+    if render_bytes:
+        artifacts['render'] = memory_artifact(f"{case_id}_render.png", render_bytes, 'image/png', properties)
+
+    artifacts['findings'] = memory_artifact(
+        f"{case_id}_findings.txt",
+        build_findings_text(case_id, headline, forensic_labels, forensic_findings, archived_at),
+        'text/plain',
+        properties
+    )
+
+    document = build_findings_document(case_id, headline, forensic_labels, forensic_findings, archived_at)
+    artifacts['findings_json'] = memory_artifact(
+        f"{case_id}_findings.json",
+        json.dumps(document, indent=2, default=str),
+        'application/json',
+        properties
+    )
+
+    if pdf_bytes:
+        artifacts['pdf'] = memory_artifact(f"{case_id}_Case_File.pdf", pdf_bytes, 'application/pdf', properties)
+
+    return artifacts
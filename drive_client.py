@@ -0,0 +1,234 @@
+"""
+Drive Client - Long-lived Google Drive (v2 API) session for case archiving.
+The service-account credentials and API client are built once per process and
+shared across Streamlit sessions and background workers; access tokens are
+refreshed in place. Folder IDs are resolved once and persisted to disk, and the
+cached ID is only dropped when Drive answers 404 for it.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import httplib2
+from google.oauth2 import service_account
+from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+DRIVE_SCOPES = ['https://www.googleapis.com/auth/drive']
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+# Socket timeout for Drive requests (seconds)
+HTTP_TIMEOUT = 60
+
+# Retries googleapiclient performs itself for 5xx/429 on non-upload requests
+REQUEST_RETRIES = 3
+
+
+def is_not_found(error):
+    """True if an exception is a Drive 404 (deleted or inaccessible file/folder)."""
+    return isinstance(error, HttpError) and getattr(error.resp, 'status', None) == 404
+
+
+class PlainEndpointHttp:
+    """
+    httplib2 wrapper for plain-HTTP endpoints (e.g. a local fake Drive).
+    googleapiclient moves media-upload URLs onto the overridden host but keeps their
+    https scheme; this rewrites them back to http for that host.
+    """
+
+    def __init__(self, http, api_endpoint):
+        self._http = http
+        netloc = api_endpoint[len('http://'):].split('/')[0]
+        self._https_prefix = f"https://{netloc}/"
+        self._http_prefix = f"http://{netloc}/"
+
+    def request(self, uri, *args, **kwargs):
+        if uri.startswith(self._https_prefix):
+            uri = self._http_prefix + uri[len(self._https_prefix):]
+        return self._http.request(uri, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._http, name)
+
+
+class DriveSession:
+    """
+    Process-wide Drive v2 client.
+    Credentials are loaded once; each thread gets its own authorized HTTP transport
+    (httplib2 is not thread-safe), and expired tokens are refreshed before use.
+    api_endpoint points the client at another server (e.g. a local fake Drive) and
+    credentials_path=None sends unauthenticated requests to it.
+    """
+
+    def __init__(self, credentials_path=None, api_endpoint=None):
+        self.credentials_path = credentials_path
+        self.api_endpoint = api_endpoint.rstrip('/') if api_endpoint else None
+        self.credentials = None
+        if credentials_path:
+            self.credentials = service_account.Credentials.from_service_account_file(
+                str(credentials_path), scopes=DRIVE_SCOPES
+            )
+        self._refresh_lock = threading.Lock()
+        self._local = threading.local()
+
+        client_options = {'api_endpoint': f"{self.api_endpoint}/drive/v2/"} if self.api_endpoint else None
+        # Built once - parsing the discovery document is the expensive part
+        self.service = build(
+            'drive', 'v2',
+            http=self._build_http(),
+            client_options=client_options,
+            cache_discovery=False,
+        )
+
+    def _build_http(self):
+        http = httplib2.Http(timeout=HTTP_TIMEOUT)
+        # Resumable uploads answer 308 without a Location - it is not a redirect
+        http.redirect_codes = http.redirect_codes - {308}
+        if self.credentials is None:
+            if self.api_endpoint and self.api_endpoint.startswith('http://'):
+                return PlainEndpointHttp(http, self.api_endpoint)
+            return http
+        return AuthorizedHttp(self.credentials, http=http)
+
+    def ensure_fresh(self):
+        """Refresh the access token if it is missing or expired (shared across threads)."""
+        if self.credentials is None or self.credentials.valid:
+            return
+        with self._refresh_lock:
+            if not self.credentials.valid:
+                self.credentials.refresh(Request())
+
+    def http(self):
+        """Authorized HTTP transport for the calling thread."""
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = self._build_http()
+            self._local.http = http
+        return http
+
+    def execute(self, request, num_retries=REQUEST_RETRIES):
+        """Execute a googleapiclient request on this thread's transport with a fresh token."""
+        self.ensure_fresh()
+        return request.execute(http=self.http(), num_retries=num_retries)
+
+    @property
+    def batch_uri(self):
+        """Batch endpoint matching the API endpoint this session talks to."""
+        root = self.api_endpoint or 'https://www.googleapis.com'
+        return f"{root}/batch/drive/v2"
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_drive_session(credentials_path=None, api_endpoint=None):
+    """
+    Return the shared DriveSession for these credentials/endpoint, creating it on first use.
+    Repeat archives reuse the same client and token instead of re-authenticating.
+    """
+    key = (str(credentials_path) if credentials_path else None, api_endpoint)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = DriveSession(credentials_path, api_endpoint)
+            _sessions[key] = session
+        return session
+
+
+def reset_drive_session(credentials_path=None, api_endpoint=None):
+    """Drop a cached session (e.g. after the service-account key file is replaced)."""
+    key = (str(credentials_path) if credentials_path else None, api_endpoint)
+    with _sessions_lock:
+        _sessions.pop(key, None)
+
+
+class FolderCache:
+    """Persisted folder-title -> Drive folder-ID map."""
+
+    def __init__(self, cache_path):
+        self.cache_path = Path(cache_path)
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, data):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.cache_path)
+
+    def get(self, folder_name):
+        return self._load().get(folder_name)
+
+    def set(self, folder_name, folder_id):
+        with self._lock:
+            data = self._load()
+            data[folder_name] = folder_id
+            self._save(data)
+
+    def invalidate(self, folder_name):
+        with self._lock:
+            data = self._load()
+            if data.pop(folder_name, None) is not None:
+                self._save(data)
+
+
+def find_or_create_folder(session, folder_name):
+    """Look up a folder by title in Drive, creating it if missing. Returns the folder ID."""
+    safe_name = folder_name.replace("'", "\\'")
+    response = session.execute(session.service.files().list(
+        q=f"title='{safe_name}' and mimeType='{FOLDER_MIME_TYPE}' and trashed=false",
+        fields='items(id,title)',
+        maxResults=1,
+    ))
+    items = response.get('items', [])
+    if items:
+        return items[0]['id']
+
+    folder = session.execute(session.service.files().insert(
+        body={'title': folder_name, 'mimeType': FOLDER_MIME_TYPE},
+        fields='id',
+    ))
+    return folder['id']
+
+
+def resolve_folder(session, folder_name, folder_cache):
+    """
+    Return the folder ID, from the persisted cache when possible.
+    Only a cache miss costs a Drive round trip.
+    Returns (folder_id, cache_hit).
+    """
+    folder_id = folder_cache.get(folder_name)
+    if folder_id:
+        return folder_id, True
+    folder_id = find_or_create_folder(session, folder_name)
+    folder_cache.set(folder_name, folder_id)
+    return folder_id, False
+
+
+def with_folder(session, folder_name, folder_cache, operation):
+    """
+    Run operation(folder_id) against the cached folder ID.
+    If Drive answers 404 (folder deleted/moved), the cache entry is invalidated,
+    the folder is resolved again and the operation is retried once.
+    """
+    folder_id, _ = resolve_folder(session, folder_name, folder_cache)
+    try:
+        return operation(folder_id)
+    except Exception as e:
+        if not is_not_found(e):
+            raise
+        folder_cache.invalidate(folder_name)
+        folder_id, _ = resolve_folder(session, folder_name, folder_cache)
+        return operation(folder_id)
@@ -0,0 +1,206 @@
+"""
+Drive Sync - Content-hash incremental sync of case artifacts to Drive.
+Artifacts are identified by title and compared by MD5 against the md5Checksum
+Drive reports for the archive folder (fetched in one paged listing per sync).
+Unchanged artifacts are skipped, changed ones are updated in place and only new
+titles are created. A local manifest records what was uploaded so the local
+Forensic_Archive can be reconciled against the cloud folder.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from drive_client import with_folder
+from upload_engine import DEFAULT_MAX_WORKERS, drive_link, upload_artifacts
+
+# Files per page when listing the archive folder (Drive v2 maximum is 1000)
+LIST_PAGE_SIZE = 1000
+
+MANIFEST_FILENAME = "sync_manifest.json"
+
+_manifest_lock = threading.Lock()
+
+
+def md5_hex(data):
+    """MD5 of in-memory bytes (Drive's md5Checksum format)."""
+    return hashlib.md5(data).hexdigest()
+
+
+def file_md5(path, block_size=1024 * 1024):
+    """MD5 of a file, streamed in blocks."""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def artifact_md5(artifact):
+    """MD5 of an artifact's content (memory or file)."""
+    if artifact.get('data') is not None:
+        return md5_hex(artifact['data'])
+    return file_md5(artifact['path'])
+
+
+def list_folder(session, folder_id, page_size=LIST_PAGE_SIZE):
+    """
+    Every non-trashed file in a Drive folder, in as few paged requests as possible.
+    Returns {title: {'id', 'md5', 'size'}}; for duplicate titles the most recently
+    modified file wins.
+    """
+    remote = {}
+    page_token = None
+    while True:
+        response = session.execute(session.service.files().list(
+            q=f"'{folder_id}' in parents and trashed=false",
+            fields='nextPageToken,items(id,title,md5Checksum,fileSize)',
+            orderBy='modifiedDate desc',
+            maxResults=page_size,
+            pageToken=page_token,
+        ))
+        for item in response.get('items', []):
+            remote.setdefault(item['title'], {
+                'id': item['id'],
+                'md5': item.get('md5Checksum'),
+                'size': int(item.get('fileSize') or 0),
+            })
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return remote
+
+
+class SyncManifest:
+    """Persisted title -> {id, md5, synced_at} record of artifacts uploaded to Drive."""
+
+    def __init__(self, manifest_path):
+        self.manifest_path = Path(manifest_path)
+
+    def load(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, data):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def record(self, entries):
+        """Record uploaded artifacts: entries maps title -> (file_id, md5)."""
+        if not entries:
+            return
+        with _manifest_lock:
+            data = self.load()
+            for title, (file_id, md5) in entries.items():
+                data[title] = {'id': file_id, 'md5': md5, 'synced_at': time.time()}
+            self._save(data)
+
+
+def plan_sync(artifacts, remote):
+    """
+    Decide per artifact whether to skip, update or create it.
+    Returns {key: {'action', 'md5', 'file_id'}}.
+    """
+    plan = {}
+    for key, artifact in artifacts.items():
+        md5 = artifact_md5(artifact)
+        existing = remote.get(artifact['title'])
+        if existing is None:
+            plan[key] = {'action': 'create', 'md5': md5, 'file_id': None}
+        elif existing['md5'] == md5:
+            plan[key] = {'action': 'skip', 'md5': md5, 'file_id': existing['id']}
+        else:
+            plan[key] = {'action': 'update', 'md5': md5, 'file_id': existing['id']}
+    return plan
+
+
+def sync_artifacts(session, folder_name, folder_cache, manifest, artifacts, max_workers=DEFAULT_MAX_WORKERS,
+                   telemetry=None):
+    """
+    Incrementally sync artifacts into a Drive folder.
+    One folder listing decides the plan; only new and changed artifacts are uploaded
+    (changed ones via files.update, keeping their Drive ID and link).
+
+    Returns the upload_artifacts report extended with 'actions' (key -> skip/update/create)
+    and 'skipped_bytes'; skipped artifacts appear in 'results' with skipped=True.
+    """
+    def list_remote(folder_id):
+        return list_folder(session, folder_id)
+
+    if telemetry is None:
+        remote = with_folder(session, folder_name, folder_cache, list_remote)
+    else:
+        with telemetry.track('drive', 'list') as call:
+            remote = with_folder(session, folder_name, folder_cache, list_remote)
+            call['result_bytes'] = len(remote)
+
+    plan = plan_sync(artifacts, remote)
+    pending = {
+        key: dict(artifact, file_id=plan[key]['file_id'])
+        for key, artifact in artifacts.items()
+        if plan[key]['action'] != 'skip'
+    }
+
+    report = upload_artifacts(session, folder_name, folder_cache, pending, max_workers, telemetry)
+
+    skipped_bytes = 0
+    for key, step in plan.items():
+        if step['action'] == 'skip':
+            size = remote[artifacts[key]['title']]['size']
+            skipped_bytes += size
+            report['results'][key] = {
+                'id': step['file_id'],
+                'link': drive_link(step['file_id']),
+                'bytes': 0,
+                'seconds': 0.0,
+                'resumable': False,
+                'chunk_retries': 0,
+                'skipped': True,
+            }
+
+    manifest.record({
+        artifacts[key]['title']: (result['id'], plan[key]['md5'])
+        for key, result in report['results'].items()
+    })
+    report['actions'] = {key: step['action'] for key, step in plan.items()}
+    report['skipped_bytes'] = skipped_bytes
+    return report
+
+
+def reconcile_local(session, folder_name, folder_cache, manifest, local_dir, pattern='*.pdf'):
+    """
+    Compare local archive files against the Drive folder using one paged listing.
+    Returns dict of title lists: in_sync, changed (local content differs from Drive),
+    local_only, remote_only - plus manifest_drift (Drive content differs from what we uploaded).
+    """
+    remote = with_folder(session, folder_name, folder_cache, lambda fid: list_folder(session, fid))
+    recorded = manifest.load()
+
+    local_files = {path.name: path for path in sorted(Path(local_dir).glob(pattern))}
+    report = {'in_sync': [], 'changed': [], 'local_only': [], 'remote_only': [], 'manifest_drift': []}
+    for title, path in local_files.items():
+        existing = remote.get(title)
+        if existing is None:
+            report['local_only'].append(title)
+        elif existing['md5'] == file_md5(path):
+            report['in_sync'].append(title)
+        else:
+            report['changed'].append(title)
+
+    suffix = pattern.lstrip('*')
+    for title, existing in remote.items():
+        if title.endswith(suffix) and title not in local_files:
+            report['remote_only'].append(title)
+        entry = recorded.get(title)
+        if entry and entry['md5'] != existing['md5']:
+            report['manifest_drift'].append(title)
+    return report
+
@@ -0,0 +1,499 @@
+"""
+Fake Drive - Local stand-in for the subset of the Drive v2 API used by the archive.
+Implements files.insert (metadata, multipart and resumable uploads), files.update
+(multipart and resumable), files.get, files.list with title / mimeType / parent /
+trashed queries and paging, and batch requests. Files live in memory.
+
+Latency, bandwidth and failure injection are tunable, so the archive pipeline can
+be benchmarked (see archive_benchmark.py) without touching Google.
+
+Usage:
+    python fake_drive.py [--port 8765] [--latency-ms 50] [--failure-rate 0.05]
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FILES_PATH = '/drive/v2/files'
+UPLOAD_PATH = '/upload/drive/v2/files'
+BATCH_PATH = '/batch/drive/v2'
+
+# Status returned for injected failures (retriable, like a Drive backend error)
+INJECTED_FAILURE_STATUS = 503
+
+QUERY_TERM = re.compile(
+    r"^(?:(?P<field>title|mimeType)\s*=\s*'(?P<value>(?:[^'\\]|\\.)*)'"
+    r"|'(?P<parent>[^']+)'\s+in\s+parents"
+    r"|trashed\s*=\s*(?P<trashed>true|false))$"
+)
+
+HEAD_BREAK = re.compile(rb'\r?\n\r?\n')
+LINE_BREAK = re.compile(rb'\r?\n')
+
+
+def split_head(blob):
+    """Split a header block from the content that follows the first blank line."""
+    match = HEAD_BREAK.search(blob)
+    if not match:
+        return blob, b''
+    return blob[:match.start()], blob[match.end():]
+
+
+def parse_headers(lines):
+    """Header lines -> dict (names as sent); folded continuation lines are unfolded."""
+    headers = {}
+    name = None
+    for line in lines:
+        if line[:1] in (b' ', b'\t') and name:
+            headers[name] += ' ' + line.decode('latin-1').strip()
+        elif b':' in line:
+            name, value = line.split(b':', 1)
+            name = name.decode('latin-1').strip()
+            headers[name] = value.decode('latin-1').strip()
+    return headers
+
+
+def split_multipart(body, boundary):
+    """Split a multipart body into (headers, content) parts; accepts LF or CRLF line endings."""
+    parts = []
+    delimiter = b'--' + boundary.encode('latin-1')
+    for chunk in body.split(delimiter)[1:]:
+        if chunk.startswith(b'--'):
+            break
+        # Drop the line break after the delimiter and the one before the next delimiter
+        chunk = re.sub(rb'\A\r?\n', b'', chunk)
+        chunk = re.sub(rb'\r?\n\Z', b'', chunk)
+        head, content = split_head(chunk)
+        headers = {name.lower(): value for name, value in parse_headers(LINE_BREAK.split(head)).items()}
+        parts.append((headers, content))
+    return parts
+
+
+def boundary_of(content_type):
+    """Boundary parameter of a multipart Content-Type header."""
+    match = re.search(r'boundary="?([^";]+)"?', content_type or '')
+    return match.group(1) if match else None
+
+
+class FakeDriveState:
+    """In-memory Drive: files, resumable sessions and request counters."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, bandwidth_mbps=None, failure_rate=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.bandwidth_mbps = bandwidth_mbps
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.files = {}
+            self.contents = {}
+            self.sessions = {}
+            self.stats = {'requests': 0, 'failures_injected': 0, 'bytes_received': 0, 'batches': 0, 'by_kind': {}}
+
+    def count(self, kind, payload_bytes=0):
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['bytes_received'] += payload_bytes
+            self.stats['by_kind'][kind] = self.stats['by_kind'].get(kind, 0) + 1
+
+    def should_fail(self):
+        with self.lock:
+            if self.failure_rate and self.random.random() < self.failure_rate:
+                self.stats['failures_injected'] += 1
+                return True
+        return False
+
+    def delay(self, payload_bytes=0):
+        """Simulated round-trip latency plus transfer time for the payload."""
+        with self.lock:
+            seconds = (self.latency_ms + self.random.uniform(0, self.jitter_ms)) / 1000.0
+        if self.bandwidth_mbps:
+            seconds += payload_bytes / (self.bandwidth_mbps * 1024.0 * 1024.0)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    # -- File operations -------------------------------------------------
+
+    def create(self, metadata, content=None):
+        file_id = uuid.uuid4().hex[:28]
+        item = {
+            'kind': 'drive#file',
+            'id': file_id,
+            'title': metadata.get('title', 'Untitled'),
+            'mimeType': metadata.get('mimeType', 'application/octet-stream'),
+            'parents': [{'id': parent['id']} for parent in metadata.get('parents', [])],
+            'properties': metadata.get('properties', []),
+            'labels': {'trashed': False},
+        }
+        with self.lock:
+            self.files[file_id] = item
+            self._set_content(file_id, content)
+        return dict(item)
+
+    def update(self, file_id, metadata, content=None):
+        with self.lock:
+            item = self.files.get(file_id)
+            if item is None:
+                return None
+            for key in ('title', 'mimeType', 'properties'):
+                if key in metadata:
+                    item[key] = metadata[key]
+            if 'parents' in metadata:
+                item['parents'] = [{'id': parent['id']} for parent in metadata['parents']]
+            if content is not None:
+                self._set_content(file_id, content)
+            else:
+                item['modifiedDate'] = self._now()
+            return dict(item)
+
+    def _set_content(self, file_id, content):
+        item = self.files[file_id]
+        item['modifiedDate'] = self._now()
+        if content is None:
+            return
+        self.contents[file_id] = content
+        item['md5Checksum'] = hashlib.md5(content).hexdigest()
+        item['fileSize'] = str(len(content))
+
+    def _now(self):
+        return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime()) + f".{int(time.time() * 1000) % 1000:03d}Z"
+
+    def get(self, file_id):
+        with self.lock:
+            item = self.files.get(file_id)
+            return dict(item) if item else None
+
+    def list(self, query, max_results=100, page_token=None, order_by=None):
+        """Evaluate a Drive v2 query (conjunction of supported terms) with paging."""
+        terms = [term.strip() for term in re.split(r'\s+and\s+', query or '') if term.strip()]
+        matchers = []
+        for term in terms:
+            match = QUERY_TERM.match(term)
+            if not match:
+                raise ValueError(f"Unsupported query term: {term}")
+            matchers.append(match.groupdict())
+
+        with self.lock:
+            items = [dict(item) for item in self.files.values() if all(self._matches(item, m) for m in matchers)]
+        if order_by and order_by.startswith('modifiedDate'):
+            items.sort(key=lambda item: item['modifiedDate'], reverse=order_by.endswith('desc'))
+
+        offset = int(page_token or 0)
+        page = items[offset:offset + max_results]
+        response = {'kind': 'drive#fileList', 'items': page}
+        if offset + max_results < len(items):
+            response['nextPageToken'] = str(offset + max_results)
+        return response
+
+    def _matches(self, item, matcher):
+        if matcher['field']:
+            value = matcher['value'].replace("\\'", "'").replace('\\\\', '\\')
+            return item.get(matcher['field']) == value
+        if matcher['parent']:
+            return any(parent['id'] == matcher['parent'] for parent in item['parents'])
+        return item['labels']['trashed'] == (matcher['trashed'] == 'true')
+
+    # -- Resumable sessions ------------------------------------------------
+
+    def open_session(self, metadata, file_id, total):
+        session_id = uuid.uuid4().hex
+        with self.lock:
+            self.sessions[session_id] = {'metadata': metadata, 'file_id': file_id, 'total': total, 'data': bytearray()}
+        return session_id
+
+    def get_session(self, session_id):
+        with self.lock:
+            return self.sessions.get(session_id)
+
+    def close_session(self, session_id):
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+
+class FakeDriveHandler(BaseHTTPRequestHandler):
+    """Routes Drive v2 REST calls to the shared FakeDriveState."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send(self, status, body=None, headers=None):
+        payload = b''
+        if body is not None:
+            payload = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        sent_type = False
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+            sent_type = sent_type or name.lower() == 'content-type'
+        if body is not None and not sent_type:
+            self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if payload:
+            self.wfile.write(payload)
+
+    def _handle(self, method):
+        body = self._read_body()
+        url = urlsplit(self.path)
+
+        if url.path == '/_stats':
+            return self._send(200, self.state.stats)
+        if url.path == '/_reset' and method == 'POST':
+            self.state.reset()
+            return self._send(200, {})
+
+        self.state.delay(len(body))
+        if self.state.should_fail():
+            return self._send(INJECTED_FAILURE_STATUS, error_body(INJECTED_FAILURE_STATUS, 'Injected backend error'))
+
+        if url.path == BATCH_PATH and method == 'POST':
+            return self._handle_batch(body)
+        status, response, headers = dispatch(
+            self.state, method, url.path, parse_qs(url.query), dict(self.headers.items()), body,
+            f"http://{self.headers.get('Host')}"
+        )
+        return self._send(status, response, headers)
+
+    def _handle_batch(self, body):
+        """Execute each embedded request of a multipart/mixed batch and answer in kind."""
+        self.state.count('batch', len(body))
+        with self.state.lock:
+            self.state.stats['batches'] += 1
+        boundary = boundary_of(self.headers.get('Content-Type'))
+        if not boundary:
+            return self._send(400, error_body(400, 'Missing multipart boundary'))
+
+        response_boundary = f"batch_{uuid.uuid4().hex}"
+        chunks = []
+        for part_headers, content in split_multipart(body, boundary):
+            method, path, headers, inner_body = parse_http_request(content)
+            url = urlsplit(path)
+            if self.state.should_fail():
+                # Individual calls inside a batch fail independently
+                status, response = INJECTED_FAILURE_STATUS, error_body(INJECTED_FAILURE_STATUS, 'Injected backend error')
+            else:
+                status, response, _ = dispatch(
+                    self.state, method, url.path, parse_qs(url.query), headers, inner_body,
+                    f"http://{self.headers.get('Host')}"
+                )
+            content_id = part_headers.get('content-id', '').strip('<>')
+            payload = json.dumps(response) if response is not None else ''
+            chunks.append(
+                f"--{response_boundary}\r\n"
+                f"Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\n"
+                f"Content-Length: {len(payload.encode('utf-8'))}\r\n\r\n"
+                f"{payload}\r\n"
+            )
+        chunks.append(f"--{response_boundary}--\r\n")
+        return self._send(200, ''.join(chunks).encode('utf-8'),
+                          {'Content-Type': f"multipart/mixed; boundary={response_boundary}"})
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    def do_PATCH(self):
+        self._handle('PATCH')
+
+
+def error_body(status, message):
+    """Drive-style JSON error payload."""
+    return {'error': {'code': status, 'message': message, 'errors': [{'message': message}]}}
+
+
+def parse_http_request(content):
+    """Parse an application/http batch part into (method, path, headers, body)."""
+    head, body = split_head(content)
+    lines = LINE_BREAK.split(head)
+    method, path = lines[0].decode('latin-1').split(' ')[:2]
+    return method, path, parse_headers(lines[1:]), body
+
+
+def _header(headers, name):
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def dispatch(state, method, path, query, headers, body, base_url):
+    """Run one Drive v2 request. Returns (status, json_body, extra_headers)."""
+    upload_type = (query.get('uploadType') or [None])[0]
+
+    # Resumable session chunk: PUT {upload path}?upload_id=...
+    if 'upload_id' in query:
+        return _resumable_chunk(state, query['upload_id'][0], headers, body)
+
+    if path.startswith(UPLOAD_PATH):
+        file_id = path[len(UPLOAD_PATH):].strip('/') or None
+        state.count('upload_' + (upload_type or 'media'), len(body))
+        if file_id and state.get(file_id) is None:
+            return 404, error_body(404, f"File not found: {file_id}"), None
+        if upload_type == 'multipart':
+            parts = split_multipart(body, boundary_of(_header(headers, 'content-type')))
+            metadata = json.loads(parts[0][1] or b'{}')
+            content = parts[1][1] if len(parts) > 1 else b''
+        elif upload_type == 'resumable':
+            metadata = json.loads(body or b'{}')
+            total = _header(headers, 'x-upload-content-length')
+            session_id = state.open_session(metadata, file_id, int(total) if total else None)
+            location = f"{base_url}{UPLOAD_PATH}{'/' + file_id if file_id else ''}?uploadType=resumable&upload_id={session_id}"
+            return 200, None, {'Location': location}
+        else:
+            metadata, content = {}, body
+        if file_id:
+            return 200, state.update(file_id, metadata, content), None
+        return 200, state.create(metadata, content), None
+
+    if path == FILES_PATH and method == 'GET':
+        state.count('list')
+        try:
+            response = state.list(
+                (query.get('q') or [''])[0],
+                int((query.get('maxResults') or [100])[0]),
+                (query.get('pageToken') or [None])[0],
+                (query.get('orderBy') or [None])[0],
+            )
+        except ValueError as e:
+            return 400, error_body(400, str(e)), None
+        return 200, response, None
+
+    if path == FILES_PATH and method == 'POST':
+        state.count('insert', len(body))
+        return 200, state.create(json.loads(body or b'{}')), None
+
+    if path.startswith(FILES_PATH + '/'):
+        file_id = path[len(FILES_PATH) + 1:]
+        if method == 'GET':
+            state.count('get')
+            item = state.get(file_id)
+        else:
+            state.count('update', len(body))
+            item = state.update(file_id, json.loads(body or b'{}'))
+        if item is None:
+            return 404, error_body(404, f"File not found: {file_id}"), None
+        return 200, item, None
+
+    return 404, error_body(404, f"Unsupported endpoint: {method} {path}"), None
+
+
+def _resumable_chunk(state, session_id, headers, body):
+    """Accept one chunk of a resumable upload (or a status query) and report progress."""
+    session = state.get_session(session_id)
+    if session is None:
+        return 404, error_body(404, 'Upload session not found'), None
+    state.count('upload_chunk', len(body))
+
+    content_range = _header(headers, 'content-range') or ''
+    match = re.match(r'bytes (\d+)-(\d+)/(\d+|\*)', content_range)
+    if match:
+        start = int(match.group(1))
+        if start == len(session['data']):
+            session['data'].extend(body)
+        elif start > len(session['data']):
+            return 400, error_body(400, 'Chunk out of order'), None
+        else:
+            # Re-sent chunk after a failure - keep the part we already have
+            session['data'][start:] = body
+        if match.group(3) != '*':
+            session['total'] = int(match.group(3))
+    elif not content_range.startswith('bytes */'):
+        # Whole content in one request
+        session['data'].extend(body)
+        session['total'] = len(session['data'])
+    elif content_range[len('bytes */'):] != '*':
+        session['total'] = int(content_range[len('bytes */'):])
+
+    if session['total'] is not None and len(session['data']) >= session['total']:
+        content = bytes(session['data'])
+        state.close_session(session_id)
+        if session['file_id']:
+            item = state.update(session['file_id'], session['metadata'], content)
+        else:
+            item = state.create(session['metadata'], content)
+        return 200, item, None
+
+    received = len(session['data'])
+    return 308, None, {'Range': f"bytes=0-{received - 1}"} if received else {}
+
+
+class FakeDriveServer:
+    """Threaded fake Drive v2 server; start() it and point DriveSession(api_endpoint=server.endpoint) at it."""
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0.0, jitter_ms=0.0, bandwidth_mbps=None,
+                 failure_rate=0.0, seed=None):
+        self.state = FakeDriveState(latency_ms, jitter_ms, bandwidth_mbps, failure_rate, seed)
+        self.httpd = ThreadingHTTPServer((host, port), FakeDriveHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = self.state
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fake-drive', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local fake Drive v2 server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Added latency per request")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Random extra latency per request")
+    parser.add_argument('--bandwidth-mbps', type=float, default=None, help="Simulated upload bandwidth (MB/s)")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server = FakeDriveServer(args.host, args.port, args.latency_ms, args.jitter_ms, args.bandwidth_mbps,
+                             args.failure_rate, args.seed)
+    print(f"Fake Drive listening on {server.endpoint}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Forensic Vision - Google Cloud Vision helpers for evidence renders.
+Downscales and re-encodes evidence renders before they are sent to the Vision API,
+caches the optimized payload on disk, and provides a measurement mode that compares
+label agreement between the original and optimized uploads.
+Also turns multi-feature annotate responses into structured findings
+(labels, dominant colors, brightness, object boxes).
+"""
+
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+
+from PIL import Image
+
+# Bump when the optimization pipeline changes so stale cached payloads are ignored
+OPTIMIZER_VERSION = 1
+
+# Google recommends 640x480 for LABEL_DETECTION - larger images add upload time without better labels
+DEFAULT_LONG_EDGE = 640
+
+# Candidate long-edge sizes tried (smallest first) by the measurement mode
+CANDIDATE_LONG_EDGES = (320, 480, 640)
+
+# Minimum label agreement (Jaccard) for a size to count as "keeps label quality"
+MIN_LABEL_AGREEMENT = 0.8
+
+# JPEG quality used when re-encoding (Vision is insensitive to mild compression)
+JPEG_QUALITY = 85
+
+# Profile file that remembers the smallest size that passed measurement
+PROFILE_FILENAME = "vision_profile.json"
+
+
+def get_cache_dir(base_dir):
+    """Return (and create) the optimized payload cache directory under evidence_renders."""
+    cache_dir = Path(base_dir) / ".vision_cache"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def load_target_long_edge(cache_dir):
+    """
+    Load the calibrated long edge from the measurement profile.
+    Returns None if the last measurement found no size that keeps the labels (send originals),
+    and falls back to DEFAULT_LONG_EDGE if no measurement has been recorded yet.
+    """
+    profile_path = Path(cache_dir) / PROFILE_FILENAME
+    try:
+        with open(profile_path, 'r', encoding='utf-8') as f:
+            profile = json.load(f)
+        long_edge = profile.get('long_edge', DEFAULT_LONG_EDGE)
+        return None if long_edge is None else int(long_edge)
+    except (OSError, ValueError, TypeError, AttributeError):
+        return DEFAULT_LONG_EDGE
+
+
+def save_target_long_edge(cache_dir, long_edge, report=None):
+    """
+    Persist the calibrated long edge so later scans use it without re-measuring.
+    long_edge None records "no downscale": later scans upload the original bytes.
+    """
+    profile_path = Path(cache_dir) / PROFILE_FILENAME
+    profile = {'long_edge': None if long_edge is None else int(long_edge), 'optimizer_version': OPTIMIZER_VERSION}
+    if report:
+        profile['report'] = report
+    with open(profile_path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2)
+
+
+def encode_for_vision(original_bytes, long_edge):
+    """
+    Downscale image bytes so the longest edge is at most long_edge, then re-encode.
+    Both PNG (optimized) and JPEG are tried and the smaller payload wins.
+    Returns (payload_bytes, info dict).
+    """
+    with Image.open(io.BytesIO(original_bytes)) as img:
+        img = img.convert('RGB')
+        original_size = img.size
+
+        # Only ever shrink - upscaling adds bytes without adding detail
+        scale = min(1.0, float(long_edge) / max(original_size))
+        if scale < 1.0:
+            new_size = (max(1, int(round(original_size[0] * scale))),
+                        max(1, int(round(original_size[1] * scale))))
+            img = img.resize(new_size, Image.LANCZOS)
+
+        encodings = []
+
+        png_buffer = io.BytesIO()
+        img.save(png_buffer, format='PNG', optimize=True)
+        encodings.append(('PNG', png_buffer.getvalue()))
+
+        jpeg_buffer = io.BytesIO()
+        img.save(jpeg_buffer, format='JPEG', quality=JPEG_QUALITY, optimize=True)
+        encodings.append(('JPEG', jpeg_buffer.getvalue()))
+
+        image_format, payload = min(encodings, key=lambda item: len(item[1]))
+        final_size = img.size
+
+    # Never send something bigger than what we started with
+    if len(payload) >= len(original_bytes) and scale >= 1.0:
+        payload = original_bytes
+        image_format = 'ORIGINAL'
+
+    info = {
+        'original_bytes': len(original_bytes),
+        'optimized_bytes': len(payload),
+        'original_size': list(original_size),
+        'optimized_size': list(final_size),
+        'format': image_format,
+    }
+    return payload, info
+
+
+def get_optimized_payload(image_path, cache_dir, long_edge=None):
+    """
+    Return the optimized Vision payload for an image, using the on-disk cache.
+    The cache key is the content hash of the original file plus the target size,
+    so a re-rendered image always gets a fresh payload. long_edge defaults to the
+    measured profile; when that records no downscale, the original bytes are returned.
+    Returns (payload_bytes, info dict).
+    """
+    with open(image_path, 'rb') as image_file:
+        original_bytes = image_file.read()
+
+    if long_edge is None:
+        long_edge = load_target_long_edge(cache_dir)
+    if long_edge is None:
+        with Image.open(io.BytesIO(original_bytes)) as img:
+            size = list(img.size)
+        info = {
+            'original_bytes': len(original_bytes),
+            'optimized_bytes': len(original_bytes),
+            'original_size': size,
+            'optimized_size': size,
+            'format': 'ORIGINAL',
+            'long_edge': None,
+            'cache_hit': False,
+        }
+        return original_bytes, info
+
+    content_hash = hashlib.sha256(original_bytes).hexdigest()
+    cache_key = f"{content_hash[:32]}_{long_edge}_v{OPTIMIZER_VERSION}"
+    payload_path = Path(cache_dir) / f"{cache_key}.bin"
+    info_path = Path(cache_dir) / f"{cache_key}.json"
+
+    if payload_path.exists() and info_path.exists():
+        try:
+            with open(payload_path, 'rb') as f:
+                payload = f.read()
+            with open(info_path, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+            info['cache_hit'] = True
+            return payload, info
+        except (OSError, ValueError):
+            pass  # Corrupt cache entry - fall through and rebuild it
+
+    payload, info = encode_for_vision(original_bytes, long_edge)
+    info['long_edge'] = long_edge
+
+    # Write to a temp name first so a concurrent reader never sees a partial payload
+    tmp_payload_path = payload_path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_payload_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_payload_path, payload_path)
+    with open(info_path, 'w', encoding='utf-8') as f:
+        json.dump(info, f)
+
+    info['cache_hit'] = False
+    return payload, info
+
+
+def label_agreement(reference_labels, candidate_labels, top_n=10):
+    """
+    Compare two label lists from Vision.
+    Returns Jaccard agreement over the top_n descriptions plus the labels that were lost.
+    """
+    reference = {label['description'].lower() for label in reference_labels[:top_n]}
+    candidate = {label['description'].lower() for label in candidate_labels[:top_n]}
+
+    if not reference and not candidate:
+        return 1.0, []
+
+    agreement = len(reference & candidate) / float(len(reference | candidate))
+    lost = sorted(reference - candidate)
+    return agreement, lost
+
+
+def measure_optimization(image_path, detect_labels, cache_dir, sizes=CANDIDATE_LONG_EDGES,
+                         min_agreement=MIN_LABEL_AGREEMENT):
+    """
+    Measurement mode: run label detection on the original upload and on each candidate size.
+    detect_labels is a callable taking image bytes and returning a list of label dicts.
+
+    Reports bytes saved and label-set agreement per size, picks the smallest size that
+    keeps agreement above min_agreement and stores it as the new target size. If no size
+    passes, 'selected_long_edge' is None and later scans upload the original image.
+    Returns the report dict (the chosen size is under 'selected_long_edge').
+    """
+    with open(image_path, 'rb') as image_file:
+        original_bytes = image_file.read()
+
+    reference_labels = detect_labels(original_bytes)
+
+    candidates = []
+    for long_edge in sorted(sizes):
+        payload, info = get_optimized_payload(image_path, cache_dir, long_edge=long_edge)
+        labels = detect_labels(payload)
+        agreement, lost = label_agreement(reference_labels, labels)
+        candidates.append({
+            'long_edge': long_edge,
+            'optimized_bytes': info['optimized_bytes'],
+            'bytes_saved': len(original_bytes) - info['optimized_bytes'],
+            'format': info['format'],
+            'agreement': round(agreement, 3),
+            'lost_labels': lost,
+        })
+
+    passing = [c for c in candidates if c['agreement'] >= min_agreement]
+    # Nothing keeps the labels: a downscale would lose findings, so keep sending originals
+    selected = passing[0]['long_edge'] if passing else None
+
+    report = {
+        'original_bytes': len(original_bytes),
+        'reference_label_count': len(reference_labels),
+        'candidates': candidates,
+        'selected_long_edge': selected,
+        'min_agreement': min_agreement,
+        'downscale': selected is not None,
+    }
+    save_target_long_edge(cache_dir, selected, report)
+    return report
+
+
+# Mean luminance (0-1, weighted by dominant-color pixel fraction) below which a scene is underexposed
+UNDEREXPOSED_BRIGHTNESS = 0.2
+
+
+def color_luminance(red, green, blue):
+    """Relative luminance (Rec. 709 weights) of an 8-bit RGB color, scaled to 0-1."""
+    return (0.2126 * red + 0.7152 * green + 0.0722 * blue) / 255.0
+
+
+def build_findings(response):
+    """
+    Convert a multi-feature Vision annotate response into a structured findings dict:
+    labels, dominant colors, a brightness estimate, localized object boxes and
+    an underexposure flag that downstream checks read instead of label strings.
+    """
+    labels = [
+        {
+            'description': label.description,
+            'score': label.score,
+            'mid': label.mid
+        }
+        for label in response.label_annotations
+    ]
+
+    # Dominant colors from IMAGE_PROPERTIES
+    dominant_colors = []
+    for color_info in response.image_properties_annotation.dominant_colors.colors:
+        red = int(color_info.color.red)
+        green = int(color_info.color.green)
+        blue = int(color_info.color.blue)
+        dominant_colors.append({
+            'rgb': [red, green, blue],
+            'hex': f"#{red:02X}{green:02X}{blue:02X}",
+            'score': color_info.score,
+            'pixel_fraction': color_info.pixel_fraction,
+            'luminance': round(color_luminance(red, green, blue), 3),
+        })
+
+    # Brightness: luminance of dominant colors weighted by how much of the frame they cover
+    total_fraction = sum(c['pixel_fraction'] for c in dominant_colors)
+    if total_fraction > 0:
+        brightness = sum(c['luminance'] * c['pixel_fraction'] for c in dominant_colors) / total_fraction
+    else:
+        brightness = None
+
+    # Localized objects with normalized bounding boxes [x_min, y_min, x_max, y_max]
+    objects = []
+    for obj in response.localized_object_annotations:
+        xs = [vertex.x for vertex in obj.bounding_poly.normalized_vertices]
+        ys = [vertex.y for vertex in obj.bounding_poly.normalized_vertices]
+        objects.append({
+            'name': obj.name,
+            'score': obj.score,
+            'box': [round(min(xs), 4), round(min(ys), 4), round(max(xs), 4), round(max(ys), 4)] if xs else None,
+        })
+
+    return {
+        'labels': labels,
+        'dominant_colors': dominant_colors,
+        'brightness': round(brightness, 3) if brightness is not None else None,
+        'objects': objects,
+        'underexposed': brightness is not None and brightness < UNDEREXPOSED_BRIGHTNESS,
+    }
+
+
+def is_underexposed(findings):
+    """Return True if the structured findings flag the scene as underexposed."""
+    return bool(findings and findings.get('underexposed'))
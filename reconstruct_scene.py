@@ -6,45 +6,193 @@ Blender script to create a forensic evidence room with breach point marker.
 import bpy
 import bmesh
 from mathutils import Vector
+import argparse
+import json
+import math
+import numpy as np
 import os
+import re
+import socket
 import sys
+import time
+
+# scene_spec.py lives next to this script (Blender does not add the script folder to sys.path)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from scene_spec import CONTACT_SHEET_VIEWS, contact_sheet_cameras, normalize_spec, load_spec, template_filename
+
+# Marker material baked into the template; per-case markers copy it instead of building node trees
+TEMPLATE_MARKER_MATERIAL = "MarkerMaterialTemplate"
+
+# Render statistics line with sample progress (Cycles: "Sample 12/128", EEVEE/Workbench: "Rendering 3 / 16 samples")
+RENDER_STATS_PATTERN = re.compile(r'(?:Sample|Rendering)\s+(\d+)\s*/\s*(\d+)')
+
+# Stage and last reported percentage of the render in progress (read by the render_stats handler)
+_render_progress = {'stage': 'render', 'percent': -1}
+
+def emit(event, **fields):
+    """
+    Print one machine-readable progress event as a JSON line ({"event": ..., ...}) and flush,
+    so the app can stream it while Blender runs. Events: log, phase, progress, render_settings,
+    output, error, timings, frame and benchmark.
+    """
+    print(json.dumps(dict({'event': event, 'time': round(time.time(), 3)}, **fields)), file=sys.stdout)
+    sys.stdout.flush()
+
+def log(message, level='info'):
+    """Free-form status message as a log event."""
+    emit('log', level=level, message=message)
+
+def report_render_progress(*args):
+    """render_stats handler: turn Blender's sample counter into progress events (each percent once)."""
+    match = RENDER_STATS_PATTERN.search(str(args[-1]) if args else '')
+    if not match:
+        return
+    done, total = int(match.group(1)), max(int(match.group(2)), 1)
+    percent = min(100, int(100 * done / total))
+    if percent != _render_progress['percent']:
+        _render_progress['percent'] = percent
+        emit('progress', stage=_render_progress['stage'], percent=percent)
+
+def install_progress_handler():
+    """Register report_render_progress once per Blender session."""
+    handlers = bpy.app.handlers.render_stats
+    if all(getattr(handler, '__name__', '') != report_render_progress.__name__ for handler in handlers):
+        handlers.append(report_render_progress)
+
+def parse_args(argv=None):
+    """Parse script arguments passed after Blender's '--' separator."""
+    if argv is None:
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="Forensic Architect scene reconstruction")
+    parser.add_argument('--light-boost', type=float, default=1.0,
+                        help="Multiplier applied to all light energies (used for re-rendering dark scenes)")
+    parser.add_argument('--spec', default=None,
+                        help="Scene spec: path to a JSON file or a JSON string (default: the standard evidence room)")
+    parser.add_argument('--batch', default=None,
+                        help="JSON file listing frames [{\"spec\": {...}, \"output\": \"path.png\"}, ...] to render in one run")
+    parser.add_argument('--report', default=None,
+                        help="Batch / setup benchmark: write the timing report to this JSON file")
+    parser.add_argument('--no-template', action='store_true',
+                        help="Build the room from scratch instead of from the prebuilt template .blend")
+    parser.add_argument('--make-template', action='store_true',
+                        help="Only (re)build the template .blend for the spec's room and exit")
+    parser.add_argument('--benchmark-setup', type=int, default=0, metavar='N',
+                        help="Time N scene setups from scratch vs. from the template and exit (report with --report)")
+    parser.add_argument('--output', default=None,
+                        help="PNG path to write (default: evidence_renders/latest_render.png next to this script)")
+    parser.add_argument('--preview-percentage', type=int, default=0, metavar='PCT',
+                        help="Progressive mode: first write a quick preview at PCT%% resolution (next to --output as .preview.png), then the full frame")
+    parser.add_argument('--views', default='',
+                        help="Contact sheet: render these camera views (comma-separated: top,corner,closeup) from one "
+                             "scene build and tile them into --output; each view is also saved as <output>.<view>.png")
+    parser.add_argument('--threads', type=int, default=0,
+                        help="Render threads for this Blender (0 = automatic, all cores); the app sets its share of the host")
+    parser.add_argument('--serve', action='store_true',
+                        help="Run as a persistent render worker accepting jobs on a local socket")
+    parser.add_argument('--port', type=int, default=0,
+                        help="Worker port (0 = pick a free port; announced on stdout as WORKER_READY)")
+    # Ignore unknown arguments so older app versions never break the render
+    args, _ = parser.parse_known_args(argv)
+    return args
 
 def clear_scene():
-    """Remove all default objects from the scene."""
-    # Select all objects
-    bpy.ops.object.select_all(action='SELECT')
-    
-    # Delete all objects
-    bpy.ops.object.delete(use_global=False, confirm=False)
+    """Remove all objects and materials from the scene."""
+    # Delete all objects through bpy.data (no selection/operator context needed)
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
     
     # Clear materials
-    for material in bpy.data.materials:
+    for material in list(bpy.data.materials):
         bpy.data.materials.remove(material)
     
-    print("Scene cleared.")
+    log("Scene cleared.")
+
+def reset_scene():
+    """
+    Return the scene to a clean state between worker jobs: remove objects and
+    materials, purge orphaned mesh/light/camera data and reset exposure, so
+    state from one case never leaks into the next and memory stays flat.
+    """
+    clear_scene()
+    for collection in (bpy.data.meshes, bpy.data.lights, bpy.data.cameras, bpy.data.images):
+        for block in list(collection):
+            if block.users == 0:
+                collection.remove(block)
+    bpy.context.scene.view_settings.exposure = 0.0
+    bpy.context.scene.camera = None
+
+# -- Scene construction layer ---------------------------------------------
+# Objects are created through bpy.data and bmesh instead of bpy.ops operators, which
+# each pay for context checks and a dependency-graph update. New objects are only
+# linked into the scene collection; build_scene() runs one view-layer update at the end.
+
+def link_object(name, data, location=(0, 0, 0)):
+    """Create an object for data (mesh, light or camera) and link it into the scene collection."""
+    obj = bpy.data.objects.new(name, data)
+    obj.location = tuple(location)
+    bpy.context.scene.collection.objects.link(obj)
+    return obj
+
+def mesh_from_bmesh(name, build):
+    """Mesh datablock whose geometry is created by build(bm)."""
+    bm = bmesh.new()
+    try:
+        build(bm)
+        mesh = bpy.data.meshes.new(name)
+        bm.to_mesh(mesh)
+    finally:
+        bm.free()
+    return mesh
+
+def plane_mesh(name, size):
+    """Square plane size x size (same geometry as primitive_plane_add)."""
+    return mesh_from_bmesh(name, lambda bm: bmesh.ops.create_grid(bm, x_segments=1, y_segments=1, size=size / 2))
 
-def build_room():
-    """Create a room with floor and walls."""
+def cube_mesh(name, size=2.0):
+    """Cube with edge length size (same geometry as primitive_cube_add)."""
+    return mesh_from_bmesh(name, lambda bm: bmesh.ops.create_cube(bm, size=size))
+
+def sphere_mesh(name, radius):
+    """UV sphere, 32 segments x 16 rings (same geometry as primitive_uv_sphere_add)."""
+    def build(bm):
+        try:
+            bmesh.ops.create_uvsphere(bm, u_segments=32, v_segments=16, radius=radius)
+        except TypeError:
+            # Blender < 3.0 calls the radius argument 'diameter'
+            bmesh.ops.create_uvsphere(bm, u_segments=32, v_segments=16, diameter=radius)
+    return mesh_from_bmesh(name, build)
+
+def emission_color_input(bsdf):
+    """Principled BSDF emission color socket: 'Emission Color' in Blender 4.0+, 'Emission' before."""
+    if 'Emission Color' in bsdf.inputs:
+        return bsdf.inputs['Emission Color']
+    return bsdf.inputs['Emission']
+
+def principled_material(name, color=None, roughness=0.5):
+    """Material with a Principled BSDF feeding the Material Output."""
+    material = bpy.data.materials.new(name=name)
+    material.use_nodes = True
+    material.node_tree.nodes.clear()
+    bsdf = material.node_tree.nodes.new(type='ShaderNodeBsdfPrincipled')
+    if color is not None:
+        bsdf.inputs['Base Color'].default_value = tuple(color)
+    bsdf.inputs['Roughness'].default_value = roughness
+    output = material.node_tree.nodes.new(type='ShaderNodeOutputMaterial')
+    material.node_tree.links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
+    return material
+
+def build_room(room=None):
+    """Create a room with floor and walls from the spec's room section."""
+    room = room or normalize_spec()['room']
     # Room dimensions
-    room_size = 20
-    wall_height = 8
-    wall_thickness = 0.2
+    room_size = room['size']
+    wall_height = room['wall_height']
+    wall_thickness = room['wall_thickness']
     
     # Create floor (large plane)
-    bpy.ops.mesh.primitive_plane_add(size=room_size, location=(0, 0, 0))
-    floor = bpy.context.active_object
-    floor.name = "Floor"
-    
-    # Create floor material
-    floor_material = bpy.data.materials.new(name="FloorMaterial")
-    floor_material.use_nodes = True
-    floor_material.node_tree.nodes.clear()
-    bsdf = floor_material.node_tree.nodes.new(type='ShaderNodeBsdfPrincipled')
-    bsdf.inputs['Base Color'].default_value = (0.2, 0.2, 0.25, 1.0)
-    bsdf.inputs['Roughness'].default_value = 0.8
-    output = floor_material.node_tree.nodes.new(type='ShaderNodeOutputMaterial')
-    floor_material.node_tree.links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
-    floor.data.materials.append(floor_material)
+    floor_mesh = plane_mesh("Floor", room_size)
+    floor_mesh.materials.append(principled_material("FloorMaterial", room['floor_color'], roughness=0.8))
+    link_object("Floor", floor_mesh)
     
     # Create walls (4 scaled cubes)
     wall_positions = [
@@ -61,243 +209,832 @@ def build_room():
         (wall_thickness/2, room_size/2, wall_height/2)    # Right wall
     ]
     
-    wall_material = bpy.data.materials.new(name="WallMaterial")
-    wall_material.use_nodes = True
-    wall_material.node_tree.nodes.clear()
-    bsdf = wall_material.node_tree.nodes.new(type='ShaderNodeBsdfPrincipled')
-    bsdf.inputs['Base Color'].default_value = (0.85, 0.85, 0.8, 1.0)
-    bsdf.inputs['Roughness'].default_value = 0.7
-    output = wall_material.node_tree.nodes.new(type='ShaderNodeOutputMaterial')
-    wall_material.node_tree.links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
+    # The walls share one cube mesh (and its material); object scale sets each wall's size
+    wall_mesh = cube_mesh("Wall", size=2)
+    wall_mesh.materials.append(principled_material("WallMaterial", room['wall_color'], roughness=0.7))
     
     wall_names = ["BackWall", "FrontWall", "LeftWall", "RightWall"]
     
-    for i, (pos, scale, name) in enumerate(zip(wall_positions, wall_scales, wall_names)):
-        bpy.ops.mesh.primitive_cube_add(size=2, location=pos)
-        wall = bpy.context.active_object
-        wall.name = name
+    for pos, scale, name in zip(wall_positions, wall_scales, wall_names):
+        wall = link_object(name, wall_mesh, pos)
         wall.scale = scale
-        wall.data.materials.append(wall_material)
-    
-    print(f"Room built: {room_size}x{room_size} floor, {wall_height} units high.")
-
-def add_evidence_marker():
-    """Place a red sphere at the center representing the breach point."""
-    # Create sphere at center (0, 0, 1) - slightly above floor
-    bpy.ops.mesh.primitive_uv_sphere_add(radius=0.5, location=(0, 0, 1))
-    marker = bpy.context.active_object
-    marker.name = "BreachPoint"
-    
-    # Create red material for evidence marker
-    marker_material = bpy.data.materials.new(name="BreachMarkerMaterial")
-    marker_material.use_nodes = True
-    marker_material.node_tree.nodes.clear()
-    bsdf = marker_material.node_tree.nodes.new(type='ShaderNodeBsdfPrincipled')
-    bsdf.inputs['Base Color'].default_value = (1.0, 0.0, 0.0, 1.0)  # Bright red
-    bsdf.inputs['Roughness'].default_value = 0.3
-    bsdf.inputs['Emission'].default_value = (0.5, 0.0, 0.0, 1.0)  # Slight emission
-    bsdf.inputs['Emission Strength'].default_value = 0.5
-    output = marker_material.node_tree.nodes.new(type='ShaderNodeOutputMaterial')
-    marker_material.node_tree.links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
-    marker.data.materials.append(marker_material)
-    
-    print("Evidence marker (Breach Point) added at room center.")
-
-def setup_lighting_and_camera():
-    """Set up sun lamp, point light, and camera pointing at the room."""
-    # Add sun lamp
-    bpy.ops.object.light_add(type='SUN', location=(10, -10, 15))
-    sun = bpy.context.active_object
-    sun.name = "ForensicLight"
-    sun.data.energy = 5
-    sun.rotation_euler = (0.785, 0, 0.785)  # Point towards room center
-    
-    # Add high-intensity point light at room center (lighting boost)
-    bpy.ops.object.light_add(type='POINT', location=(0, 0, 5))
-    point_light = bpy.context.active_object
-    point_light.name = "CenterPointLight"
-    point_light.data.energy = 100  # High intensity for visibility
-    point_light.data.shadow_soft_size = 2.0
-    
-    # Add camera
-    bpy.ops.object.camera_add(location=(12, -12, 8))
-    camera = bpy.context.active_object
-    camera.name = "ForensicCamera"
+    
+    log(f"Room built: {room_size}x{room_size} floor, {wall_height} units high.")
+
+def create_marker_material(name):
+    """Build the evidence marker material (Principled BSDF -> Material Output)."""
+    return principled_material(name, roughness=0.3)
+
+def set_marker_colors(marker_material, color, emission):
+    """Set a marker material's base color and its glow (half the base color)."""
+    bsdf = next(node for node in marker_material.node_tree.nodes if node.type == 'BSDF_PRINCIPLED')
+    bsdf.inputs['Base Color'].default_value = tuple(color)
+    emission_color_input(bsdf).default_value = (color[0] * 0.5, color[1] * 0.5, color[2] * 0.5, 1.0)  # Slight emission
+    bsdf.inputs['Emission Strength'].default_value = emission
+
+def add_evidence_marker(marker=None):
+    """Place a sphere representing an evidence marker (default: red breach point at the room center). Returns the object."""
+    marker_spec = marker or normalize_spec()['markers'][0]
+    
+    # Material for evidence marker: copy the template's node tree when one is loaded
+    template_material = bpy.data.materials.get(TEMPLATE_MARKER_MATERIAL)
+    if template_material is not None:
+        marker_material = template_material.copy()
+        marker_material.use_fake_user = False
+        marker_material.name = f"{marker_spec['name']}MarkerMaterial"
+    else:
+        marker_material = create_marker_material(f"{marker_spec['name']}MarkerMaterial")
+    set_marker_colors(marker_material, marker_spec['color'], marker_spec['emission'])
+    
+    # Create sphere slightly above floor
+    marker_mesh = sphere_mesh(marker_spec['name'], marker_spec['radius'])
+    marker_mesh.materials.append(marker_material)
+    marker = link_object(marker_spec['name'], marker_mesh, marker_spec['location'])
+    
+    log(f"Evidence marker ({marker_spec['name']}) added at {tuple(marker_spec['location'])}.")
+    return marker
+
+def add_evidence_markers(markers):
+    """Place every evidence marker in the spec. Returns the new objects."""
+    return [add_evidence_marker(marker) for marker in markers]
+
+def add_lights(lights, light_boost=1.0):
+    """Add the spec's lights; light_boost scales every light's energy. Returns the new objects."""
+    lamps = []
+    for light in lights:
+        light_data = bpy.data.lights.new(name=light['name'], type=light['type'])
+        light_data.energy = light['energy'] * light_boost
+        if light['type'] != 'SUN':
+            light_data.shadow_soft_size = light['shadow_soft_size']
+        lamp = link_object(light['name'], light_data, light['location'])
+        lamp.rotation_euler = tuple(light['rotation'])
+        lamps.append(lamp)
+    return lamps
+
+def place_camera(camera_spec):
+    """Position the forensic camera (created on first use, moved afterwards) and make it active."""
+    camera = bpy.data.objects.get("ForensicCamera")
+    if camera is None:
+        camera = link_object("ForensicCamera", bpy.data.cameras.new("ForensicCamera"), camera_spec['location'])
+    else:
+        camera.location = tuple(camera_spec['location'])
     
     # Point camera at room center
-    camera.rotation_euler = (1.1, 0, 0.785)
+    camera.rotation_euler = tuple(camera_spec['rotation'])
     
     # Set camera as active
     bpy.context.scene.camera = camera
+    return camera
+
+def setup_lighting_and_camera(light_boost=1.0, lights=None, camera=None):
+    """Set up the spec's lights (default: sun lamp and center point light) and the camera.
     
-    print("Lighting and camera set up.")
+    light_boost scales every light's energy (used to re-render underexposed scenes).
+    """
+    defaults = normalize_spec()
+    add_lights(defaults['lights'] if lights is None else lights, light_boost)
+    place_camera(camera or defaults['camera'])
+    
+    log(f"Lighting and camera set up (light boost x{light_boost}).")
+
+def set_render_engine(scene, engine):
+    """Set the render engine, mapping between the EEVEE identifiers used by different Blender versions."""
+    try:
+        scene.render.engine = engine
+    except TypeError:
+        fallback = {'BLENDER_EEVEE_NEXT': 'BLENDER_EEVEE', 'BLENDER_EEVEE': 'BLENDER_EEVEE_NEXT'}.get(engine)
+        if fallback is None:
+            raise
+        scene.render.engine = fallback
 
-def render_scene():
-    """Set render settings and save image to evidence_renders/latest_render.png
+def set_render_threads(threads=0):
+    """Fix the number of render threads (threads > 0) or let Blender use every core (0)."""
+    render = bpy.context.scene.render
+    if threads and threads > 0:
+        render.threads_mode = 'FIXED'
+        render.threads = int(threads)
+    else:
+        render.threads_mode = 'AUTO'
+
+def default_output_path():
+    """evidence_renders/latest_render.png next to this script (used when no --output is given)."""
+    # Get the directory where THIS script is located
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_dir, 'evidence_renders', 'latest_render.png')
+
+def render_scene(light_boost=1.0, output_path=None, resolution=(800, 600), engine='BLENDER_WORKBENCH',
+                 resolution_percentage=100, stage='render'):
+    """Set render settings and save image to output_path (default evidence_renders/latest_render.png)
     
-    FORCE STABLE HEADLESS RENDERING: Using WORKBENCH engine for highest stability.
+    FORCE STABLE HEADLESS RENDERING: WORKBENCH engine by default for highest stability.
     All settings optimized for reliable background rendering without GPU dependencies.
+    light_boost > 1 also raises color-management exposure, since WORKBENCH FLAT shading ignores lamps.
+    The image is rendered to a temporary file and renamed into place, so a reader never sees
+    a half-written PNG. resolution_percentage < 100 renders a scaled-down frame (previews).
+    stage names this render in the progress events (render, preview, view_top, ...).
+    Returns the output path (None if there was no camera to render).
     """
     # Force stable background rendering: Disable splash screen
     try:
         bpy.context.preferences.view.show_splash = False
-        print("Splash screen disabled for background rendering", file=sys.stdout)
-        sys.stdout.flush()
     except Exception as pref_error:
-        print(f"Warning: Could not disable splash screen: {pref_error}", file=sys.stdout)
-        sys.stdout.flush()
+        log(f"Could not disable splash screen: {pref_error}", 'warning')
     
     scene = bpy.context.scene
     
-    # FORCE STABLE HEADLESS RENDERING: Use WORKBENCH engine (highest stability)
-    scene.render.engine = 'BLENDER_WORKBENCH'
-    print("Using BLENDER_WORKBENCH render engine (highest stability for headless rendering)", file=sys.stdout)
-    sys.stdout.flush()
+    # FORCE STABLE HEADLESS RENDERING: WORKBENCH engine unless the spec asks for another
+    set_render_engine(scene, engine)
     
     # Force CPU rendering: Disable GPU compute devices via cycles preferences
     try:
         if 'cycles' in bpy.context.preferences.addons:
             bpy.context.preferences.addons['cycles'].preferences.compute_device_type = 'NONE'
-            print("Forced CPU rendering: cycles compute_device_type set to 'NONE'", file=sys.stdout)
-            sys.stdout.flush()
     except Exception as cpu_error:
-        print(f"Warning: Could not set cycles compute_device_type: {cpu_error}", file=sys.stdout)
-        sys.stdout.flush()
+        log(f"Could not set cycles compute_device_type: {cpu_error}", 'warning')
     
     # Ensure viewport render captures shapes without complex lighting
-    try:
-        scene.display.shading.light = 'FLAT'
-        scene.display.shading.color_type = 'OBJECT'
-        print("Viewport shading set to FLAT light and OBJECT color type", file=sys.stdout)
-        sys.stdout.flush()
-    except Exception as shading_error:
-        print(f"Warning: Could not set display shading: {shading_error}", file=sys.stdout)
-        sys.stdout.flush()
+    if scene.render.engine == 'BLENDER_WORKBENCH':
+        try:
+            scene.display.shading.light = 'FLAT'
+            scene.display.shading.color_type = 'OBJECT'
+        except Exception as shading_error:
+            log(f"Could not set display shading: {shading_error}", 'warning')
+    
+    # Exposure boost for re-renders of dark scenes (exposure is in stops)
+    if light_boost > 1.0:
+        try:
+            scene.view_settings.exposure = math.log2(light_boost)
+            log(f"Exposure boosted by {scene.view_settings.exposure:.2f} stops")
+        except Exception as exposure_error:
+            log(f"Could not set exposure: {exposure_error}", 'warning')
     
-    # Set resolution (moderate size for speed)
-    scene.render.resolution_x = 800
-    scene.render.resolution_y = 600
-    scene.render.resolution_percentage = 100
+    # Set resolution (default: moderate size for speed)
+    scene.render.resolution_x = resolution[0]
+    scene.render.resolution_y = resolution[1]
+    scene.render.resolution_percentage = resolution_percentage
     
     # Ensure PNG format is explicitly set
     scene.render.image_settings.file_format = 'PNG'
     scene.render.image_settings.color_mode = 'RGB'
     
-    # Get the directory where THIS script is located
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    output_dir = os.path.join(base_dir, 'evidence_renders')
+    # Ensure absolute path (Windows compatibility)
+    output_path = os.path.abspath(output_path or default_output_path())
+    output_dir = os.path.dirname(output_path)
     
     # Ensure the folder exists for Blender
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
-        print(f"Created output directory: {output_dir}", file=sys.stdout)
-        sys.stdout.flush()
+        log(f"Created output directory: {output_dir}")
     
-    output_path = os.path.join(output_dir, 'latest_render.png')
-    # Ensure absolute path (Windows compatibility)
-    output_path = os.path.abspath(output_path)
-    scene.render.filepath = output_path
+    # Render next to the target (same filesystem) so the final rename is atomic
+    temp_path = f"{os.path.splitext(output_path)[0]}.{os.getpid()}.tmp.png"
+    scene.render.filepath = temp_path
     
-    # Path logging for debugging
-    print(f'RENDER_TARGET: {output_path}', file=sys.stdout)
-    print(f'RENDER_ENGINE: {scene.render.engine}', file=sys.stdout)
-    print(f'RESOLUTION: {scene.render.resolution_x}x{scene.render.resolution_y}', file=sys.stdout)
-    sys.stdout.flush()
+    # Render settings for the app's log (replaces the RENDER_TARGET / RENDER_ENGINE / RESOLUTION lines)
+    emit('render_settings', stage=stage, target=output_path, engine=scene.render.engine,
+         resolution=[scene.render.resolution_x, scene.render.resolution_y], percentage=resolution_percentage,
+         threads=scene.render.threads)
     
     # Ensure camera is set correctly
     if scene.camera is None:
-        print("WARNING: No camera found, trying to find ForensicCamera...", file=sys.stdout)
-        sys.stdout.flush()
         if 'ForensicCamera' in bpy.data.objects:
             scene.camera = bpy.data.objects['ForensicCamera']
-            print("Camera set to ForensicCamera", file=sys.stdout)
-            sys.stdout.flush()
+            log("No active camera - using ForensicCamera", 'warning')
         else:
-            print("ERROR: No camera available for rendering!", file=sys.stdout)
-            sys.stdout.flush()
-            return
+            emit('error', stage=stage, message="No camera available for rendering")
+            return None
     
     # Render the scene
-    print("Starting render...", file=sys.stdout)
-    sys.stdout.flush()
+    install_progress_handler()
+    _render_progress.update(stage=stage, percent=-1)
+    emit('progress', stage=stage, percent=0)
     try:
         # Force view_layer update before rendering
         view_layer = bpy.context.view_layer
         view_layer.update()
         
-        # Perform the render with comprehensive error handling
-        # CRITICAL: Wrap in try/except that prints to sys.stdout for Streamlit logs
+        # Perform the render; failures are reported as an error event with the traceback
         try:
             bpy.ops.render.render(write_still=True)
-            print("Render operation completed", file=sys.stdout)
-            sys.stdout.flush()
         except Exception as render_op_error:
-            # Print exact error details to sys.stdout so we can see it in Streamlit logs
-            print("=" * 60, file=sys.stdout)
-            print("ERROR during render operation (bpy.ops.render.render):", file=sys.stdout)
-            print(f"Error Type: {type(render_op_error).__name__}", file=sys.stdout)
-            print(f"Error Message: {str(render_op_error)}", file=sys.stdout)
-            print("Full Traceback:", file=sys.stdout)
             import traceback
-            traceback.print_exc(file=sys.stdout)
-            print("=" * 60, file=sys.stdout)
-            sys.stdout.flush()
+            emit('error', stage=stage, operation='bpy.ops.render.render', type=type(render_op_error).__name__,
+                 message=str(render_op_error), traceback=traceback.format_exc())
             raise
+        emit('progress', stage=stage, percent=100)
+        
+        # Atomic publish: replace the previous image in one step
+        if os.path.exists(temp_path):
+            os.replace(temp_path, output_path)
         
         # Verify file was created
         if os.path.exists(output_path):
-            file_size = os.path.getsize(output_path)
-            print(f"Render completed successfully!", file=sys.stdout)
-            print(f"Render saved to: {output_path}", file=sys.stdout)
-            print(f"File size: {file_size} bytes", file=sys.stdout)
-            sys.stdout.flush()
+            emit('output', stage=stage, path=output_path, bytes=os.path.getsize(output_path))
         else:
-            print(f"WARNING: Render completed but file not found at: {output_path}", file=sys.stdout)
-            print(f"Expected path: {output_path}", file=sys.stdout)
-            print(f"Current working directory: {os.getcwd()}", file=sys.stdout)
-            sys.stdout.flush()
+            emit('error', stage=stage, message=f"Render completed but file not found at: {output_path}",
+                 cwd=os.getcwd())
             
     except Exception as render_error:
         # Catch any other errors during the render process
-        print("=" * 60, file=sys.stdout)
-        print("ERROR during render process:", file=sys.stdout)
-        print(f"Error Type: {type(render_error).__name__}", file=sys.stdout)
-        print(f"Error Message: {str(render_error)}", file=sys.stdout)
-        print("Full Traceback:", file=sys.stdout)
         import traceback
-        traceback.print_exc(file=sys.stdout)
-        print("=" * 60, file=sys.stdout)
-        sys.stdout.flush()
+        emit('error', stage=stage, type=type(render_error).__name__, message=str(render_error),
+             traceback=traceback.format_exc())
+        # Never leave a partial temp file behind
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
         raise
+    
+    return output_path
+
+def render_spec(spec, output_path=None, resolution_percentage=100, stage='render'):
+    """Render the current scene with the spec's light boost, resolution and engine."""
+    return render_scene(light_boost=spec['light_boost'], output_path=output_path,
+                        resolution=spec['resolution'], engine=spec['engine'],
+                        resolution_percentage=resolution_percentage, stage=stage)
+
+def preview_output_path(output_path=None):
+    """Preview image written next to the final render: <name>.preview.png."""
+    base, _ = os.path.splitext(os.path.abspath(output_path or default_output_path()))
+    return f"{base}.preview.png"
+
+def render_progressive(spec, output_path=None, preview_percentage=0):
+    """
+    Two-stage render: a quick preview at preview_percentage of the spec's resolution
+    (announced as an output event with stage "preview" so the app can show it), then the
+    full frame. A failed preview only logs a warning. Returns per-stage timings in seconds.
+    """
+    timings = {}
+    if 0 < preview_percentage < 100:
+        emit('phase', name='preview')
+        phase_start = time.perf_counter()
+        try:
+            render_spec(spec, preview_output_path(output_path), resolution_percentage=preview_percentage, stage='preview')
+        except Exception as preview_error:
+            log(f"Preview render failed ({type(preview_error).__name__}: {preview_error})", 'warning')
+        timings['preview'] = time.perf_counter() - phase_start
+    
+    emit('phase', name='render')
+    phase_start = time.perf_counter()
+    render_spec(spec, output_path)
+    timings['render'] = time.perf_counter() - phase_start
+    return timings
+
+def template_dir():
+    """evidence_renders/templates next to this script."""
+    return os.path.join(os.path.dirname(default_output_path()), 'templates')
+
+def build_template(spec, path):
+    """
+    Bake the spec's room, default lights, camera and the marker material into a template .blend.
+    Saved under a temporary name and renamed, so concurrent Blender runs never load a partial file.
+    """
+    reset_scene()
+    build_room(spec['room'])
+    add_lights(spec['lights'])
+    place_camera(spec['camera'])
+    marker_material = create_marker_material(TEMPLATE_MARKER_MATERIAL)
+    marker_material.use_fake_user = True  # Keep it in the file although no object uses it
+    
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{os.path.splitext(path)[0]}.{os.getpid()}.tmp.blend"
+    bpy.ops.wm.save_as_mainfile(filepath=temp_path, copy=True)
+    os.replace(temp_path, path)
+    log(f"Template saved: {path}")
+    return path
+
+def ensure_template(room):
+    """Path of the template .blend for a room, building it on first use."""
+    spec = normalize_spec({'room': room})
+    path = os.path.join(template_dir(), template_filename(spec['room']))
+    if not os.path.exists(path):
+        build_template(spec, path)
+        reset_scene()
+    return path
+
+def instantiate_template(path):
+    """Append the template's objects and marker material into the (empty) scene and make its camera active."""
+    with bpy.data.libraries.load(path, link=False) as (data_from, data_to):
+        data_to.objects = list(data_from.objects)
+        data_to.materials = [name for name in data_from.materials if name == TEMPLATE_MARKER_MATERIAL]
+    collection = bpy.context.scene.collection
+    for obj in data_to.objects:
+        if obj is not None:
+            collection.objects.link(obj)
+    bpy.context.scene.camera = bpy.data.objects.get("ForensicCamera")
+
+def apply_case_deltas(spec):
+    """
+    Per-case changes on top of the template (or an already built room): add the markers,
+    update/add/remove lights to match the spec (with its light boost) and move the camera.
+    Returns the marker objects.
+    """
+    markers = add_evidence_markers(spec['markers'])
+    
+    wanted = {light['name']: light for light in spec['lights']}
+    for obj in [obj for obj in bpy.data.objects if obj.type == 'LIGHT']:
+        light = wanted.get(obj.name)
+        if light is None or obj.data.type != light['type']:
+            bpy.data.objects.remove(obj, do_unlink=True)
+    missing = []
+    for light in spec['lights']:
+        lamp = bpy.data.objects.get(light['name'])
+        if lamp is None:
+            missing.append(light)
+            continue
+        lamp.location = tuple(light['location'])
+        lamp.rotation_euler = tuple(light['rotation'])
+        lamp.data.energy = light['energy'] * spec['light_boost']
+        if light['type'] != 'SUN':
+            lamp.data.shadow_soft_size = light['shadow_soft_size']
+    add_lights(missing, spec['light_boost'])
+    
+    place_camera(spec['camera'])
+    return markers
+
+def update_view_layer():
+    """The one view-layer update after construction (objects are only linked while building)."""
+    bpy.context.view_layer.update()
+
+def build_from_scratch(spec):
+    """
+    The original construction (room, markers, lights, camera) through the bpy.data layer,
+    followed by a single view-layer update. Returns per-phase timings in seconds.
+    """
+    timings = {}
+    
+    emit('phase', name='build')
+    phase_start = time.perf_counter()
+    build_room(spec['room'])
+    timings['room'] = time.perf_counter() - phase_start
+    
+    phase_start = time.perf_counter()
+    add_evidence_markers(spec['markers'])
+    timings['markers'] = time.perf_counter() - phase_start
+    
+    phase_start = time.perf_counter()
+    add_lights(spec['lights'], spec['light_boost'])
+    timings['lights'] = time.perf_counter() - phase_start
+    
+    phase_start = time.perf_counter()
+    place_camera(spec['camera'])
+    timings['camera'] = time.perf_counter() - phase_start
+    
+    phase_start = time.perf_counter()
+    update_view_layer()
+    timings['view_layer'] = time.perf_counter() - phase_start
+    
+    log(f"Scene built: {len(spec['markers'])} marker(s), {len(spec['lights'])} light(s), light boost x{spec['light_boost']}.")
+    return timings
+
+def build_scene(spec, use_template=True):
+    """
+    Build the scene for a spec into an empty scene: from the room template plus per-case deltas,
+    or from scratch. Falls back to scratch if the template cannot be used. Returns phase timings.
+    """
+    timings = {}
+    if use_template:
+        try:
+            emit('phase', name='template')
+            phase_start = time.perf_counter()
+            instantiate_template(ensure_template(spec['room']))
+            timings['template'] = time.perf_counter() - phase_start
+            
+            phase_start = time.perf_counter()
+            apply_case_deltas(spec)
+            timings['deltas'] = time.perf_counter() - phase_start
+            
+            phase_start = time.perf_counter()
+            update_view_layer()
+            timings['view_layer'] = time.perf_counter() - phase_start
+            return timings
+        except Exception as template_error:
+            log(f"Template unavailable ({type(template_error).__name__}: {template_error}) - building from scratch", 'warning')
+            reset_scene()
+    
+    timings.update(build_from_scratch(spec))
+    return timings
+
+def view_output_path(output_path, view):
+    """Image of one contact-sheet view, next to the sheet: <name>.<view>.png."""
+    base, _ = os.path.splitext(os.path.abspath(output_path or default_output_path()))
+    return f"{base}.{view}.png"
+
+def add_view_camera(name, camera_spec):
+    """Camera object for a contact-sheet view (created on first use, moved afterwards)."""
+    camera = bpy.data.objects.get(name)
+    if camera is None:
+        camera = link_object(name, bpy.data.cameras.new(name), camera_spec['location'])
+    else:
+        camera.location = tuple(camera_spec['location'])
+    camera.rotation_euler = tuple(camera_spec['rotation'])
+    return camera
+
+def composite_contact_sheet(image_paths, output_path, columns=3):
+    """
+    Tile rendered view images (all the same size) into one PNG at output_path, left to right
+    and top to bottom, columns per row. Pixels are copied with numpy; the sheet is written to
+    a temporary file and renamed into place.
+    """
+    tiles = []
+    for path in image_paths:
+        image = bpy.data.images.load(path)
+        try:
+            width, height = image.size
+            pixels = np.empty(width * height * 4, dtype=np.float32)
+            image.pixels.foreach_get(pixels)
+            tiles.append(pixels.reshape(height, width, 4))
+        finally:
+            bpy.data.images.remove(image)
+    
+    height, width = tiles[0].shape[:2]
+    columns = min(columns, len(tiles))
+    rows = -(-len(tiles) // columns)
+    sheet = np.zeros((rows * height, columns * width, 4), dtype=np.float32)
+    sheet[..., 3] = 1.0
+    for index, tile in enumerate(tiles):
+        row, column = divmod(index, columns)
+        # Blender image rows run bottom-up, so the first sheet row is the last block of rows
+        top = (rows - 1 - row) * height
+        sheet[top:top + height, column * width:(column + 1) * width] = tile[:height, :width]
+    
+    output_path = os.path.abspath(output_path or default_output_path())
+    temp_path = f"{os.path.splitext(output_path)[0]}.{os.getpid()}.tmp.png"
+    image = bpy.data.images.new("ContactSheet", columns * width, rows * height, alpha=False)
+    try:
+        image.pixels.foreach_set(sheet.ravel())
+        image.filepath_raw = temp_path
+        image.file_format = 'PNG'
+        image.save()
+        os.replace(temp_path, output_path)
+    finally:
+        bpy.data.images.remove(image)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return output_path
+
+def render_contact_sheet(spec, output_path=None, views=CONTACT_SHEET_VIEWS):
+    """
+    Render the built scene from several cameras (see scene_spec.contact_sheet_cameras) and tile
+    the frames into a contact sheet at output_path. Each view is also kept as <name>.<view>.png
+    and announced as an output event with stage "view_<view>". Returns per-phase timings in seconds.
+    """
+    scene = bpy.context.scene
+    timings = {}
+    
+    phase_start = time.perf_counter()
+    cameras = {
+        view: add_view_camera(f"ViewCamera_{view}", placement)
+        for view, placement in contact_sheet_cameras(spec, views).items()
+    }
+    update_view_layer()
+    timings['cameras'] = time.perf_counter() - phase_start
+    
+    forensic_camera = scene.camera
+    view_paths = []
+    try:
+        for view in views:
+            emit('phase', name=f"view_{view}")
+            phase_start = time.perf_counter()
+            scene.camera = cameras[view]
+            view_path = render_spec(spec, view_output_path(output_path, view), stage=f"view_{view}")
+            if view_path and os.path.exists(view_path):
+                view_paths.append(view_path)
+            timings[f"render_{view}"] = time.perf_counter() - phase_start
+    finally:
+        scene.camera = forensic_camera
+    
+    if not view_paths:
+        raise RuntimeError("No contact sheet view was rendered")
+    emit('phase', name='composite')
+    phase_start = time.perf_counter()
+    sheet_path = composite_contact_sheet(view_paths, output_path)
+    timings['composite'] = time.perf_counter() - phase_start
+    emit('output', stage='contact_sheet', path=sheet_path, bytes=os.path.getsize(sheet_path), views=len(view_paths))
+    return timings
+
+def build_and_render(spec=None, output_path=None, use_template=True, preview_percentage=0, views=None):
+    """
+    Build the evidence room described by spec and render it to output_path (after a quick
+    preview when preview_percentage is set), or, with views, render a contact sheet of those
+    camera views from the same build. Returns per-phase timings in seconds.
+    """
+    spec = normalize_spec(spec)
+    timings = build_scene(spec, use_template)
+    if views:
+        timings.update(render_contact_sheet(spec, output_path, views))
+    else:
+        timings.update(render_progressive(spec, output_path, preview_percentage))
+    return timings
+
+def benchmark_setup(spec, iterations):
+    """
+    Time scene setup (no rendering) from scratch vs. from the template, iterations times each.
+    Returns a report with per-mode mean/min/max milliseconds and the template build time.
+    """
+    phase_start = time.perf_counter()
+    path = os.path.join(template_dir(), template_filename(spec['room']))
+    build_template(spec, path)
+    template_build_ms = (time.perf_counter() - phase_start) * 1000.0
+    
+    report = {'iterations': iterations, 'template': path, 'template_build_ms': round(template_build_ms, 2)}
+    for mode in ('scratch', 'template'):
+        samples = []
+        for _ in range(iterations):
+            reset_scene()
+            phase_start = time.perf_counter()
+            if mode == 'template':
+                instantiate_template(path)
+                apply_case_deltas(spec)
+            else:
+                build_from_scratch(spec)
+            samples.append((time.perf_counter() - phase_start) * 1000.0)
+        report[mode] = {
+            'mean_ms': round(sum(samples) / len(samples), 2),
+            'min_ms': round(min(samples), 2),
+            'max_ms': round(max(samples), 2),
+        }
+    report['speedup'] = round(report['scratch']['mean_ms'] / report['template']['mean_ms'], 2) if report['template']['mean_ms'] else None
+    return report
+
+def process_memory_mb():
+    """Resident memory of this Blender process in MB (None if it cannot be read)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024.0 * 1024.0)
+    except (OSError, ValueError, AttributeError):
+        pass
+    if os.name == 'nt':
+        try:
+            import ctypes
+            from ctypes import wintypes
+            
+            class ProcessMemoryCounters(ctypes.Structure):
+                _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                            ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                            ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+            
+            counters = ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize / (1024.0 * 1024.0)
+        except Exception:
+            pass
+    return None
+
+def run_worker_job(job):
+    """Run one render job inside the persistent worker. Returns the reply dict."""
+    spec = normalize_spec(job.get('spec'))
+    if float(job.get('light_boost', 1.0)) != 1.0:
+        spec['light_boost'] = float(job['light_boost'])
+    output_path = os.path.abspath(job.get('output') or default_output_path())
+    views = list(job.get('views') or [])
+    started_at = time.time()
+    job_start = time.perf_counter()
+    
+    phase_start = time.perf_counter()
+    reset_scene()
+    set_render_threads(int(job.get('threads', 0)))
+    timings = {'reset': time.perf_counter() - phase_start}
+    warning = None
+    try:
+        timings.update(build_and_render(spec, output_path, use_template=job.get('template', True),
+                                        preview_percentage=int(job.get('preview', 0)), views=views))
+    except Exception as e:
+        # Same emergency recovery as a cold run: render whatever was built
+        warning = f"{type(e).__name__}: {e}"
+        emit('error', stage='build', message=f"Scene reconstruction failed: {warning} - rendering what was built")
+        phase_start = time.perf_counter()
+        render_spec(spec, output_path)
+        timings['render'] = time.perf_counter() - phase_start
+    timings['total'] = time.perf_counter() - job_start
+    
+    # An output path may be reused between jobs - only a file written by this job counts
+    written = os.path.exists(output_path) and os.path.getmtime(output_path) >= started_at - 1
+    view_paths = {view: view_output_path(output_path, view) for view in views}
+    return {
+        'ok': written,
+        'output': output_path,
+        'views': {view: path for view, path in view_paths.items()
+                  if os.path.exists(path) and os.path.getmtime(path) >= started_at - 1},
+        'warning': warning,
+        'timings': {phase: round(seconds, 4) for phase, seconds in timings.items()},
+        'memory_mb': process_memory_mb(),
+    }
+
+def remove_case_objects(names):
+    """Delete per-case objects (markers, lights) and the mesh/light/material data they leave behind."""
+    for name in names:
+        obj = bpy.data.objects.get(name)
+        if obj is not None:
+            bpy.data.objects.remove(obj, do_unlink=True)
+    for collection in (bpy.data.meshes, bpy.data.lights, bpy.data.materials):
+        for block in list(collection):
+            if block.users == 0:
+                collection.remove(block)
+
+def frame_output_path(index, output=None):
+    """Output of batch frame index (default: evidence_renders/batch/frame_NNN.png)."""
+    if output:
+        return os.path.abspath(output)
+    return os.path.join(os.path.dirname(default_output_path()), 'batch', f"frame_{index:03d}.png")
+
+def run_batch(frames, use_template=True):
+    """
+    Render several scene specs in one Blender session.
+    The room (from the template by default) is set up once and again only when a frame's
+    room differs; between frames only the per-case objects (markers, lights, camera) change.
+    Each frame is reported on stdout as a frame event. Returns the report with
+    per-frame timings.
+    """
+    batch_start = time.perf_counter()
+    clear_scene()
+    current_room = None
+    case_objects = []
+    results = []
+    
+    for index, frame in enumerate(frames):
+        frame_start = time.perf_counter()
+        started_at = time.time()
+        output_path = frame_output_path(index, frame.get('output'))
+        timings = {}
+        error = None
+        try:
+            spec = normalize_spec(frame.get('spec'))
+            
+            # Shared room: build only when it changes
+            phase_start = time.perf_counter()
+            if spec['room'] != current_room:
+                reset_scene()
+                if use_template:
+                    instantiate_template(ensure_template(spec['room']))
+                else:
+                    build_room(spec['room'])
+                current_room = spec['room']
+                case_objects = []
+            timings['room'] = time.perf_counter() - phase_start
+            
+            # Per-case objects: swap markers, adjust lights, move the camera
+            phase_start = time.perf_counter()
+            remove_case_objects(case_objects)
+            case_objects = [obj.name for obj in apply_case_deltas(spec)]
+            bpy.context.scene.view_settings.exposure = 0.0
+            update_view_layer()
+            timings['mutate'] = time.perf_counter() - phase_start
+            
+            phase_start = time.perf_counter()
+            render_spec(spec, output_path)
+            timings['render'] = time.perf_counter() - phase_start
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            # Start the next frame from a clean room
+            current_room = None
+        timings['total'] = time.perf_counter() - frame_start
+        
+        written = os.path.exists(output_path) and os.path.getmtime(output_path) >= started_at - 1
+        result = {
+            'index': index,
+            'output': output_path,
+            'ok': written and error is None,
+            'error': error,
+            'timings': {phase: round(seconds, 4) for phase, seconds in timings.items()},
+        }
+        results.append(result)
+        emit('frame', **result)
+    
+    total = time.perf_counter() - batch_start
+    render_seconds = sum(result['timings'].get('render', 0.0) for result in results)
+    return {
+        'ok': all(result['ok'] for result in results),
+        'frames': results,
+        'rendered': sum(1 for result in results if result['ok']),
+        'seconds': round(total, 4),
+        'render_seconds': round(render_seconds, 4),
+        # Share of batch time spent inside the renderer (1.0 = no setup overhead)
+        'render_share': round(render_seconds / total, 3) if total else 0.0,
+        'memory_mb': process_memory_mb(),
+    }
+
+def serve(port=0):
+    """
+    Persistent worker loop: accept one JSON-line request per connection on 127.0.0.1
+    and answer with one JSON line. Blender and Python start once; each job resets the scene.
+    Requests: {"cmd": "render", "spec": {...}, "light_boost": 1.0, "output": "/path/render.png", "preview": 25},
+    {"cmd": "batch", "frames": [{"spec": {...}, "output": ...}, ...]}, {"cmd": "ping"}, {"cmd": "shutdown"}.
+    render and batch accept "template": false to build the room from scratch and "threads"
+    (render threads, 0 = automatic). A render's "preview" (percent) renders a quick
+    scaled-down .preview.png before the full frame;
+    "views" (e.g. ["top", "corner", "closeup"]) renders a contact sheet of those cameras instead.
+    """
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(('127.0.0.1', port))
+    server.listen(1)
+    print(f"WORKER_READY port={server.getsockname()[1]}", file=sys.stdout)
+    sys.stdout.flush()
+    
+    while True:
+        conn, _ = server.accept()
+        with conn:
+            try:
+                request = json.loads(conn.makefile('r', encoding='utf-8').readline() or '{}')
+            except ValueError as e:
+                conn.sendall((json.dumps({'ok': False, 'error': f"Bad request: {e}"}) + "\n").encode('utf-8'))
+                continue
+            
+            command = request.get('cmd')
+            if command == 'shutdown':
+                conn.sendall(b'{"ok": true}\n')
+                break
+            if command == 'ping':
+                reply = {'ok': True, 'memory_mb': process_memory_mb()}
+            elif command in ('render', 'batch'):
+                try:
+                    if command == 'batch':
+                        reset_scene()
+                        set_render_threads(int(request.get('threads', 0)))
+                        reply = run_batch(request.get('frames') or [], use_template=request.get('template', True))
+                    else:
+                        reply = run_worker_job(request)
+                except Exception as e:
+                    import traceback
+                    emit('error', stage=command, type=type(e).__name__, message=str(e), traceback=traceback.format_exc())
+                    reply = {'ok': False, 'error': f"{type(e).__name__}: {e}", 'memory_mb': process_memory_mb()}
+            else:
+                reply = {'ok': False, 'error': f"Unknown command: {command}"}
+            conn.sendall((json.dumps(reply) + "\n").encode('utf-8'))
+    
+    server.close()
 
 def main():
     """Main function to reconstruct the forensic scene. Emergency default - works with or without arguments."""
-    print("=" * 50)
-    print("Forensic Architect - Scene Reconstruction")
-    print("Emergency Default Mode: Building basic evidence room")
-    print("=" * 50)
+    args = parse_args()
+    
+    if args.serve:
+        serve(args.port)
+        return
+    
+    set_render_threads(args.threads)
+    
+    if args.make_template or args.benchmark_setup:
+        spec = load_spec(args.spec) if args.spec else normalize_spec()
+        if args.make_template:
+            build_template(spec, os.path.join(template_dir(), template_filename(spec['room'])))
+        else:
+            report = benchmark_setup(spec, args.benchmark_setup)
+            emit('benchmark', **report)
+            if args.report:
+                with open(args.report, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, indent=2)
+        sys.stdout.flush()
+        return
+    
+    if args.batch:
+        with open(args.batch, 'r', encoding='utf-8') as f:
+            frames = json.load(f)
+        log(f"Forensic Architect - Batch Reconstruction ({len(frames)} frames)")
+        report = run_batch(frames, use_template=not args.no_template)
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+        log(f"Batch complete: {report['rendered']}/{len(frames)} frames in {report['seconds']:.2f}s "
+            f"({report['render_share'] * 100:.0f}% rendering)")
+        # Non-zero exit so callers notice missing frames
+        if not report['ok']:
+            sys.exit(1)
+        return
+    
+    if args.spec:
+        log("Forensic Architect - Scene Reconstruction: building evidence room from scene spec")
+    else:
+        log("Forensic Architect - Scene Reconstruction: Emergency Default Mode, building basic evidence room")
+    
+    # A bad spec falls back to the standard room rather than failing the render
+    try:
+        spec = load_spec(args.spec) if args.spec else normalize_spec()
+    except (OSError, ValueError) as spec_error:
+        log(f"Invalid scene spec ({spec_error}) - using the default evidence room", 'warning')
+        spec = normalize_spec()
+    if args.light_boost != 1.0:
+        spec['light_boost'] = args.light_boost
     
     try:
         clear_scene()
-        build_room()
-        add_evidence_marker()
-        setup_lighting_and_camera()
-        render_scene()
-        
-        print("=" * 50)
-        print("Scene reconstruction complete!")
-        print("=" * 50)
+        views = [view.strip() for view in args.views.split(',') if view.strip()]
+        timings = build_and_render(spec, output_path=args.output, use_template=not args.no_template,
+                                   preview_percentage=args.preview_percentage, views=views)
+        emit('timings', ms={phase: round(seconds * 1000.0, 2) for phase, seconds in timings.items()})
+        log("Scene reconstruction complete!")
     except Exception as e:
-        print(f"ERROR during scene reconstruction: {str(e)}")
-        print("Attempting emergency recovery...")
+        emit('error', stage='build', message=f"Scene reconstruction failed: {e} - attempting emergency recovery")
         # Try to render anyway if possible
         try:
-            render_scene()
+            render_spec(spec, output_path=args.output)
         except:
-            print("Emergency recovery failed. Please check Blender installation and script syntax.")
+            emit('error', stage='render', message="Emergency recovery failed. Please check Blender installation and script syntax.")
 
 # Execute the reconstruction (Emergency Default - works without arguments)
 if __name__ == "__main__":
     main()
-
-
@@ -0,0 +1,147 @@
+"""
+Forensic Relevance Engine - Maps Vision API labels to relevance scores for forensic cases.
+The term table lives in relevance_rules.json and is compiled into a single
+word-boundary regex, so each label is scanned once instead of once per category.
+"""
+
+import json
+import re
+from pathlib import Path
+
+# Default rules file shipped next to this module
+RULES_PATH = Path(__file__).resolve().parent / "relevance_rules.json"
+
+# Common inflections accepted after a term ("light" -> "lighting", "wall" -> "walls", "dark" -> "darkness")
+TERM_SUFFIXES = r"(?:s|es|ing|ed|ness|ity)?"
+
+# Upper bound on memoized labels (Vision vocabularies are small, this is just a safety valve)
+MEMO_LIMIT = 4096
+
+
+class RelevanceClassifier:
+    """Compiled multi-pattern relevance matcher built from a rules table."""
+
+    def __init__(self, rules, default):
+        self.rules = [(int(rule['score']), rule['category']) for rule in rules]
+        self.default = (int(default['score']), default['category'])
+
+        # Map each term to the index of the first rule that lists it (rule order = priority)
+        self.term_priority = {}
+        for rule_index, rule in enumerate(rules):
+            for term in rule['terms']:
+                self.term_priority.setdefault(term.lower(), rule_index)
+
+        # Longest terms first so overlapping alternatives resolve to the most specific term
+        alternation = '|'.join(
+            re.escape(term) for term in sorted(self.term_priority, key=len, reverse=True)
+        )
+        self.pattern = re.compile(rf"\b({alternation}){TERM_SUFFIXES}\b", re.IGNORECASE)
+
+        # Per-instance memo keyed by the raw label string
+        self._memo = {}
+
+    @classmethod
+    def from_file(cls, path=RULES_PATH):
+        """Load a classifier from a JSON rules file."""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['rules'], data['default'])
+
+    def _best_rule(self, matches):
+        """Return the (score, category) of the highest-priority matched term."""
+        best_index = None
+        for match in matches:
+            rule_index = self.term_priority[match.group(1).lower()]
+            if best_index is None or rule_index < best_index:
+                best_index = rule_index
+                if best_index == 0:
+                    break
+        return self.rules[best_index] if best_index is not None else self.default
+
+    def _remember(self, description, result):
+        """Store a result in the memo, resetting it if it grows past MEMO_LIMIT."""
+        if len(self._memo) >= MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[description] = result
+
+    def score(self, label_description):
+        """Score a single label. Returns (score, category), memoized per label string."""
+        description = label_description or ''
+        result = self._memo.get(description)
+        if result is None:
+            result = self._best_rule(self.pattern.finditer(description))
+            self._remember(description, result)
+        return result
+
+    def score_labels(self, label_descriptions):
+        """
+        Score a whole list of label descriptions in one call.
+        Labels not yet in the memo are joined and scanned in a single regex pass,
+        then their results are cached for later calls.
+        Returns a list of (score, category) tuples in input order.
+        """
+        descriptions = [description or '' for description in label_descriptions]
+
+        # Labels we have not scored before (dedupe, keep order)
+        cached = {}
+        uncached = []
+        for description in dict.fromkeys(descriptions):
+            hit = self._memo.get(description)
+            if hit is None:
+                uncached.append(description)
+            else:
+                cached[description] = hit
+
+        if uncached:
+            # One pass over all new labels; newline separators keep \b matches inside each label
+            joined = '\n'.join(uncached)
+            offsets = []
+            position = 0
+            for description in uncached:
+                offsets.append(position)
+                position += len(description) + 1
+
+            matches_by_label = [[] for _ in uncached]
+            label_index = 0
+            for match in self.pattern.finditer(joined):
+                while label_index + 1 < len(offsets) and match.start() >= offsets[label_index + 1]:
+                    label_index += 1
+                matches_by_label[label_index].append(match)
+
+            for description, matches in zip(uncached, matches_by_label):
+                result = self._best_rule(matches)
+                cached[description] = result
+                self._remember(description, result)
+
+        return [cached[description] for description in descriptions]
+
+
+_default_classifier = None
+
+
+def get_classifier():
+    """Return the shared classifier loaded from relevance_rules.json."""
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = RelevanceClassifier.from_file()
+    return _default_classifier
+
+
+def get_relevance_score(label_description):
+    """
+    Map Vision API labels to relevance scores for forensic cases.
+    Returns a relevance score (0-100) and category.
+    """
+    return get_classifier().score(label_description)
+
+
+def score_labels(labels):
+    """
+    Score a list of Vision label dicts (or plain description strings) in one call.
+    Returns a list of (score, category) tuples in input order.
+    """
+    descriptions = [
+        label.get('description', '') if isinstance(label, dict) else label
+        for label in labels
+    ]
+    return get_classifier().score_labels(descriptions)
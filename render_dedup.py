@@ -0,0 +1,201 @@
+"""
+Render Dedup - Perceptual-hash index over evidence renders.
+reconstruct_scene.py produces near-identical rooms for most cases, so renders are
+fingerprinted with pHash/dHash (computed with NumPy) and matched against earlier
+renders. A match within the configured Hamming distance lets the app reuse the
+earlier Vision findings, Drive archive references and PDF-ready image, and every
+reuse decision is appended to an audit trail.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Default maximum Hamming distance (out of 64 bits) for two renders to count as the same scene
+DEFAULT_MAX_DISTANCE = 6
+
+INDEX_FILENAME = "phash_index.json"
+AUDIT_FILENAME = "dedup_audit.jsonl"
+
+_index_lock = threading.Lock()
+
+
+def _dct_matrix(size):
+    """Orthonormal DCT-II basis matrix (size x size)."""
+    n = np.arange(size)
+    matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2.0 * size))
+    matrix[0, :] *= 1.0 / np.sqrt(2.0)
+    return matrix * np.sqrt(2.0 / size)
+
+
+_DCT_32 = _dct_matrix(32)
+
+
+def _bits_to_hex(bits):
+    """Pack a flat boolean array into a hex string."""
+    return ''.join(f"{byte:02x}" for byte in np.packbits(bits.astype(np.uint8)))
+
+
+def compute_dhash(img):
+    """64-bit difference hash: sign of horizontal gradients on a 9x8 grayscale thumbnail."""
+    pixels = np.asarray(img.convert('L').resize((9, 8), Image.LANCZOS), dtype=np.float32)
+    return _bits_to_hex((pixels[:, 1:] > pixels[:, :-1]).flatten())
+
+
+def compute_phash(img):
+    """64-bit perceptual hash: low-frequency 8x8 DCT block of a 32x32 thumbnail vs. its median."""
+    pixels = np.asarray(img.convert('L').resize((32, 32), Image.LANCZOS), dtype=np.float32)
+    dct = _DCT_32 @ pixels @ _DCT_32.T
+    low = dct[:8, :8].flatten()
+    # Median excludes the DC term, which only encodes overall brightness
+    return _bits_to_hex(low > np.median(low[1:]))
+
+
+def hamming_distance(hash_a, hash_b):
+    """Number of differing bits between two hex hashes."""
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count('1')
+
+
+def fingerprint(image_path):
+    """Return content sha256 plus pHash/dHash for a render."""
+    with open(image_path, 'rb') as f:
+        content = f.read()
+    with Image.open(image_path) as img:
+        img.load()
+        phash = compute_phash(img)
+        dhash = compute_dhash(img)
+    return {
+        'sha256': hashlib.sha256(content).hexdigest(),
+        'phash': phash,
+        'dhash': dhash,
+    }
+
+
+class RenderIndex:
+    """JSON-backed perceptual-hash index of renders with attached findings and archive references."""
+
+    def __init__(self, renders_dir):
+        self.renders_dir = Path(renders_dir)
+        self.index_path = self.renders_dir / INDEX_FILENAME
+        self.audit_path = self.renders_dir / AUDIT_FILENAME
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'entries': {}, 'files': {}}
+
+    def _save(self, data):
+        tmp_path = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.index_path)
+
+    def add(self, image_path):
+        """
+        Fingerprint a render and add it to the index (no-op for content already indexed).
+        Returns the fingerprint dict.
+        """
+        image_path = Path(image_path)
+        stat = image_path.stat()
+        file_key = f"{image_path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}"
+
+        with _index_lock:
+            data = self._load()
+            # Skip re-hashing files whose path/mtime/size we have already seen
+            known_sha = data['files'].get(file_key)
+            if known_sha and known_sha in data['entries']:
+                entry = data['entries'][known_sha]
+                return {'sha256': known_sha, 'phash': entry['phash'], 'dhash': entry['dhash']}
+
+            render_print = fingerprint(image_path)
+            data['files'][file_key] = render_print['sha256']
+            data['entries'].setdefault(render_print['sha256'], {
+                'phash': render_print['phash'],
+                'dhash': render_print['dhash'],
+                'path': str(image_path),
+                'indexed_at': time.time(),
+                'findings': None,
+                'archive': None,
+                'pdf_image': None,
+            })
+            self._save(data)
+        return render_print
+
+    def rebuild(self):
+        """Index every PNG render in the renders directory. Returns the number of entries."""
+        for image_path in sorted(self.renders_dir.glob("*.png")):
+            try:
+                self.add(image_path)
+            except Exception:
+                continue  # Partially written or corrupt render - skip it
+        return len(self._load()['entries'])
+
+    def find_match(self, image_path, max_distance=DEFAULT_MAX_DISTANCE, require=None):
+        """
+        Find the closest earlier render within max_distance bits on both pHash and dHash.
+        require names an attachment ('findings', 'archive' or 'pdf_image') the match must have.
+        Returns (fingerprint, matched_sha or None, distance or None).
+        """
+        render_print = self.add(image_path)
+        data = self._load()
+
+        best_sha, best_distance = None, None
+        for sha, entry in data['entries'].items():
+            if require and not entry.get(require):
+                continue
+            if sha == render_print['sha256']:
+                # Byte-identical render - the best possible match
+                return render_print, sha, 0
+            distance = hamming_distance(render_print['phash'], entry['phash'])
+            if distance > max_distance:
+                continue
+            if hamming_distance(render_print['dhash'], entry['dhash']) > max_distance:
+                continue
+            if best_distance is None or distance < best_distance:
+                best_sha, best_distance = sha, distance
+        return render_print, best_sha, best_distance
+
+    def get(self, sha):
+        """Return the index entry for a content hash (or None)."""
+        return self._load()['entries'].get(sha)
+
+    def attach(self, sha, key, value):
+        """Attach findings, archive references or a PDF image path to an indexed render."""
+        with _index_lock:
+            data = self._load()
+            if sha in data['entries']:
+                data['entries'][sha][key] = value
+                self._save(data)
+
+    def audit(self, action, render_print, matched_sha, distance, decision, max_distance):
+        """Append a reuse decision to the audit trail (JSON lines)."""
+        record = {
+            'ts': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'action': action,
+            'render_sha256': render_print['sha256'],
+            'matched_sha256': matched_sha,
+            'distance': distance,
+            'max_distance': max_distance,
+            'decision': decision,
+        }
+        with _index_lock:
+            with open(self.audit_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+        return record
+
+    def read_audit(self, limit=20):
+        """Return the most recent audit records (newest last)."""
+        try:
+            with open(self.audit_path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()[-limit:]
+        except OSError:
+            return []
+        return [json.loads(line) for line in lines if line.strip()]
@@ -0,0 +1,511 @@
+"""
+Render Dispatch - Distributes scene specs across render nodes (render_node.py) over HTTP.
+The dispatcher keeps its own job queue and a registry of node URLs. A background loop
+polls every node's /health as its heartbeat, assigns queued jobs to live nodes with free
+slots, polls running jobs and downloads finished images by content hash into a local
+artifact store (verified against the SHA-256, skipped when already present). Jobs on a
+node that stops answering, restarts or loses them are requeued on another node; a job
+the node reports as failed (a render error) fails without a retry.
+Requests carry the shared node token (RENDER_NODE_TOKEN) when one is set.
+
+Usage (self-test with several nodes on this machine):
+    python render_dispatch.py --local-nodes 3 --jobs 12 --blender blender [--kill-node-after 2]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import deque
+
+from render_node import TOKEN_HEADER
+from render_jobs import QUEUED, RUNNING, DONE, FAILED, CANCELLED, ACTIVE_STATUSES, HISTORY_LIMIT
+
+# Seconds between heartbeats (GET /health) per node
+HEARTBEAT_SECONDS = 2.0
+
+# Missed heartbeats before a node counts as lost and its jobs are requeued
+MAX_MISSED_HEARTBEATS = 3
+
+# Seconds between status polls of running jobs
+POLL_SECONDS = 0.5
+
+# Attempts per job (across nodes) before it fails
+MAX_ATTEMPTS = 3
+
+# Timeout for one HTTP request to a node (artifact downloads get ARTIFACT_TIMEOUT)
+REQUEST_TIMEOUT = 5
+ARTIFACT_TIMEOUT = 60
+
+
+class NodeError(Exception):
+    """A render node could not be reached or answered with an error status."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def node_request(url, method='GET', body=None, timeout=REQUEST_TIMEOUT, token=None):
+    """One HTTP request to a render node. Returns (status, bytes); raises NodeError on connection errors."""
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    request = urllib.request.Request(url, data=data, method=method)
+    if data is not None:
+        request.add_header('Content-Type', 'application/json')
+    if token:
+        request.add_header(TOKEN_HEADER, token)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        raise NodeError(f"{type(e).__name__}: {getattr(e, 'reason', e)}")
+
+
+def node_json(url, method='GET', body=None, timeout=REQUEST_TIMEOUT, token=None):
+    """node_request for JSON endpoints. Returns (status, decoded body or {})."""
+    status, payload = node_request(url, method, body, timeout, token)
+    try:
+        return status, json.loads(payload.decode('utf-8')) if payload else {}
+    except ValueError:
+        return status, {}
+
+
+class RenderDispatcher:
+    """
+    Multi-node render dispatcher.
+    submit() queues a scene spec and returns a job ID; jobs are dicts like the render queue's
+    (status queued / running / done / failed / cancelled) plus the node, the attempt count and,
+    when done, artifacts {kind: local path} (render, preview, view_<name>).
+    """
+
+    def __init__(self, artifact_dir, nodes=(), heartbeat_seconds=HEARTBEAT_SECONDS, max_attempts=MAX_ATTEMPTS,
+                 token=None):
+        self.artifact_dir = str(artifact_dir)
+        self.token = token or os.environ.get('RENDER_NODE_TOKEN') or None
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_attempts = max_attempts
+        self._nodes = {}
+        self._jobs = {}
+        self._pending = deque()
+        self._finished = deque()
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        # Last exception raised inside the dispatch loop ({'at', 'error'}), reported by stats()
+        self.last_error = None
+        for url in nodes:
+            self.register(url)
+
+    # -- Nodes -----------------------------------------------------------
+
+    def register(self, url):
+        """Add a node (base URL such as http://127.0.0.1:8801); it takes jobs after its first heartbeat."""
+        url = url.strip().rstrip('/')
+        if not url:
+            return
+        with self._condition:
+            self._nodes.setdefault(url, {
+                'url': url,
+                'alive': False,
+                'missed': 0,
+                'last_seen': None,
+                'node_id': None,
+                'slots': 0,
+                'busy': 0,
+                'running': [],
+                'jobs_done': 0,
+                'error': None,
+                'next_heartbeat': 0.0,
+            })
+            self._condition.notify_all()
+
+    def unregister(self, url):
+        """Remove a node; its running jobs go back to the queue."""
+        url = url.strip().rstrip('/')
+        with self._condition:
+            if self._nodes.pop(url, None) is not None:
+                self._requeue_node_jobs(url, "node unregistered")
+
+    def set_nodes(self, urls):
+        """Make the registry match urls (registering new nodes, unregistering missing ones)."""
+        wanted = {url.strip().rstrip('/') for url in urls if url.strip()}
+        with self._condition:
+            current = set(self._nodes)
+        for url in current - wanted:
+            self.unregister(url)
+        for url in wanted - current:
+            self.register(url)
+
+    def nodes(self):
+        """Node snapshots for the UI."""
+        with self._condition:
+            return [
+                {key: value for key, value in node.items() if key != 'next_heartbeat'}
+                for node in self._nodes.values()
+            ]
+
+    # -- Jobs ------------------------------------------------------------
+
+    def start(self):
+        """Start the dispatch loop (idempotent)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='render-dispatch', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    def submit(self, spec, options=None, label=None):
+        """Queue a render of spec (options: preview, views, template, timeout). Returns the job ID."""
+        job_id = uuid.uuid4().hex[:12]
+        with self._condition:
+            self._jobs[job_id] = {
+                'id': job_id,
+                'label': label or job_id,
+                'spec': spec,
+                'options': dict(options or {}),
+                'status': QUEUED,
+                'node': None,
+                'attempts': 0,
+                'submitted_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'error': None,
+                'history': [],
+                'timings': {},
+                'artifacts': {},
+            }
+            self._pending.append(job_id)
+            self._condition.notify_all()
+        return job_id
+
+    def cancel(self, job_id):
+        """Cancel a queued job, or a running one on its node. Returns True if the job was still active."""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] not in ACTIVE_STATUSES:
+                return False
+            node = job['node']
+            if job['status'] == QUEUED:
+                self._pending.remove(job_id)
+            self._finish(job, CANCELLED, None)
+        if node:
+            try:
+                node_request(f"{node}/jobs/{job_id}", 'DELETE', token=self.token)
+            except NodeError:
+                pass
+        return True
+
+    def get(self, job_id):
+        with self._condition:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait(self, job_ids, timeout=None, cancel_event=None):
+        """
+        Block until every job in job_ids has finished, timeout seconds pass (jobs keep running)
+        or cancel_event is set (which cancels the unfinished jobs). Returns the job snapshots in job_ids order.
+        """
+        deadline = time.time() + timeout if timeout else None
+        with self._condition:
+            while any(self._jobs[job_id]['status'] in ACTIVE_STATUSES for job_id in job_ids if job_id in self._jobs):
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                if deadline is not None and time.time() > deadline:
+                    break
+                self._condition.wait(POLL_SECONDS)
+        if cancel_event is not None and cancel_event.is_set():
+            for job_id in job_ids:
+                self.cancel(job_id)
+        return [self.get(job_id) for job_id in job_ids]
+
+    def stats(self):
+        """Number of jobs per status plus live nodes, free slots and the dispatch loop's last error."""
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)}
+        with self._condition:
+            for job in self._jobs.values():
+                counts[job['status']] += 1
+            live = [node for node in self._nodes.values() if node['alive']]
+            counts['nodes'] = len(live)
+            counts['free_slots'] = sum(self._free_slots(node['url']) for node in live)
+            counts['last_error'] = self.last_error
+        return counts
+
+    def _finish(self, job, status, error):
+        job['status'] = status
+        job['error'] = error
+        job['finished_at'] = time.time()
+        self._finished.append(job['id'])
+        while len(self._finished) > HISTORY_LIMIT:
+            self._jobs.pop(self._finished.popleft(), None)
+        self._condition.notify_all()
+
+    def _requeue(self, job, reason):
+        """Put a job back in the queue after losing it on a node (or fail it after max_attempts)."""
+        job['history'].append({'node': job['node'], 'reason': reason, 'at': time.time()})
+        job['node'] = None
+        if job['attempts'] >= self.max_attempts:
+            self._finish(job, FAILED, f"Gave up after {job['attempts']} attempts: {reason}")
+            return
+        job['status'] = QUEUED
+        # Requeued jobs go first: they have waited longest
+        self._pending.appendleft(job['id'])
+        self._condition.notify_all()
+
+    def _requeue_node_jobs(self, url, reason):
+        for job in self._jobs.values():
+            if job['status'] == RUNNING and job['node'] == url:
+                self._requeue(job, reason)
+
+    def _free_slots(self, url):
+        node = self._nodes[url]
+        assigned = sum(1 for job in self._jobs.values() if job['status'] == RUNNING and job['node'] == url)
+        return max(node['slots'] - assigned, 0)
+
+    # -- Dispatch loop ---------------------------------------------------
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self._heartbeats()
+                self._poll_running()
+                self._assign()
+            except Exception as e:
+                # Never let one bad response stop dispatching, but keep the error visible
+                with self._condition:
+                    self.last_error = {'at': time.time(), 'error': f"{type(e).__name__}: {e}"}
+            with self._condition:
+                self._condition.wait(POLL_SECONDS)
+
+    def _heartbeats(self):
+        now = time.time()
+        with self._condition:
+            due = [node['url'] for node in self._nodes.values() if node['next_heartbeat'] <= now]
+        for url in due:
+            try:
+                status, health = node_json(f"{url}/health", token=self.token)
+                error = None if status == 200 else f"HTTP {status}"
+            except NodeError as e:
+                health, error = {}, str(e)
+            with self._condition:
+                node = self._nodes.get(url)
+                if node is None:
+                    continue
+                node['next_heartbeat'] = time.time() + self.heartbeat_seconds
+                if error is None:
+                    if node['node_id'] and health.get('node_id') != node['node_id']:
+                        # Same URL, new process: whatever it was running is gone
+                        self._requeue_node_jobs(url, "node restarted")
+                    node.update(alive=True, missed=0, last_seen=time.time(), error=None,
+                                node_id=health.get('node_id'), slots=int(health.get('slots', 0)),
+                                busy=int(health.get('busy', 0)), running=list(health.get('running', [])),
+                                jobs_done=int(health.get('jobs_done', 0)))
+                    self._condition.notify_all()
+                else:
+                    node['missed'] += 1
+                    node['error'] = error
+                    if node['alive'] and node['missed'] >= MAX_MISSED_HEARTBEATS:
+                        node['alive'] = False
+                        self._requeue_node_jobs(url, f"node lost ({error})")
+                    elif not node['last_seen']:
+                        node['alive'] = False
+
+    def _poll_running(self):
+        with self._condition:
+            running = [(job['id'], job['node']) for job in self._jobs.values() if job['status'] == RUNNING]
+        for job_id, url in running:
+            try:
+                status, remote = node_json(f"{url}/jobs/{job_id}", token=self.token)
+            except NodeError:
+                continue  # The heartbeat decides whether the node is lost
+            if status == 404:
+                with self._condition:
+                    job = self._jobs.get(job_id)
+                    if job and job['status'] == RUNNING and job['node'] == url:
+                        self._requeue(job, "node no longer knows the job")
+                continue
+            if status != 200 or remote.get('status') == RUNNING:
+                continue
+            if remote.get('status') == DONE:
+                try:
+                    artifacts = {artifact['kind']: self._fetch_artifact(url, artifact) for artifact in remote.get('artifacts', [])}
+                except NodeError as e:
+                    with self._condition:
+                        job = self._jobs.get(job_id)
+                        if job and job['status'] == RUNNING:
+                            self._requeue(job, f"artifact download failed ({e})")
+                    continue
+                with self._condition:
+                    job = self._jobs.get(job_id)
+                    if job and job['status'] == RUNNING:
+                        job['artifacts'] = artifacts
+                        job['timings'] = remote.get('timings', {})
+                        self._finish(job, DONE, None)
+            else:
+                # The node ran the job and it failed (or was cancelled there): a render error
+                # repeats on any node, so only node loss is retried
+                with self._condition:
+                    job = self._jobs.get(job_id)
+                    if job and job['status'] == RUNNING:
+                        job['timings'] = remote.get('timings', {})
+                        status = CANCELLED if remote.get('status') == CANCELLED else FAILED
+                        self._finish(job, status, remote.get('error') or f"job {remote.get('status')} on node")
+
+    def _fetch_artifact(self, url, artifact):
+        """Local path of an artifact, downloaded (and verified) only if the store does not have it yet."""
+        sha256 = artifact['sha256']
+        path = os.path.join(self.artifact_dir, f"{sha256}.png")
+        if os.path.exists(path):
+            os.utime(path)
+            return path
+        status, payload = node_request(f"{url}/artifacts/{sha256}", timeout=ARTIFACT_TIMEOUT, token=self.token)
+        if status != 200:
+            raise NodeError(f"artifact {sha256[:12]}: HTTP {status}", status)
+        if hashlib.sha256(payload).hexdigest() != sha256:
+            raise NodeError(f"artifact {sha256[:12]}: content hash mismatch")
+        temp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(temp_path, path)
+        return path
+
+    def _assign(self):
+        while True:
+            with self._condition:
+                if not self._pending:
+                    return
+                candidates = [url for url, node in self._nodes.items() if node['alive'] and self._free_slots(url) > 0]
+                if not candidates:
+                    return
+                # Least loaded node first
+                url = max(candidates, key=self._free_slots)
+                job_id = self._pending.popleft()
+                job = self._jobs[job_id]
+                job['status'] = RUNNING
+                job['node'] = url
+                job['attempts'] += 1
+                job['started_at'] = time.time()
+                request = {'job_id': job_id, 'spec': job['spec'], 'options': job['options']}
+            try:
+                status, reply = node_json(f"{url}/jobs", 'POST', request, token=self.token)
+                error = None if status == 202 else reply.get('error') or f"HTTP {status}"
+            except NodeError as e:
+                status, error = None, str(e)
+            if error is None:
+                continue
+            with self._condition:
+                # Not started, so it neither counts as an attempt nor loses its place in the queue
+                job['attempts'] -= 1
+                job['status'] = QUEUED
+                job['node'] = None
+                self._pending.appendleft(job_id)
+                node = self._nodes.get(url)
+                if node is not None:
+                    # Full (busy with work from elsewhere) or unreachable: skip it until its next heartbeat
+                    node['slots'] = 0
+                    node['error'] = error
+                    node['next_heartbeat'] = 0.0
+                    if status != 503:
+                        node['alive'] = False
+
+
+_dispatchers = {}
+_dispatchers_lock = threading.Lock()
+
+
+def get_render_dispatcher(name, artifact_dir, nodes=()):
+    """Process-wide dispatcher shared by every Streamlit session, started on first use with nodes registered."""
+    with _dispatchers_lock:
+        dispatcher = _dispatchers.get(name)
+        if dispatcher is None:
+            dispatcher = RenderDispatcher(artifact_dir, nodes).start()
+            _dispatchers[name] = dispatcher
+        return dispatcher
+
+
+def main(argv=None):
+    """Self-test: start local render nodes in this process, dispatch jobs across them and report."""
+    from render_node import RenderNodeServer
+    from scene_spec import CATEGORY_MARKER_COLORS, MO_MARKERS, spec_for_case
+
+    parser = argparse.ArgumentParser(description="Dispatch test renders across local render nodes.")
+    parser.add_argument('--local-nodes', type=int, default=3, help="Render nodes to start on this machine")
+    parser.add_argument('--slots', type=int, default=1, help="Render slots per node")
+    parser.add_argument('--jobs', type=int, default=12)
+    parser.add_argument('--blender', default='blender', help="Blender executable for the nodes")
+    parser.add_argument('--kill-node-after', type=int, default=0, metavar='N',
+                        help="Stop the first node once N jobs are done, to exercise requeue on node loss")
+    parser.add_argument('--timeout', type=float, default=600)
+    parser.add_argument('--json', default=None, help="Write the report to this file")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix='render_dispatch_')
+    nodes = [
+        RenderNodeServer(args.blender, slots=args.slots, work_dir=os.path.join(work_dir, f"node{index}"),
+                         node_id=f"local{index}").start()
+        for index in range(args.local_nodes)
+    ]
+    dispatcher = RenderDispatcher(os.path.join(work_dir, 'artifacts'), [node.endpoint for node in nodes],
+                                  heartbeat_seconds=0.5).start()
+    categories = list(CATEGORY_MARKER_COLORS)
+    methods = [None] + list(MO_MARKERS)
+    started = time.perf_counter()
+    job_ids = [
+        dispatcher.submit(spec_for_case(categories[index % len(categories)], 1.0, methods[index % len(methods)]),
+                          label=f"case {index}")
+        for index in range(args.jobs)
+    ]
+
+    killed = None
+    if args.kill_node_after:
+        while dispatcher.stats()[DONE] < args.kill_node_after and time.perf_counter() - started < args.timeout:
+            time.sleep(0.1)
+        killed = nodes[0].endpoint
+        nodes[0].stop()
+        print(f"Stopped node {killed}")
+    jobs = dispatcher.wait(job_ids, timeout=args.timeout)
+    for job_id in job_ids:
+        dispatcher.cancel(job_id)  # Still unfinished after the timeout
+    seconds = time.perf_counter() - started
+
+    per_node = {}
+    for job in jobs:
+        per_node[job['node'] or '-'] = per_node.get(job['node'] or '-', 0) + 1
+    report = {
+        'nodes': len(nodes),
+        'jobs': len(jobs),
+        'done': sum(1 for job in jobs if job['status'] == DONE),
+        'failed': [{'id': job['id'], 'error': job['error']} for job in jobs if job['status'] != DONE],
+        'requeued': sum(len(job['history']) for job in jobs),
+        'killed_node': killed,
+        'jobs_per_node': per_node,
+        'unique_artifacts': len(os.listdir(dispatcher.artifact_dir)),
+        'seconds': round(seconds, 2),
+    }
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    dispatcher.stop()
+    for node in nodes[1:] if killed else nodes:
+        node.stop()
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return 0 if report['done'] == report['jobs'] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
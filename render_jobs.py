@@ -0,0 +1,246 @@
+"""
+Render Jobs - Background render job queue with status polling and cancellation.
+The GENERATE EVIDENCE ROOM handler submits a job and returns immediately; worker
+threads run the renders while the Streamlit script keeps rerunning and polls the
+job status. Each session can queue several renders and cancel queued or running ones.
+Runners stream live progress and Blender output into the job (output in a ring buffer).
+"""
+
+import threading
+import time
+import uuid
+from collections import deque
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+# Finished jobs kept for status lookups
+HISTORY_LIMIT = 200
+
+# Lines of render output kept per job (ring buffer)
+JOB_LOG_LINES = 500
+
+# Seconds of history behind utilization()
+UTILIZATION_WINDOW = 300
+
+
+class RenderJobQueue:
+    """
+    In-process render job queue.
+    runner(job, cancel_event) performs a render and returns (result, error); it should
+    stop early once cancel_event is set. Jobs are dicts identified by job ID and owned
+    by a session ID. Remote jobs (rendered elsewhere, e.g. on render nodes) start at once
+    on their own thread instead of waiting for one of the local workers.
+    """
+
+    def __init__(self, runner, workers=1):
+        self.runner = runner
+        self.worker_count = workers
+        self._jobs = {}
+        self._pending = deque()
+        self._cancel_events = {}
+        self._logs = {}
+        self._finished = deque()
+        self._busy_intervals = deque()
+        self._created_at = time.time()
+        self._condition = threading.Condition()
+        self._threads = []
+
+    def start(self):
+        """Start the worker threads (idempotent)."""
+        if self._threads:
+            return self
+        for index in range(self.worker_count):
+            thread = threading.Thread(target=self._worker_loop, name=f"render-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, owner, params, label=None, remote=False):
+        """
+        Queue a render job for a session. Returns the job ID.
+        remote=True marks a job whose runner only waits on renders elsewhere: it does not take
+        a local worker (local workers are sized to this host), so it never queues behind local renders.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        with self._condition:
+            self._jobs[job_id] = {
+                'id': job_id,
+                'owner': owner,
+                'label': label or job_id,
+                'params': dict(params),
+                'status': QUEUED,
+                'submitted_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None,
+                'progress': {},
+                'remote': remote,
+            }
+            self._cancel_events[job_id] = threading.Event()
+            self._logs[job_id] = deque(maxlen=JOB_LOG_LINES)
+            if not remote:
+                self._pending.append(job_id)
+                self._condition.notify()
+        if remote:
+            threading.Thread(target=self._run, args=(job_id,), name=f"render-remote-{job_id}", daemon=True).start()
+        return job_id
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued job immediately, or signal a running one to stop.
+        Returns True if the job was still active.
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] not in ACTIVE_STATUSES:
+                return False
+            self._cancel_events[job_id].set()
+            if job['status'] == QUEUED:
+                # Not yet picked up (remote jobs and jobs being handed to a worker are not in _pending)
+                if job_id in self._pending:
+                    self._pending.remove(job_id)
+                self._finish(job, CANCELLED, None, None)
+            return True
+
+    def get(self, job_id):
+        """Snapshot of a job (with its queue position while queued), or None."""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job)
+            if job['status'] == QUEUED and job_id in self._pending:
+                snapshot['position'] = self._pending.index(job_id) + 1
+            return snapshot
+
+    def jobs_for(self, owner):
+        """Snapshots of a session's jobs, newest first."""
+        with self._condition:
+            job_ids = [job['id'] for job in self._jobs.values() if job['owner'] == owner]
+        jobs = [self.get(job_id) for job_id in job_ids]
+        return sorted([job for job in jobs if job], key=lambda job: job['submitted_at'], reverse=True)
+
+    def append_log(self, job_id, line):
+        """Add a line of render output to a job's log (the oldest lines drop off)."""
+        with self._condition:
+            log = self._logs.get(job_id)
+            if log is not None:
+                log.append(line)
+
+    def log_lines(self, job_id):
+        """A job's buffered render output, oldest first."""
+        with self._condition:
+            return list(self._logs.get(job_id, ()))
+
+    def update_progress(self, job_id, **fields):
+        """Merge live progress fields (phase, stage, percent, ...) into a job's progress dict."""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job['progress'] = dict(job['progress'], **fields)
+
+    def stats(self):
+        """Number of jobs per status."""
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)}
+        with self._condition:
+            for job in self._jobs.values():
+                counts[job['status']] += 1
+        return counts
+
+    def utilization(self, window=UTILIZATION_WINDOW):
+        """
+        Worker usage over the last window seconds (at most UTILIZATION_WINDOW): workers, running, queued, busy_share
+        (time workers spent rendering / worker time available), finished jobs and jobs per minute.
+        Remote jobs do not use the workers; only their number running is reported ('remote').
+        """
+        now = time.time()
+        start = max(now - window, self._created_at)
+        with self._condition:
+            while self._busy_intervals and self._busy_intervals[0][1] < now - window:
+                self._busy_intervals.popleft()
+            intervals = list(self._busy_intervals)
+            running = [job['started_at'] for job in self._jobs.values() if job['status'] == RUNNING and not job['remote']]
+            remote = sum(1 for job in self._jobs.values() if job['status'] == RUNNING and job['remote'])
+            queued = len(self._pending)
+        busy = sum(end - max(begin, start) for begin, end in intervals if end > start)
+        busy += sum(now - max(begin, start) for begin in running)
+        elapsed = max(now - start, 1e-6)
+        finished = sum(1 for _, end in intervals if end > start)
+        return {
+            'workers': self.worker_count,
+            'running': len(running),
+            'remote': remote,
+            'queued': queued,
+            'busy_share': min(busy / (elapsed * self.worker_count), 1.0),
+            'window_seconds': elapsed,
+            'finished': finished,
+            'jobs_per_minute': finished * 60.0 / elapsed,
+        }
+
+    def _finish(self, job, status, result, error):
+        job['status'] = status
+        job['result'] = result
+        job['error'] = error
+        job['finished_at'] = time.time()
+        if job['started_at'] is not None and not job['remote']:
+            self._busy_intervals.append((job['started_at'], job['finished_at']))
+        while self._busy_intervals and self._busy_intervals[0][1] < job['finished_at'] - UTILIZATION_WINDOW:
+            self._busy_intervals.popleft()
+        self._cancel_events.pop(job['id'], None)
+        self._finished.append(job['id'])
+        # Forget the oldest finished jobs
+        while len(self._finished) > HISTORY_LIMIT:
+            expired_id = self._finished.popleft()
+            self._jobs.pop(expired_id, None)
+            self._logs.pop(expired_id, None)
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                job_id = self._pending.popleft()
+            self._run(job_id)
+
+    def _run(self, job_id):
+        """Run one job on the calling thread and record its outcome."""
+        with self._condition:
+            job = self._jobs[job_id]
+            if job['status'] != QUEUED:
+                return  # Cancelled before it started
+            job['status'] = RUNNING
+            job['started_at'] = time.time()
+            cancel_event = self._cancel_events[job_id]
+            snapshot = dict(job)
+
+        try:
+            result, error = self.runner(snapshot, cancel_event)
+        except Exception as e:
+            result, error = None, f"{type(e).__name__}: {e}"
+
+        with self._condition:
+            if cancel_event.is_set():
+                self._finish(job, CANCELLED, result, error)
+            else:
+                self._finish(job, FAILED if error else DONE, result, error)
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_render_queue(name, runner, workers=1):
+    """Process-wide render queue shared by every Streamlit session, started on first use."""
+    with _queues_lock:
+        queue = _queues.get(name)
+        if queue is None:
+            queue = RenderJobQueue(runner, workers).start()
+            _queues[name] = queue
+        return queue
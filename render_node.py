@@ -0,0 +1,364 @@
+"""
+Render Node - HTTP render service for multi-node rendering.
+A node runs reconstruct_scene.py jobs on its own pool of persistent Blender workers and
+keeps the finished images in a content-addressed store (files named by their SHA-256),
+so the dispatcher (render_dispatch.py) downloads each artifact once and can verify it.
+Several nodes can run on one machine with different ports and work directories.
+
+Every request must carry the shared token (RENDER_NODE_TOKEN, sent by the dispatcher) in
+the X-Render-Token header when one is set; a node listening beyond localhost requires one.
+
+Endpoints:
+    GET    /health              node ID, slots, busy slots and running job IDs (the heartbeat)
+    POST   /jobs                {"job_id", "spec", "options"} -> 202, or 503 when every slot is busy
+    GET    /jobs/<job_id>       status, error, timings and artifacts [{"kind", "sha256", "bytes"}]
+    DELETE /jobs/<job_id>       cancel a running job
+    GET    /artifacts/<sha256>  artifact bytes (image/png)
+
+Usage:
+    python render_node.py [--port 8801] [--blender blender] [--slots 2] [--work-dir DIR]
+    RENDER_NODE_TOKEN=secret python render_node.py --host 0.0.0.0
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from render_jobs import RUNNING, DONE, FAILED, CANCELLED
+from render_pool import plan_render_pool, usable_cpu_count
+from render_worker import BlenderWorkerPool, RENDER_TIMEOUT
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Finished jobs a node remembers for status requests
+JOB_HISTORY = 500
+
+# Artifacts not fetched within this many seconds are deleted
+ARTIFACT_MAX_AGE = 24 * 3600
+
+# Header carrying the shared node token
+TOKEN_HEADER = 'X-Render-Token'
+
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+JOB_PATH = re.compile(r'^/jobs/(?P<job_id>[\w-]{1,64})$')
+ARTIFACT_PATH = re.compile(r'^/artifacts/(?P<sha256>[0-9a-f]{64})$')
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RenderNodeState:
+    """
+    Jobs, Blender worker pool and artifact store of one render node.
+    Each accepted job runs on a background thread holding one worker of the pool;
+    a node accepts at most slots jobs at a time.
+    """
+
+    def __init__(self, blender_exe, script_path=None, work_dir=None, slots=None, node_id=None):
+        plan = plan_render_pool()
+        self.slots = max(int(slots or plan['workers']), 1)
+        self.threads = max(usable_cpu_count() // self.slots, 1)
+        self.node_id = node_id or uuid.uuid4().hex[:8]
+        self.work_dir = os.path.abspath(work_dir or os.path.join(BASE_DIR, 'evidence_renders', f"node_{self.node_id}"))
+        self.output_dir = os.path.join(self.work_dir, 'jobs')
+        self.artifact_dir = os.path.join(self.work_dir, 'artifacts')
+        os.makedirs(self.output_dir, exist_ok=True)
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        self.pool = BlenderWorkerPool(blender_exe, script_path or os.path.join(BASE_DIR, 'reconstruct_scene.py'),
+                                      size=self.slots, cwd=BASE_DIR)
+        self.started_at = time.time()
+        self.jobs_done = 0
+        self.jobs_failed = 0
+        self._jobs = {}
+        self._cancel_events = {}
+        self._finished = deque()
+        self._lock = threading.Lock()
+
+    def accept(self, job_id, spec, options=None):
+        """Start a job. Returns False when every slot is busy; resubmitting an active job is a no-op."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job['status'] == RUNNING:
+                return True
+            if sum(1 for job in self._jobs.values() if job['status'] == RUNNING) >= self.slots:
+                return False
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'status': RUNNING,
+                'started_at': time.time(),
+                'finished_at': None,
+                'error': None,
+                'timings': {},
+                'artifacts': [],
+            }
+            cancel_event = threading.Event()
+            self._cancel_events[job_id] = cancel_event
+        self.prune_artifacts()
+        threading.Thread(target=self._run, args=(job_id, spec, dict(options or {}), cancel_event),
+                         name=f"render-node-{job_id}", daemon=True).start()
+        return True
+
+    def cancel(self, job_id):
+        with self._lock:
+            cancel_event = self._cancel_events.get(job_id)
+        if cancel_event is None:
+            return False
+        cancel_event.set()
+        return True
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def health(self):
+        with self._lock:
+            running = [job_id for job_id, job in self._jobs.items() if job['status'] == RUNNING]
+        return {
+            'node_id': self.node_id,
+            'slots': self.slots,
+            'threads': self.threads,
+            'busy': len(running),
+            'running': running,
+            'jobs_done': self.jobs_done,
+            'jobs_failed': self.jobs_failed,
+            'uptime': time.time() - self.started_at,
+            'workers': self.pool.status(),
+        }
+
+    def artifact_path(self, sha256):
+        return os.path.join(self.artifact_dir, f"{sha256}.png")
+
+    def store_artifact(self, kind, path):
+        """Move a finished image into the content-addressed store. Returns its artifact record."""
+        sha256 = file_sha256(path)
+        size = os.path.getsize(path)
+        target = self.artifact_path(sha256)
+        if os.path.exists(target):
+            os.remove(path)  # Identical image already stored
+        else:
+            os.replace(path, target)
+        return {'kind': kind, 'sha256': sha256, 'bytes': size}
+
+    def prune_artifacts(self, max_age=ARTIFACT_MAX_AGE):
+        cutoff = time.time() - max_age
+        for name in os.listdir(self.artifact_dir):
+            path = os.path.join(self.artifact_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def _run(self, job_id, spec, options, cancel_event):
+        output_path = os.path.join(self.output_dir, f"render_{job_id}.png")
+        base = os.path.splitext(output_path)[0]
+        views = list(options.get('views') or [])
+        request = {
+            'spec': spec,
+            'output': output_path,
+            'threads': self.threads,
+            'preview': int(options.get('preview', 0)),
+            'views': views,
+            'template': options.get('template', True),
+        }
+        reply, error, artifacts = None, None, []
+        try:
+            with self.pool.lease() as worker:
+                reply, error = worker.render(request, timeout=options.get('timeout') or RENDER_TIMEOUT,
+                                             cancel_event=cancel_event)
+            # Same file names reconstruct_scene.py writes next to the output
+            outputs = [('render', output_path), ('preview', f"{base}.preview.png")]
+            outputs += [(f"view_{view}", f"{base}.{view}.png") for view in views]
+            for kind, path in outputs:
+                if os.path.exists(path):
+                    artifacts.append(self.store_artifact(kind, path))
+            if error is None and not any(artifact['kind'] == 'render' for artifact in artifacts):
+                error = "Render finished but no image was written"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+
+        with self._lock:
+            job = self._jobs[job_id]
+            if cancel_event.is_set():
+                job['status'] = CANCELLED
+            else:
+                job['status'] = FAILED if error else DONE
+            job['error'] = error
+            job['timings'] = (reply or {}).get('timings', {})
+            job['artifacts'] = artifacts
+            job['finished_at'] = time.time()
+            self._cancel_events.pop(job_id, None)
+            if job['status'] == DONE:
+                self.jobs_done += 1
+            elif job['status'] == FAILED:
+                self.jobs_failed += 1
+            self._finished.append(job_id)
+            while len(self._finished) > JOB_HISTORY:
+                self._jobs.pop(self._finished.popleft(), None)
+
+
+class RenderNodeHandler(BaseHTTPRequestHandler):
+    """Routes the render node endpoints to the shared RenderNodeState."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass  # Heartbeats would flood the console
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def _authorized(self):
+        """True if the node has no token or the request carries it; otherwise answers 401."""
+        token = self.server.token
+        if not token or hmac.compare_digest(self.headers.get(TOKEN_HEADER, ''), token):
+            return True
+        self._send(401, {'error': 'Missing or wrong render node token'})
+        return False
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length).decode('utf-8'))
+
+    def _send(self, status, body=None, content_type='application/json; charset=UTF-8'):
+        payload = b''
+        if body is not None:
+            payload = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        if body is not None:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if payload:
+            self.wfile.write(payload)
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        path = urlsplit(self.path).path
+        if path == '/health':
+            return self._send(200, self.state.health())
+        match = JOB_PATH.match(path)
+        if match:
+            job = self.state.get(match.group('job_id'))
+            return self._send(200, job) if job else self._send(404, {'error': 'Unknown job'})
+        match = ARTIFACT_PATH.match(path)
+        if match:
+            artifact_path = self.state.artifact_path(match.group('sha256'))
+            if not os.path.exists(artifact_path):
+                return self._send(404, {'error': 'Unknown artifact'})
+            with open(artifact_path, 'rb') as f:
+                return self._send(200, f.read(), content_type='image/png')
+        self._send(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if urlsplit(self.path).path != '/jobs':
+            return self._send(404, {'error': 'Not found'})
+        try:
+            request = self._read_json()
+            job_id = str(request['job_id'])
+            if not re.match(r'^[\w-]{1,64}$', job_id):
+                raise ValueError(f"Bad job_id {job_id!r}")
+        except (ValueError, KeyError) as e:
+            return self._send(400, {'error': f"Bad request: {e}"})
+        if not self.state.accept(job_id, request.get('spec'), request.get('options')):
+            return self._send(503, {'error': 'All render slots busy', 'slots': self.state.slots})
+        self._send(202, {'job_id': job_id, 'node_id': self.state.node_id})
+
+    def do_DELETE(self):
+        if not self._authorized():
+            return
+        match = JOB_PATH.match(urlsplit(self.path).path)
+        if not match:
+            return self._send(404, {'error': 'Not found'})
+        self._send(200, {'cancelled': self.state.cancel(match.group('job_id'))})
+
+
+class RenderNodeServer:
+    """
+    Threaded render node; start() it and register its endpoint with a RenderDispatcher.
+    token defaults to RENDER_NODE_TOKEN; a node on a non-loopback host refuses to start without one.
+    """
+
+    def __init__(self, blender_exe, host='127.0.0.1', port=0, script_path=None, work_dir=None, slots=None,
+                 node_id=None, token=None):
+        token = token or os.environ.get('RENDER_NODE_TOKEN') or None
+        if not token and host not in LOOPBACK_HOSTS:
+            raise ValueError(f"Render node on {host} needs a shared token (set RENDER_NODE_TOKEN or pass --token)")
+        self.state = RenderNodeState(blender_exe, script_path, work_dir, slots, node_id)
+        self.httpd = ThreadingHTTPServer((host, port), RenderNodeHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = self.state
+        self.httpd.token = token
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name=f"render-node-{self.state.node_id}",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and shut down the node's Blender workers (what a lost node looks like to the dispatcher)."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.state.pool.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a Forensic Architect render node.")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="Interface to listen on (0.0.0.0 for other machines - requires a token)")
+    parser.add_argument('--port', type=int, default=8801)
+    parser.add_argument('--blender', default='blender', help="Blender executable")
+    parser.add_argument('--slots', type=int, default=None, help="Concurrent renders (default: sized from cores and memory)")
+    parser.add_argument('--work-dir', default=None, help="Job outputs and artifact store (default: evidence_renders/node_<id>)")
+    parser.add_argument('--node-id', default=None)
+    parser.add_argument('--token', default=None, help="Shared token the dispatcher must send (default: RENDER_NODE_TOKEN)")
+    args = parser.parse_args(argv)
+
+    try:
+        server = RenderNodeServer(args.blender, args.host, args.port, work_dir=args.work_dir, slots=args.slots,
+                                  node_id=args.node_id or f"{socket.gethostname()}-{args.port}", token=args.token)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Render node {server.state.node_id} listening on {server.endpoint} "
+          f"({server.state.slots} slots x {server.state.threads} threads, artifacts in {server.state.artifact_dir})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        server.state.pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Render Pool - Sizes render concurrency to the host.
+Decides how many Blender renders may run at once (from the CPU cores this process may
+use and the memory available) and how many render threads each one gets, so concurrent
+renders share the cores instead of oversubscribing them. Excess jobs wait in the render
+queue. Pure Python (no psutil); memory is read from /proc or the Windows API.
+"""
+
+import os
+import threading
+
+# Memory one Blender render process needs (MB) and memory left for the app itself
+RENDER_PROCESS_MB = 768
+RESERVED_MEMORY_MB = 1024
+
+# Fewer renders with several threads each finish sooner than many single-threaded ones
+MIN_THREADS_PER_RENDER = 2
+
+# Upper bound on concurrent renders, however large the host
+MAX_CONCURRENT_RENDERS = 8
+
+
+def usable_cpu_count():
+    """CPU cores this process may run on (respects affinity / container CPU sets where the OS reports them)."""
+    try:
+        return max(len(os.sched_getaffinity(0)), 1)
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def available_memory_mb():
+    """Memory available for new processes in MB (None if it cannot be read)."""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1024.0
+    except (OSError, ValueError, IndexError):
+        pass
+    if os.name == 'nt':
+        try:
+            import ctypes
+
+            class MemoryStatusEx(ctypes.Structure):
+                _fields_ = [('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+                            ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                            ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                            ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                            ('ullAvailExtendedVirtual', ctypes.c_ulonglong)]
+
+            status = MemoryStatusEx()
+            status.dwLength = ctypes.sizeof(status)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return status.ullAvailPhys / (1024.0 * 1024.0)
+        except Exception:
+            pass
+    return None
+
+
+def plan_render_pool(cpus=None, memory_mb=None, max_renders=MAX_CONCURRENT_RENDERS,
+                     process_mb=RENDER_PROCESS_MB, reserved_mb=RESERVED_MEMORY_MB):
+    """
+    Concurrency plan for this host: {'cpus', 'memory_mb', 'workers', 'threads', 'limited_by'}.
+    workers is the number of renders allowed at once (bounded by cores / MIN_THREADS_PER_RENDER,
+    by available memory and by max_renders); threads is scene.render.threads for each render,
+    so that workers * threads never exceeds the cores.
+    """
+    cpus = cpus or usable_cpu_count()
+    if memory_mb is None:
+        memory_mb = available_memory_mb()
+
+    limits = {
+        'cpu': max(cpus // MIN_THREADS_PER_RENDER, 1),
+        'cap': max(max_renders, 1),
+    }
+    if memory_mb is not None:
+        limits['memory'] = max(int((memory_mb - reserved_mb) // process_mb), 1)
+    limited_by = min(limits, key=limits.get)
+    workers = limits[limited_by]
+
+    return {
+        'cpus': cpus,
+        'memory_mb': round(memory_mb) if memory_mb is not None else None,
+        'workers': workers,
+        'threads': max(cpus // workers, 1),
+        'limited_by': limited_by,
+    }
+
+
+def host_load():
+    """1-minute load average per usable core (None where the OS has no load average)."""
+    try:
+        return os.getloadavg()[0] / usable_cpu_count()
+    except (AttributeError, OSError):
+        return None
+
+
+_plan = None
+_plan_lock = threading.Lock()
+
+
+def get_render_plan():
+    """Process-wide pool plan, measured once on first use (the queue and worker pool are sized from it)."""
+    global _plan
+    with _plan_lock:
+        if _plan is None:
+            _plan = plan_render_pool()
+        return dict(_plan)
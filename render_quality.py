@@ -0,0 +1,129 @@
+"""
+Render Quality Check - Local exposure and quality statistics for evidence renders.
+A fast NumPy pass (histogram, mean luminance, variance, edge energy) that runs
+before a render is sent to Google Vision, so black, blank or truncated frames
+are caught locally instead of costing an API call.
+"""
+
+import os
+
+import numpy as np
+from PIL import Image
+
+# Renders are analysed at no more than this long edge (statistics are scale-invariant)
+ANALYSIS_LONG_EDGE = 400
+
+# Thresholds (luminance is 0-1)
+MIN_FILE_BYTES = 2048            # Anything smaller is almost certainly a truncated or empty PNG
+BLACK_FRAME_LUMINANCE = 0.03     # Mean luminance of an effectively black frame
+UNDEREXPOSED_LUMINANCE = 0.2     # Matches the Vision-side underexposure threshold
+OVEREXPOSED_LUMINANCE = 0.9
+NEAR_UNIFORM_STD = 0.02          # Pixel standard deviation of a flat frame
+MIN_EDGE_ENERGY = 0.004          # Mean gradient magnitude of a frame with no visible structure
+
+# Target mean luminance when suggesting a lighting boost for re-renders
+TARGET_LUMINANCE = 0.4
+MAX_LIGHT_BOOST = 8.0
+
+# Issues that make a Vision scan pointless (the rest only annotate the scan)
+BLOCKING_ISSUES = {'tiny_file', 'black_frame', 'near_uniform'}
+
+
+def load_luminance(image_path):
+    """Load an image as a 2D float32 luminance array in 0-1 (downscaled for speed)."""
+    with Image.open(image_path) as img:
+        img = img.convert('RGB')
+        img.thumbnail((ANALYSIS_LONG_EDGE, ANALYSIS_LONG_EDGE))
+        rgb = np.asarray(img, dtype=np.float32) / 255.0
+    # Rec. 709 luma weights
+    return rgb @ np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+
+def compute_statistics(luminance):
+    """Histogram, mean, variance, clipping and edge energy of a luminance array."""
+    histogram, _ = np.histogram(luminance, bins=16, range=(0.0, 1.0))
+    total = float(luminance.size)
+
+    # Edge energy: mean absolute horizontal + vertical gradient
+    grad_x = np.abs(np.diff(luminance, axis=1)).mean() if luminance.shape[1] > 1 else 0.0
+    grad_y = np.abs(np.diff(luminance, axis=0)).mean() if luminance.shape[0] > 1 else 0.0
+
+    low, high = np.percentile(luminance, [1, 99])
+    return {
+        'mean_luminance': round(float(luminance.mean()), 4),
+        'std_luminance': round(float(luminance.std()), 4),
+        'variance': round(float(luminance.var()), 6),
+        'edge_energy': round(float(grad_x + grad_y), 5),
+        'dynamic_range': round(float(high - low), 4),
+        'dark_fraction': round(float((luminance < 0.05).sum() / total), 4),
+        'bright_fraction': round(float((luminance > 0.95).sum() / total), 4),
+        'histogram': [round(count / total, 4) for count in histogram.tolist()],
+    }
+
+
+def suggest_light_boost(mean_luminance):
+    """Lighting multiplier that would bring the mean luminance to TARGET_LUMINANCE."""
+    if mean_luminance >= TARGET_LUMINANCE:
+        return 1.0
+    return round(min(MAX_LIGHT_BOOST, TARGET_LUMINANCE / max(mean_luminance, 0.01)), 2)
+
+
+def assess_render(image_path):
+    """
+    Run the local quality pre-check on a render.
+    Returns a dict with statistics, a list of issues, whether a Vision scan should be
+    blocked ('scan_ok'), and a suggested lighting boost for an automatic re-render.
+    """
+    if not os.path.exists(image_path):
+        return {'scan_ok': False, 'issues': ['missing_file'], 'stats': {}, 'light_boost': 1.0}
+
+    file_bytes = os.path.getsize(image_path)
+    issues = []
+    if file_bytes < MIN_FILE_BYTES:
+        issues.append('tiny_file')
+
+    try:
+        stats = compute_statistics(load_luminance(image_path))
+    except Exception as e:
+        return {
+            'scan_ok': False,
+            'issues': issues + ['unreadable'],
+            'error': str(e),
+            'stats': {'file_bytes': file_bytes},
+            'light_boost': 1.0,
+        }
+    stats['file_bytes'] = file_bytes
+
+    mean = stats['mean_luminance']
+    if mean < BLACK_FRAME_LUMINANCE:
+        issues.append('black_frame')
+    elif mean < UNDEREXPOSED_LUMINANCE:
+        issues.append('underexposed')
+    elif mean > OVEREXPOSED_LUMINANCE:
+        issues.append('overexposed')
+
+    # Both must hold: flat-shaded renders (large single-colour regions) have little edge
+    # energy but plenty of contrast between their surfaces
+    if stats['std_luminance'] < NEAR_UNIFORM_STD and stats['edge_energy'] < MIN_EDGE_ENERGY:
+        issues.append('near_uniform')
+
+    return {
+        'scan_ok': not (set(issues) & BLOCKING_ISSUES),
+        'issues': issues,
+        'stats': stats,
+        'light_boost': suggest_light_boost(mean),
+    }
+
+
+def describe_issues(issues):
+    """Human-readable text for the issue codes returned by assess_render."""
+    descriptions = {
+        'missing_file': "Render file not found",
+        'unreadable': "Render could not be decoded",
+        'tiny_file': "Render file is suspiciously small (truncated or empty)",
+        'black_frame': "Frame is black - lights or camera are not working",
+        'underexposed': "Scene underexposed",
+        'overexposed': "Scene overexposed",
+        'near_uniform': "Frame is nearly uniform - no visible structure",
+    }
+    return [descriptions.get(issue, issue) for issue in issues]
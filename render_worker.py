@@ -0,0 +1,349 @@
+"""
+Render Worker - Supervisor for a persistent headless Blender process.
+Blender is started once in serve mode (reconstruct_scene.py --serve) and receives
+render jobs over a local socket, so each render skips Blender startup and Python
+init. The supervisor restarts the worker when it crashes, stops answering, grows
+past a memory limit or has served a set number of jobs. A BlenderWorkerPool runs
+several such workers so renders can proceed in parallel.
+"""
+
+import json
+import os
+import re
+import socket
+import subprocess
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Seconds to wait for Blender to start and announce its port
+STARTUP_TIMEOUT = 60
+
+# Seconds a single render may take before the worker is considered hung
+RENDER_TIMEOUT = 60
+
+# Recycle the worker once its resident memory exceeds this (MB)
+DEFAULT_MAX_MEMORY_MB = 1536
+
+# Recycle the worker after this many jobs, regardless of memory
+DEFAULT_MAX_JOBS = 200
+
+# Lines of Blender output kept per worker
+LOG_LINES = 500
+
+READY_PATTERN = re.compile(r'WORKER_READY port=(\d+)')
+
+
+def parse_event(line):
+    """
+    Progress event from a line of reconstruct_scene.py output ({"event": ..., ...}),
+    or None for plain Blender output.
+    """
+    line = line.strip()
+    if not line.startswith('{"event"'):
+        return None
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) else None
+
+
+def blender_command(blender_exe, script_path, script_args=None):
+    """Blender command line running script_path headless, with script_args after '--'."""
+    return [
+        blender_exe,
+        '--background',
+        '--factory-startup',
+        '--python',
+        os.path.normpath(str(script_path)),
+        '--'  # Buffer: stop looking for Blender flags
+    ] + list(script_args or [])
+
+
+def hidden_window_startupinfo():
+    """STARTUPINFO that hides the Blender console window on Windows (None elsewhere)."""
+    if os.name != 'nt':
+        return None
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    startupinfo.wShowWindow = subprocess.SW_HIDE
+    return startupinfo
+
+
+class BlenderWorker:
+    """
+    One persistent Blender render worker plus its supervisor logic.
+    render() is serialized (Blender renders one job at a time); the process is
+    (re)started lazily and recycled on crash, timeout or resource growth.
+    """
+
+    def __init__(self, blender_exe, script_path, max_memory_mb=DEFAULT_MAX_MEMORY_MB,
+                 max_jobs=DEFAULT_MAX_JOBS, startup_timeout=STARTUP_TIMEOUT, cwd=None):
+        self.blender_exe = blender_exe
+        self.script_path = script_path
+        self.max_memory_mb = max_memory_mb
+        self.max_jobs = max_jobs
+        self.startup_timeout = startup_timeout
+        self.cwd = cwd or os.getcwd()
+        self.process = None
+        self.port = None
+        self.jobs_served = 0
+        self.restarts = 0
+        self.last_restart_reason = None
+        self.last_memory_mb = None
+        self.startup_seconds = None
+        self.log = deque(maxlen=LOG_LINES)
+        self._line_listener = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    # -- Process management ----------------------------------------------
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """Launch Blender in serve mode and wait until it announces its port."""
+        self._ready.clear()
+        self.port = None
+        self.jobs_served = 0
+        started = time.perf_counter()
+        self.process = subprocess.Popen(
+            blender_command(self.blender_exe, self.script_path, ['--serve', '--port', '0']),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            startupinfo=hidden_window_startupinfo(),
+            env=os.environ.copy(),
+            cwd=self.cwd
+        )
+        threading.Thread(target=self._pump_output, args=(self.process,), name='blender-worker-log',
+                         daemon=True).start()
+
+        if not self._ready.wait(self.startup_timeout) or not self.is_alive():
+            self.kill()
+            raise RuntimeError("Blender worker did not start: " + ' | '.join(list(self.log)[-5:]))
+        self.startup_seconds = time.perf_counter() - started
+
+    def _pump_output(self, process):
+        """Drain Blender's output (so its pipe never blocks) into the log and watch for the ready line."""
+        for line in process.stdout:
+            line = line.rstrip()
+            self.log.append(line)
+            match = READY_PATTERN.search(line)
+            if match and process is self.process:
+                self.port = int(match.group(1))
+                self._ready.set()
+            # Stream the current job's output to its caller as it arrives
+            listener = self._line_listener
+            if listener is not None:
+                try:
+                    listener(line)
+                except Exception:
+                    pass
+
+    def kill(self):
+        """Terminate the worker process (used on hang, crash or recycle)."""
+        process = self.process
+        self.process = None
+        if process is None:
+            return
+        try:
+            process.kill()
+            process.wait(timeout=10)
+        except Exception:
+            pass
+
+    def restart(self, reason):
+        self.kill()
+        self.restarts += 1
+        self.last_restart_reason = reason
+        self.start()
+
+    def stop(self):
+        """Ask the worker to exit cleanly, killing it if it does not."""
+        with self._lock:
+            if self.is_alive():
+                try:
+                    self._request({'cmd': 'shutdown'}, timeout=5)
+                    self.process.wait(timeout=5)
+                except Exception:
+                    pass
+            self.kill()
+
+    # -- Jobs --------------------------------------------------------------
+
+    def _request(self, payload, timeout):
+        with socket.create_connection(('127.0.0.1', self.port), timeout=timeout) as conn:
+            conn.settimeout(timeout)
+            conn.sendall((json.dumps(payload) + "\n").encode('utf-8'))
+            line = conn.makefile('r', encoding='utf-8').readline()
+        if not line:
+            raise ConnectionError("Blender worker closed the connection without replying")
+        return json.loads(line)
+
+    def render(self, job=None, timeout=RENDER_TIMEOUT, cancel_event=None, on_line=None):
+        """
+        Run one render job on the persistent worker.
+        job holds the render arguments (e.g. {'spec': {...}, 'light_boost': 1.5, 'output': path}).
+        Setting cancel_event while the job waits returns at once; while it renders, the worker is killed.
+        on_line(line) receives the worker's output lines (progress events) while the job runs.
+        Returns (reply, error); reply has ok, output, timings (seconds per phase) and memory_mb.
+        """
+        return self._run(dict(job or {}, cmd='render'), timeout, cancel_event, on_line)
+
+    def render_batch(self, frames, timeout=None, cancel_event=None, on_line=None, threads=0):
+        """
+        Render several scene specs in one request ([{'spec': ..., 'output': ...}, ...]); the
+        worker builds the shared room once. timeout defaults to RENDER_TIMEOUT per frame;
+        threads sets Blender's render threads (0 = automatic).
+        Returns (reply, error); reply has per-frame results and timings.
+        """
+        timeout = timeout or RENDER_TIMEOUT * max(len(frames), 1)
+        return self._run({'cmd': 'batch', 'frames': list(frames), 'threads': threads}, timeout, cancel_event, on_line)
+
+    def _run(self, payload, timeout, cancel_event, on_line=None):
+        with self._lock:
+            if cancel_event is not None and cancel_event.is_set():
+                return None, "Render cancelled"
+            self._line_listener = on_line
+            finished = threading.Event()
+            if cancel_event is not None:
+                threading.Thread(target=self._kill_on_cancel, args=(cancel_event, finished),
+                                 name='blender-worker-cancel', daemon=True).start()
+            try:
+                if not self.is_alive():
+                    if self.process is not None:
+                        self.restart(f"worker exited with code {self.process.returncode}")
+                    elif self.startup_seconds is not None:
+                        self.restart(self.last_restart_reason or "worker stopped")
+                    else:
+                        self.start()
+                reply = self._request(payload, timeout)
+            except Exception as e:
+                # Crash, hang or cancel mid-job: the next job gets a fresh worker
+                self.kill()
+                if cancel_event is not None and cancel_event.is_set():
+                    self.last_restart_reason = "render cancelled"
+                    return None, "Render cancelled"
+                self.last_restart_reason = f"{type(e).__name__}: {e}"
+                return None, f"Blender worker failed: {type(e).__name__}: {e}"
+            finally:
+                finished.set()
+                self._line_listener = None
+
+            self.jobs_served += 1
+            self.last_memory_mb = reply.get('memory_mb')
+            self._recycle_if_needed()
+            if not reply.get('ok'):
+                return reply, reply.get('error') or "Render finished but no image was written"
+            return reply, None
+
+    def _kill_on_cancel(self, cancel_event, finished):
+        """Kill the worker if cancel_event is set before the current job finishes."""
+        while not finished.is_set():
+            if cancel_event.wait(0.25):
+                if not finished.is_set():
+                    self.kill()
+                return
+
+    def _recycle_if_needed(self):
+        """Restart the worker proactively when it has grown too large or served too many jobs."""
+        reason = None
+        if self.last_memory_mb and self.last_memory_mb > self.max_memory_mb:
+            reason = f"memory {self.last_memory_mb:.0f} MB > {self.max_memory_mb} MB"
+        elif self.jobs_served >= self.max_jobs:
+            reason = f"served {self.jobs_served} jobs"
+        if reason:
+            # Replace it in the background so neither this job nor the next pays the startup
+            threading.Thread(target=self._recycle, args=(reason,), name='blender-worker-recycle',
+                             daemon=True).start()
+
+    def _recycle(self, reason):
+        with self._lock:
+            try:
+                self.restart(reason)
+            except Exception:
+                self.kill()
+
+    def status(self):
+        """Snapshot for the UI."""
+        return {
+            'alive': self.is_alive(),
+            'port': self.port,
+            'jobs_served': self.jobs_served,
+            'restarts': self.restarts,
+            'last_restart_reason': self.last_restart_reason,
+            'memory_mb': self.last_memory_mb,
+        }
+
+
+class BlenderWorkerPool:
+    """
+    Fixed-size set of persistent Blender workers for one executable and script.
+    lease() hands out an idle worker (waiting while all are busy), so up to size renders
+    run in parallel, one per Blender process. Workers start lazily on their first job.
+    """
+
+    def __init__(self, blender_exe, script_path, size=1, **options):
+        self.workers = [BlenderWorker(blender_exe, script_path, **options) for _ in range(max(size, 1))]
+        self._idle = list(self.workers)
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def lease(self):
+        """Borrow an idle worker for one job (the most recently used first, as it is likely warm)."""
+        with self._condition:
+            while not self._idle:
+                self._condition.wait()
+            worker = self._idle.pop()
+        try:
+            yield worker
+        finally:
+            with self._condition:
+                self._idle.append(worker)
+                self._condition.notify()
+
+    def stop(self):
+        for worker in self.workers:
+            worker.stop()
+
+    def status(self):
+        """Pool snapshot for the UI (the BlenderWorker.status keys, summed over workers, plus size and busy)."""
+        statuses = [worker.status() for worker in self.workers]
+        reasons = [status['last_restart_reason'] for status in statuses if status['last_restart_reason']]
+        memory = [status['memory_mb'] for status in statuses if status['alive'] and status['memory_mb']]
+        with self._condition:
+            busy = len(self.workers) - len(self._idle)
+        return {
+            'alive': any(status['alive'] for status in statuses),
+            'size': len(self.workers),
+            'alive_workers': sum(1 for status in statuses if status['alive']),
+            'busy': busy,
+            'jobs_served': sum(status['jobs_served'] for status in statuses),
+            'restarts': sum(status['restarts'] for status in statuses),
+            'last_restart_reason': reasons[-1] if reasons else None,
+            'memory_mb': sum(memory) if memory else None,
+        }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_worker_pool(blender_exe, script_path, size=1, **options):
+    """
+    Process-wide pool of persistent workers for a Blender executable and script, shared by all
+    sessions (size is fixed on first use). This is the one way to obtain a worker: lease() it.
+    """
+    key = (os.path.normpath(blender_exe), os.path.normpath(str(script_path)))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = BlenderWorkerPool(blender_exe, script_path, size, **options)
+            _pools[key] = pool
+        return pool
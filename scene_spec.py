@@ -0,0 +1,271 @@
+"""
+Scene Spec - JSON description of an evidence room render.
+A spec holds the room size, evidence markers, lights, camera, resolution and render
+engine. reconstruct_scene.py builds the scene from it (--spec), and the app hashes the
+normalized spec to cache finished renders, so identical scenes never launch Blender twice.
+Pure Python (no bpy) so both Blender and the app can import it.
+"""
+
+import hashlib
+import json
+import math
+import os
+
+# Bump when the meaning of a spec field changes (invalidates cached renders)
+SPEC_VERSION = 1
+
+# Bump when the baked template contents change (room, lights, camera or material setup)
+TEMPLATE_VERSION = 2
+
+ENGINES = ('BLENDER_WORKBENCH', 'BLENDER_EEVEE_NEXT', 'BLENDER_EEVEE', 'CYCLES')
+LIGHT_TYPES = ('SUN', 'POINT', 'SPOT', 'AREA')
+
+# The original hard-coded evidence room
+DEFAULT_ROOM = {
+    'size': 20.0,
+    'wall_height': 8.0,
+    'wall_thickness': 0.2,
+    'floor_color': [0.2, 0.2, 0.25, 1.0],
+    'wall_color': [0.85, 0.85, 0.8, 1.0],
+}
+
+DEFAULT_MARKER = {
+    'name': 'BreachPoint',
+    'location': [0.0, 0.0, 1.0],
+    'radius': 0.5,
+    'color': [1.0, 0.0, 0.0, 1.0],  # Bright red
+    'emission': 0.5,  # Slight glow in the marker color
+}
+
+DEFAULT_LIGHTS = [
+    {'name': 'ForensicLight', 'type': 'SUN', 'location': [10.0, -10.0, 15.0],
+     'rotation': [0.785, 0.0, 0.785], 'energy': 5.0, 'shadow_soft_size': 0.25},
+    {'name': 'CenterPointLight', 'type': 'POINT', 'location': [0.0, 0.0, 5.0],
+     'rotation': [0.0, 0.0, 0.0], 'energy': 100.0, 'shadow_soft_size': 2.0},
+]
+
+DEFAULT_CAMERA = {
+    'location': [12.0, -12.0, 8.0],
+    'rotation': [1.1, 0.0, 0.785],  # Looking at the room center
+}
+
+DEFAULT_SPEC = {
+    'room': DEFAULT_ROOM,
+    'markers': [DEFAULT_MARKER],
+    'lights': DEFAULT_LIGHTS,
+    'camera': DEFAULT_CAMERA,
+    'resolution': [800, 600],
+    'engine': 'BLENDER_WORKBENCH',
+    'light_boost': 1.0,
+}
+
+# Contact-sheet viewpoints, in sheet order (see contact_sheet_cameras)
+CONTACT_SHEET_VIEWS = ('top', 'corner', 'closeup')
+
+# Evidence marker color per department (Crime Category)
+CATEGORY_MARKER_COLORS = {
+    'International': [0.0, 0.55, 1.0, 1.0],
+    'Domestic': [1.0, 0.0, 0.0, 1.0],
+    'White Collar': [1.0, 0.8, 0.0, 1.0],
+}
+
+# Extra evidence markers per modus operandi (room center at the origin, walls at +/- size/2)
+MO_MARKERS = {
+    'Theft/Burglary': [{'name': 'EntryPoint', 'location': [0.0, 9.5, 1.5], 'radius': 0.4, 'color': [1.0, 0.5, 0.0, 1.0]}],
+    'Fraud/Scam': [{'name': 'Documents', 'location': [4.0, -4.0, 0.2], 'radius': 0.3, 'color': [0.95, 0.95, 0.7, 1.0]}],
+    'Violence/Assault': [{'name': 'StruggleZone', 'location': [2.5, 1.5, 0.3], 'radius': 0.8, 'color': [0.6, 0.0, 0.0, 1.0]}],
+    'Cyber Crime': [{'name': 'Terminal', 'location': [-6.0, -6.0, 1.0], 'radius': 0.6, 'color': [0.0, 1.0, 0.4, 1.0]}],
+    'Drug Related': [{'name': 'Stash', 'location': [-4.0, 5.0, 0.3], 'radius': 0.35, 'color': [0.9, 0.9, 0.9, 1.0]}],
+    'Financial Crime': [{'name': 'Ledger', 'location': [5.0, 3.0, 0.2], 'radius': 0.3, 'color': [0.2, 0.8, 0.2, 1.0]}],
+    'Property Crime': [{'name': 'DamagePoint', 'location': [-9.5, 0.0, 2.0], 'radius': 0.6, 'color': [1.0, 0.3, 0.0, 1.0]}],
+    'Organized Crime': [
+        {'name': 'MeetingPoint', 'location': [5.0, 5.0, 1.0], 'radius': 0.5, 'color': [0.5, 0.0, 0.8, 1.0]},
+        {'name': 'Lookout', 'location': [-5.0, 8.0, 1.0], 'radius': 0.3, 'color': [0.5, 0.0, 0.8, 1.0]},
+    ],
+}
+
+
+def _number(value, field, minimum=None):
+    try:
+        number = round(float(value), 6)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a number, got {value!r}")
+    if minimum is not None and number < minimum:
+        raise ValueError(f"{field} must be >= {minimum}, got {number}")
+    return number
+
+
+def _vector(value, field, length):
+    if not isinstance(value, (list, tuple)) or len(value) != length:
+        raise ValueError(f"{field} must be a list of {length} numbers, got {value!r}")
+    return [_number(item, field) for item in value]
+
+
+def _color(value, field):
+    # RGB is accepted and padded to RGBA
+    if isinstance(value, (list, tuple)) and len(value) == 3:
+        value = list(value) + [1.0]
+    return [min(max(item, 0.0), 1.0) for item in _vector(value, field, 4)]
+
+
+def _merge(defaults, value, field):
+    if value is None:
+        value = {}
+    if not isinstance(value, dict):
+        raise ValueError(f"{field} must be an object, got {value!r}")
+    unknown = set(value) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown {field} fields: {', '.join(sorted(unknown))}")
+    return dict(defaults, **value)
+
+
+def normalize_spec(spec=None):
+    """
+    Fill defaults into a scene spec and validate it.
+    Returns a new canonical dict (floats rounded, colors RGBA); raises ValueError on bad input.
+    """
+    spec = _merge(DEFAULT_SPEC, spec, 'spec')
+
+    room = _merge(DEFAULT_ROOM, spec['room'], 'room')
+    room = {
+        'size': _number(room['size'], 'room.size', 1.0),
+        'wall_height': _number(room['wall_height'], 'room.wall_height', 0.5),
+        'wall_thickness': _number(room['wall_thickness'], 'room.wall_thickness', 0.01),
+        'floor_color': _color(room['floor_color'], 'room.floor_color'),
+        'wall_color': _color(room['wall_color'], 'room.wall_color'),
+    }
+
+    if not isinstance(spec['markers'], list):
+        raise ValueError("markers must be a list")
+    markers = []
+    for index, marker in enumerate(spec['markers']):
+        marker = _merge(dict(DEFAULT_MARKER, name=f"Marker{index}" if index else 'BreachPoint'), marker, 'marker')
+        markers.append({
+            'name': str(marker['name']),
+            'location': _vector(marker['location'], 'marker.location', 3),
+            'radius': _number(marker['radius'], 'marker.radius', 0.01),
+            'color': _color(marker['color'], 'marker.color'),
+            'emission': _number(marker['emission'], 'marker.emission', 0.0),
+        })
+
+    if not isinstance(spec['lights'], list):
+        raise ValueError("lights must be a list")
+    lights = []
+    for index, light in enumerate(spec['lights']):
+        light = _merge(dict(DEFAULT_LIGHTS[-1], name=f"Light{index}"), light, 'light')
+        light_type = str(light['type']).upper()
+        if light_type not in LIGHT_TYPES:
+            raise ValueError(f"light.type must be one of {', '.join(LIGHT_TYPES)}, got {light['type']!r}")
+        lights.append({
+            'name': str(light['name']),
+            'type': light_type,
+            'location': _vector(light['location'], 'light.location', 3),
+            'rotation': _vector(light['rotation'], 'light.rotation', 3),
+            'energy': _number(light['energy'], 'light.energy', 0.0),
+            'shadow_soft_size': _number(light['shadow_soft_size'], 'light.shadow_soft_size', 0.0),
+        })
+
+    camera = _merge(DEFAULT_CAMERA, spec['camera'], 'camera')
+    camera = {
+        'location': _vector(camera['location'], 'camera.location', 3),
+        'rotation': _vector(camera['rotation'], 'camera.rotation', 3),
+    }
+
+    resolution = spec['resolution']
+    if not isinstance(resolution, (list, tuple)) or len(resolution) != 2:
+        raise ValueError(f"resolution must be [width, height], got {resolution!r}")
+    resolution = [int(_number(side, 'resolution', 16)) for side in resolution]
+    if max(resolution) > 7680:
+        raise ValueError(f"resolution must be at most 7680 pixels per side, got {resolution}")
+
+    engine = str(spec['engine']).upper()
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {', '.join(ENGINES)}, got {spec['engine']!r}")
+
+    return {
+        'room': room,
+        'markers': markers,
+        'lights': lights,
+        'camera': camera,
+        'resolution': resolution,
+        'engine': engine,
+        'light_boost': _number(spec['light_boost'], 'light_boost', 0.01),
+    }
+
+
+def canonical_json(spec):
+    """Normalized spec as compact, key-sorted JSON (the form that gets hashed)."""
+    return json.dumps(normalize_spec(spec), sort_keys=True, separators=(',', ':'))
+
+
+def spec_hash(spec, salt=''):
+    """
+    SHA-256 of the normalized spec. salt lets the caller fold in the renderer version
+    (e.g. a digest of reconstruct_scene.py) so cached renders expire when the scene code changes.
+    """
+    payload = f"v{SPEC_VERSION}|{salt}|{canonical_json(spec)}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def template_filename(room):
+    """Versioned file name of the prebuilt template .blend for a (normalized) room section."""
+    room_json = json.dumps(room, sort_keys=True, separators=(',', ':'))
+    digest = hashlib.sha256(room_json.encode('utf-8')).hexdigest()[:12]
+    return f"evidence_room_v{TEMPLATE_VERSION}_{digest}.blend"
+
+
+def load_spec(value):
+    """Read a spec from a JSON file path or a JSON string. Returns the normalized spec."""
+    if os.path.exists(value):
+        with open(value, 'r', encoding='utf-8') as f:
+            return normalize_spec(json.load(f))
+    try:
+        return normalize_spec(json.loads(value))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Scene spec is neither a file nor valid JSON: {e}")
+
+
+def spec_for_case(category='Domestic', light_boost=1.0, modus_operandi=None):
+    """
+    Scene spec for a case: the standard evidence room with the breach marker colored by
+    department, plus markers for the modus operandi. Cases with the same department and
+    M.O. share a spec, and so a cached render.
+    """
+    marker = dict(DEFAULT_MARKER, color=CATEGORY_MARKER_COLORS.get(category, DEFAULT_MARKER['color']))
+    extra = [dict(DEFAULT_MARKER, emission=0.3, **item) for item in MO_MARKERS.get(modus_operandi, [])]
+    return normalize_spec({'markers': [marker] + extra, 'light_boost': light_boost})
+
+
+def look_at_rotation(location, target):
+    """Blender camera Euler rotation (XYZ) that points a camera at location toward target."""
+    dx, dy, dz = (target[axis] - location[axis] for axis in range(3))
+    return [round(math.atan2(math.hypot(dx, dy), -dz), 6), 0.0, round(math.atan2(-dx, dy), 6)]
+
+
+def contact_sheet_cameras(spec, views=CONTACT_SHEET_VIEWS):
+    """
+    Camera placements for a contact sheet of a (normalized) spec, as {view: {'location', 'rotation'}}:
+    top (straight down over the whole room), corner (the spec's own camera) and closeup
+    (on the first evidence marker, from the corner camera's side). Raises ValueError on unknown views.
+    """
+    unknown = set(views) - set(CONTACT_SHEET_VIEWS)
+    if unknown:
+        raise ValueError(f"Unknown contact sheet views: {', '.join(sorted(unknown))}")
+    room = spec['room']
+    corner = spec['camera']
+    cameras = {}
+    for view in views:
+        if view == 'top':
+            # High enough for the default 50 mm lens (about 40 degrees) to frame the walls
+            cameras[view] = {'location': [0.0, 0.0, round(room['size'] * 1.5, 6)], 'rotation': [0.0, 0.0, 0.0]}
+        elif view == 'corner':
+            cameras[view] = {'location': list(corner['location']), 'rotation': list(corner['rotation'])}
+        else:
+            marker = spec['markers'][0] if spec['markers'] else DEFAULT_MARKER
+            target = marker['location']
+            offset = [corner['location'][axis] - target[axis] for axis in range(3)]
+            length = math.sqrt(sum(value * value for value in offset)) or 1.0
+            distance = max(marker['radius'] * 8.0, 3.0)
+            location = [round(target[axis] + offset[axis] / length * distance, 6) for axis in range(3)]
+            cameras[view] = {'location': location, 'rotation': look_at_rotation(location, target)}
+    return cameras
@@ -0,0 +1,156 @@
+"""
+Telemetry Ledger - Persistent latency and cost tracking for external API calls.
+Every Vision, Drive and News call is recorded in a local SQLite database
+(latency, payload bytes, result size, cache hit/miss, estimated cost) and
+aggregated into percentiles for the System Health panel.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Estimated list prices in USD per call (Vision bills per feature unit; Drive/News are quota-only)
+ESTIMATED_COST_PER_CALL = {
+    ('vision', 'annotate'): 0.0015 + 0.0015 + 0.00225,  # labels + image properties + object localization
+    ('vision', 'label_detection'): 0.0015,
+}
+
+# Starting budget shown by the GCP credit monitor
+GCP_CREDIT_BUDGET = 300.0
+
+# Window (seconds) the System Health panel summarizes, so it stays fast as the ledger grows
+SUMMARY_WINDOW_SECONDS = 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS api_calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    service TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    latency_ms REAL NOT NULL,
+    payload_bytes INTEGER NOT NULL DEFAULT 0,
+    result_bytes INTEGER NOT NULL DEFAULT 0,
+    cache_hit INTEGER,
+    cost_usd REAL NOT NULL DEFAULT 0,
+    ok INTEGER NOT NULL DEFAULT 1,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_api_calls_service ON api_calls (service, operation, ts);
+CREATE INDEX IF NOT EXISTS idx_api_calls_ts ON api_calls (ts);
+"""
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list (pct in 0-100)."""
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * (pct / 100.0)
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = rank - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+class TelemetryLedger:
+    """SQLite-backed ledger of external API calls."""
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection (safe across Streamlit threads), commit and close it."""
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, service, operation, latency_ms, payload_bytes=0, result_bytes=0,
+               cache_hit=None, cost_usd=None, ok=True, error=None):
+        """Append one call to the ledger. cost_usd defaults to the estimated list price."""
+        if cost_usd is None:
+            # Cache hits never reach the API, so they cost nothing
+            cost_usd = 0.0 if cache_hit else ESTIMATED_COST_PER_CALL.get((service, operation), 0.0)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO api_calls (ts, service, operation, latency_ms, payload_bytes, result_bytes, "
+                "cache_hit, cost_usd, ok, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), service, operation, float(latency_ms), int(payload_bytes or 0),
+                 int(result_bytes or 0), None if cache_hit is None else int(bool(cache_hit)),
+                 float(cost_usd), int(bool(ok)), error)
+            )
+
+    @contextmanager
+    def track(self, service, operation, payload_bytes=0):
+        """
+        Time a call and record it on exit.
+        Yields a dict the caller can fill with result_bytes, cache_hit, payload_bytes or cost_usd.
+        Exceptions are recorded as failed calls and re-raised.
+        """
+        call = {'payload_bytes': payload_bytes, 'result_bytes': 0, 'cache_hit': None, 'cost_usd': None}
+        start = time.perf_counter()
+        try:
+            yield call
+        except Exception as e:
+            self.record(service, operation, (time.perf_counter() - start) * 1000.0,
+                        call['payload_bytes'], call['result_bytes'], call['cache_hit'],
+                        call['cost_usd'], ok=False, error=str(e)[:500])
+            raise
+        self.record(service, operation, (time.perf_counter() - start) * 1000.0,
+                    call['payload_bytes'], call['result_bytes'], call['cache_hit'], call['cost_usd'])
+
+    def total_cost(self):
+        """Total estimated spend across the whole ledger."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT COALESCE(SUM(cost_usd), 0) FROM api_calls").fetchone()
+        return float(row[0])
+
+    def summarize(self, since=None):
+        """
+        Aggregate the ledger per service/operation (calls since the given timestamp, or all of them).
+        Counts, bytes, hit rate and cost are summed in SQL; only latencies are read for the percentiles.
+        Returns a list of dicts with call counts, latency percentiles (ms), bytes, hit rate and cost.
+        """
+        where, params = "", ()
+        if since is not None:
+            where, params = " WHERE ts >= ?", (since,)
+
+        with self._connect() as conn:
+            totals = conn.execute(
+                "SELECT service, operation, COUNT(*), SUM(1 - ok), SUM(payload_bytes), SUM(result_bytes), "
+                "SUM(cache_hit), COUNT(cache_hit), SUM(cost_usd) FROM api_calls" + where +
+                " GROUP BY service, operation ORDER BY service, operation", params
+            ).fetchall()
+            latencies = {}
+            for service, operation, latency_ms in conn.execute(
+                    "SELECT service, operation, latency_ms FROM api_calls" + where +
+                    " ORDER BY service, operation, latency_ms", params):
+                latencies.setdefault((service, operation), []).append(latency_ms)
+
+        summary = []
+        for service, operation, calls, errors, payload, result, hits, flagged, cost in totals:
+            values = latencies.get((service, operation), [])
+            summary.append({
+                'service': service,
+                'operation': operation,
+                'calls': calls,
+                'errors': errors or 0,
+                'p50_ms': round(percentile(values, 50), 1),
+                'p90_ms': round(percentile(values, 90), 1),
+                'p99_ms': round(percentile(values, 99), 1),
+                'payload_kb': round((payload or 0) / 1024.0, 1),
+                'result_kb': round((result or 0) / 1024.0, 1),
+                'cache_hit_rate': round(hits / float(flagged), 2) if flagged else None,
+                'cost_usd': round(cost or 0.0, 4),
+            })
+        return summary
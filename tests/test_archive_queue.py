@@ -0,0 +1,59 @@
+import time
+
+from archive_queue import ArchiveQueue
+from upload_engine import memory_artifact
+
+
+def artifacts():
+    return {'findings': memory_artifact('CASE-1_findings.txt', 'findings', 'text/plain')}
+
+
+def wait_for(queue, job_id, status, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get_job(job_id)
+        if job['status'] == status:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} is {queue.get_job(job_id)['status']}, expected {status}")
+
+
+def test_job_uploads_and_records_results(tmp_path):
+    def handler(job, pending):
+        return {key: {'id': f"drive-{key}"} for key in pending}, {}
+
+    queue = ArchiveQueue(tmp_path / 'queue.sqlite3', handler).start()
+    try:
+        job_id = queue.enqueue('CASE-1', artifacts())
+        job = wait_for(queue, job_id, 'done')
+        assert job['results'] == {'findings': {'id': 'drive-findings'}}
+    finally:
+        queue.stop()
+
+
+def test_recover_leaves_live_leases_alone(tmp_path):
+    db_path = tmp_path / 'queue.sqlite3'
+    first = ArchiveQueue(db_path, handler=None, lease_seconds=60)
+    second = ArchiveQueue(db_path, handler=None, lease_seconds=60)
+    job_id = first.enqueue('CASE-1', artifacts())
+    assert first._claim()['id'] == job_id
+
+    # Another process opening the same database must not take over a live upload
+    assert second.recover() == 0
+    assert second._claim() is None
+    assert first.get_job(job_id)['status'] == 'running'
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    db_path = tmp_path / 'queue.sqlite3'
+    dead = ArchiveQueue(db_path, handler=None, lease_seconds=0.05)
+    live = ArchiveQueue(db_path, handler=None, lease_seconds=60)
+    job_id = dead.enqueue('CASE-1', artifacts())
+    assert dead._claim()['id'] == job_id
+    time.sleep(0.1)
+
+    assert live.recover() == 1
+    assert live._claim()['id'] == job_id
+    # The old owner can no longer renew or finish the job
+    assert dead.renew_leases() == 0
+    assert live.renew_leases() == 1
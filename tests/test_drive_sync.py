@@ -0,0 +1,50 @@
+from case_artifacts import build_case_artifacts
+from drive_sync import SyncManifest, artifact_md5, md5_hex, plan_sync
+from upload_engine import file_artifact, memory_artifact
+
+
+def test_plan_sync_creates_updates_and_skips(tmp_path):
+    render_path = tmp_path / 'render.png'
+    render_path.write_bytes(b'render v2')
+    artifacts = {
+        'findings': memory_artifact('CASE-1_findings.txt', 'same findings', 'text/plain'),
+        'render': file_artifact('CASE-1_render.png', render_path, 'image/png'),
+        'pdf': memory_artifact('CASE-1_Case_File.pdf', b'%PDF new', 'application/pdf'),
+    }
+    remote = {
+        'CASE-1_findings.txt': {'id': 'f1', 'md5': md5_hex(b'same findings'), 'size': 13},
+        'CASE-1_render.png': {'id': 'r1', 'md5': md5_hex(b'render v1'), 'size': 9},
+    }
+
+    plan = plan_sync(artifacts, remote)
+
+    assert plan['findings'] == {'action': 'skip', 'md5': md5_hex(b'same findings'), 'file_id': 'f1'}
+    assert plan['render'] == {'action': 'update', 'md5': md5_hex(b'render v2'), 'file_id': 'r1'}
+    assert plan['pdf'] == {'action': 'create', 'md5': md5_hex(b'%PDF new'), 'file_id': None}
+
+
+def test_artifact_md5_is_the_same_for_memory_and_file(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_bytes(b'evidence')
+    assert artifact_md5(file_artifact('a', path, 'text/plain')) == artifact_md5(memory_artifact('a', 'evidence', 'text/plain'))
+
+
+def test_unchanged_case_artifacts_are_skipped_with_a_fixed_archive_time():
+    labels = [{'description': 'Knife', 'score': 0.9}]
+    first = build_case_artifacts('CASE-1', 'Headline', b'png', labels, archived_at='2026-01-01 00:00:00')
+    remote = {
+        artifact['title']: {'id': key, 'md5': artifact_md5(artifact), 'size': len(artifact['data'])}
+        for key, artifact in first.items()
+    }
+    again = build_case_artifacts('CASE-1', 'Headline', b'png', labels, archived_at='2026-01-01 00:00:00')
+    assert {key: entry['action'] for key, entry in plan_sync(again, remote).items()} == {
+        'render': 'skip', 'findings': 'skip', 'findings_json': 'skip'
+    }
+
+
+def test_manifest_records_uploads(tmp_path):
+    manifest = SyncManifest(tmp_path / 'state' / 'manifest.json')
+    assert manifest.load() == {}
+    manifest.record({'CASE-1_render.png': ('r1', 'abc')})
+    entry = manifest.load()['CASE-1_render.png']
+    assert (entry['id'], entry['md5']) == ('r1', 'abc')
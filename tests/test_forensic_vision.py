@@ -0,0 +1,112 @@
+import io
+import json
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from forensic_vision import (
+    DEFAULT_LONG_EDGE, PROFILE_FILENAME, encode_for_vision, get_optimized_payload, label_agreement,
+    load_target_long_edge, measure_optimization,
+)
+
+
+def render_bytes(size=(800, 600), seed=0):
+    rng = np.random.default_rng(seed)
+    pixels = (rng.random((size[1], size[0], 3)) * 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def render_path(tmp_path):
+    path = tmp_path / 'render.png'
+    path.write_bytes(render_bytes())
+    return path
+
+
+def labels(*names):
+    return [{'description': name, 'score': 0.9, 'mid': ''} for name in names]
+
+
+def test_encode_downscales_to_long_edge():
+    payload, info = encode_for_vision(render_bytes(), 320)
+    assert info['optimized_size'] == [320, 240]
+    assert info['original_size'] == [800, 600]
+    assert info['optimized_bytes'] == len(payload) < info['original_bytes']
+    with Image.open(io.BytesIO(payload)) as img:
+        assert img.size == (320, 240)
+
+
+def test_encode_never_upscales_or_grows():
+    buffer = io.BytesIO()
+    Image.new('RGB', (100, 80), (40, 40, 40)).save(buffer, format='PNG', optimize=True)
+    original = buffer.getvalue()
+    payload, info = encode_for_vision(original, 640)
+    assert info['optimized_size'] == [100, 80]
+    assert len(payload) <= len(original)
+    if info['format'] == 'ORIGINAL':
+        assert payload == original
+
+
+def test_payload_cache_is_keyed_by_content_and_size(render_path, tmp_path):
+    cache_dir = tmp_path / 'cache'
+    cache_dir.mkdir()
+    first, info = get_optimized_payload(render_path, cache_dir, long_edge=320)
+    assert info['cache_hit'] is False
+    again, info = get_optimized_payload(render_path, cache_dir, long_edge=320)
+    assert info['cache_hit'] is True
+    assert again == first
+
+    assert get_optimized_payload(render_path, cache_dir, long_edge=480)[1]['cache_hit'] is False
+
+    # A re-render with different pixels at the same path gets a fresh payload
+    render_path.write_bytes(render_bytes(seed=1))
+    fresh, info = get_optimized_payload(render_path, cache_dir, long_edge=320)
+    assert info['cache_hit'] is False
+    assert fresh != first
+
+
+def test_label_agreement():
+    assert label_agreement(labels('Room', 'Floor'), labels('floor', 'room')) == (1.0, [])
+    agreement, lost = label_agreement(labels('Room', 'Floor', 'Wall'), labels('Room', 'Floor', 'Ceiling'))
+    assert agreement == pytest.approx(0.5)
+    assert lost == ['wall']
+    assert label_agreement([], []) == (1.0, [])
+
+
+def test_measure_selects_smallest_passing_size(render_path, tmp_path):
+    def detect(content):
+        with Image.open(io.BytesIO(content)) as img:
+            width = img.size[0]
+        return labels('Room', 'Floor', 'Wall', 'Red') if width >= 480 else labels('Room', 'Floor')
+
+    report = measure_optimization(render_path, detect, tmp_path)
+    assert report['selected_long_edge'] == 480
+    assert report['downscale'] is True
+    assert [candidate['long_edge'] for candidate in report['candidates']] == [320, 480, 640]
+    assert report['candidates'][0]['lost_labels'] == ['red', 'wall']
+    assert load_target_long_edge(tmp_path) == 480
+
+
+def test_measure_without_passing_size_keeps_originals(render_path, tmp_path):
+    def detect(content):
+        with Image.open(io.BytesIO(content)) as img:
+            width = img.size[0]
+        return labels('Room', 'Floor', 'Wall', 'Red') if width == 800 else labels('Room')
+
+    report = measure_optimization(render_path, detect, tmp_path)
+    assert report['selected_long_edge'] is None
+    assert report['downscale'] is False
+    assert json.loads((tmp_path / PROFILE_FILENAME).read_text())['long_edge'] is None
+    assert load_target_long_edge(tmp_path) is None
+
+    payload, info = get_optimized_payload(render_path, tmp_path)
+    assert payload == render_path.read_bytes()
+    assert info['format'] == 'ORIGINAL'
+    assert info['optimized_size'] == [800, 600]
+
+
+def test_default_long_edge_without_profile(tmp_path):
+    assert load_target_long_edge(tmp_path) == DEFAULT_LONG_EDGE
@@ -0,0 +1,80 @@
+import numpy as np
+from PIL import Image, ImageDraw
+
+from render_dedup import DEFAULT_MAX_DISTANCE, RenderIndex, fingerprint, hamming_distance
+
+# find_match indexes the candidate first, so lookups name an attachment (as the app always does)
+# to match only earlier renders
+
+
+def room(path, sphere_at=(360, 300), tint=0):
+    img = Image.new('RGB', (400, 300), (90 + tint, 90 + tint, 100 + tint))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([100, 50, 300, 200], fill=(140, 140, 150))
+    draw.polygon([(0, 300), (400, 300), (300, 200), (100, 200)], fill=(60, 55, 50))
+    x, y = sphere_at
+    draw.ellipse([x - 30, y - 90, x + 30, y - 30], fill=(200, 20, 20))
+    img.save(path)
+    return path
+
+
+def checkerboard(path):
+    tiles = (np.indices((300, 400)) // 50).sum(axis=0) % 2
+    Image.fromarray((tiles * 255).astype(np.uint8)).convert('RGB').save(path)
+    return path
+
+
+def test_hamming_distance():
+    assert hamming_distance('0' * 16, '0' * 16) == 0
+    assert hamming_distance('0' * 16, 'f' * 16) == 64
+    assert hamming_distance('00000000000000ff', '000000000000000f') == 4
+
+
+def test_identical_render_matches_at_distance_zero(tmp_path):
+    index = RenderIndex(tmp_path)
+    render_print = index.add(room(tmp_path / 'a.png'))
+    index.attach(render_print['sha256'], 'findings', {'labels': []})
+    matched_print, matched_sha, distance = index.find_match(room(tmp_path / 'b.png'), require='findings')
+    assert matched_print['sha256'] == render_print['sha256']
+    assert (matched_sha, distance) == (render_print['sha256'], 0)
+
+
+def test_near_identical_render_matches_within_distance(tmp_path):
+    index = RenderIndex(tmp_path)
+    original = index.add(room(tmp_path / 'a.png'))
+    index.attach(original['sha256'], 'archive', {'render': {'id': 'drive-1'}})
+    # Slightly brighter re-render: different bytes, same scene
+    render_print, matched_sha, distance = index.find_match(room(tmp_path / 'b.png', tint=4), require='archive')
+    assert render_print['sha256'] != original['sha256']
+    assert matched_sha == original['sha256']
+    assert distance <= DEFAULT_MAX_DISTANCE
+
+
+def test_different_scene_does_not_match(tmp_path):
+    index = RenderIndex(tmp_path)
+    original = index.add(room(tmp_path / 'a.png'))
+    index.attach(original['sha256'], 'findings', {'labels': []})
+    _, matched_sha, distance = index.find_match(checkerboard(tmp_path / 'b.png'), require='findings')
+    assert matched_sha is None and distance is None
+    a, b = fingerprint(tmp_path / 'a.png'), fingerprint(tmp_path / 'b.png')
+    assert hamming_distance(a['phash'], b['phash']) > DEFAULT_MAX_DISTANCE
+
+
+def test_require_only_matches_renders_with_the_attachment(tmp_path):
+    index = RenderIndex(tmp_path)
+    original = index.add(room(tmp_path / 'a.png'))
+    candidate = room(tmp_path / 'b.png', tint=4)
+    assert index.find_match(candidate, require='findings')[1] is None
+
+    index.attach(original['sha256'], 'findings', {'labels': []})
+    assert index.find_match(candidate, require='findings')[1] == original['sha256']
+    assert index.get(original['sha256'])['findings'] == {'labels': []}
+
+
+def test_audit_trail(tmp_path):
+    index = RenderIndex(tmp_path)
+    render_print = index.add(room(tmp_path / 'a.png'))
+    index.audit('scan', render_print, None, None, 'new', DEFAULT_MAX_DISTANCE)
+    records = index.read_audit()
+    assert [record['decision'] for record in records] == ['new']
+    assert records[0]['render_sha256'] == render_print['sha256']
@@ -0,0 +1,156 @@
+import os
+import stat
+import sys
+import time
+
+import pytest
+
+from render_dispatch import RenderDispatcher, node_json
+from render_jobs import DONE, FAILED, RUNNING
+from render_node import RenderNodeServer
+
+# Speaks the persistent worker protocol (WORKER_READY, one JSON request per connection)
+# and writes the output image, like reconstruct_scene.py --serve
+FAKE_BLENDER = '''#!{python}
+import hashlib, json, socket, sys, time
+server = socket.socket()
+server.bind(('127.0.0.1', 0))
+server.listen(4)
+print(f"WORKER_READY port={{server.getsockname()[1]}}", flush=True)
+while True:
+    conn, _ = server.accept()
+    request = json.loads(conn.makefile().readline())
+    if request['cmd'] == 'shutdown':
+        conn.sendall(b'{{"ok": true}}\\n')
+        break
+    time.sleep({delay})
+    if {fail}:
+        conn.sendall(b'{{"ok": false, "error": "Python: Traceback (bad spec)"}}\\n')
+        conn.close()
+        continue
+    with open(request['output'], 'wb') as f:
+        f.write(b'\\x89PNG' + hashlib.sha256(json.dumps(request['spec'], sort_keys=True).encode()).digest())
+    conn.sendall((json.dumps({{'ok': True, 'output': request['output'], 'timings': {{'total': {delay}}}}}) + '\\n').encode())
+    conn.close()
+'''
+
+
+@pytest.fixture
+def fake_blender(tmp_path):
+    def make(delay=0.1, fail=False):
+        path = tmp_path / f"blender_{str(delay).replace('.', '_')}{'_fail' if fail else ''}"
+        path.write_text(FAKE_BLENDER.format(python=sys.executable, delay=delay, fail=fail))
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+        return str(path)
+    return make
+
+
+@pytest.fixture
+def start_node(tmp_path):
+    servers = []
+
+    def start(blender, name, **kwargs):
+        server = RenderNodeServer(blender, work_dir=str(tmp_path / name), slots=1, node_id=name, **kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        try:
+            server.stop()
+        except Exception:
+            pass
+
+
+def wait_for(condition, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="stub worker relies on a shebang")
+def test_job_completes_on_a_node(tmp_path, fake_blender, start_node):
+    node = start_node(fake_blender(), 'node-a')
+    dispatcher = RenderDispatcher(tmp_path / 'artifacts', [node.endpoint], heartbeat_seconds=0.1).start()
+    try:
+        job_id = dispatcher.submit({'light_boost': 1.0})
+        job = dispatcher.wait([job_id], timeout=20)[0]
+        assert job['status'] == DONE
+        assert job['attempts'] == 1
+        assert os.path.exists(job['artifacts']['render'])
+    finally:
+        dispatcher.stop()
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="stub worker relies on a shebang")
+def test_job_is_requeued_when_its_node_is_lost(tmp_path, fake_blender, start_node):
+    doomed = start_node(fake_blender(delay=1.5), 'node-a')
+    dispatcher = RenderDispatcher(tmp_path / 'artifacts', [doomed.endpoint], heartbeat_seconds=0.1).start()
+    try:
+        job_id = dispatcher.submit({'light_boost': 1.0})
+        assert wait_for(lambda: dispatcher.get(job_id)['status'] == RUNNING)
+        assert dispatcher.get(job_id)['node'] == doomed.endpoint
+
+        survivor = start_node(fake_blender(), 'node-b')
+        dispatcher.register(survivor.endpoint)
+        doomed.stop()
+
+        job = dispatcher.wait([job_id], timeout=30)[0]
+        assert job['status'] == DONE
+        assert job['node'] == survivor.endpoint
+        assert job['attempts'] == 2
+        assert [entry['node'] for entry in job['history']] == [doomed.endpoint]
+        assert job['history'][0]['reason'].startswith('node lost')
+    finally:
+        dispatcher.stop()
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="stub worker relies on a shebang")
+def test_render_error_on_a_node_is_not_retried(tmp_path, fake_blender, start_node):
+    nodes = [start_node(fake_blender(fail=True), name) for name in ('node-a', 'node-b')]
+    dispatcher = RenderDispatcher(tmp_path / 'artifacts', [node.endpoint for node in nodes],
+                                  heartbeat_seconds=0.1).start()
+    try:
+        job_id = dispatcher.submit({'light_boost': 1.0})
+        job = dispatcher.wait([job_id], timeout=20)[0]
+        assert job['status'] == FAILED
+        assert 'bad spec' in job['error']
+        assert job['attempts'] == 1
+        assert job['history'] == []
+        assert sum(node.state.jobs_failed for node in nodes) == 1
+    finally:
+        dispatcher.stop()
+
+
+def test_dispatch_loop_errors_are_recorded(tmp_path, monkeypatch):
+    dispatcher = RenderDispatcher(tmp_path / 'artifacts')
+
+    def broken_assign():
+        raise KeyError('job-1')
+
+    monkeypatch.setattr(dispatcher, '_assign', broken_assign)
+    dispatcher.start()
+    try:
+        assert wait_for(lambda: dispatcher.stats()['last_error'] is not None, timeout=5)
+        assert dispatcher.stats()['last_error']['error'] == "KeyError: 'job-1'"
+    finally:
+        dispatcher.stop()
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="stub worker relies on a shebang")
+def test_node_rejects_requests_without_the_token(tmp_path, fake_blender, start_node):
+    node = start_node(fake_blender(), 'node-a', token='s3cret')
+    assert node_json(f"{node.endpoint}/health")[0] == 401
+    assert node_json(f"{node.endpoint}/health", token='wrong')[0] == 401
+    status, health = node_json(f"{node.endpoint}/health", token='s3cret')
+    assert status == 200
+    assert health['node_id'] == 'node-a'
+
+
+def test_node_beyond_localhost_needs_a_token(fake_blender, monkeypatch):
+    monkeypatch.delenv('RENDER_NODE_TOKEN', raising=False)
+    with pytest.raises(ValueError):
+        RenderNodeServer(fake_blender(), host='0.0.0.0')
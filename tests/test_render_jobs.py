@@ -0,0 +1,52 @@
+import threading
+import time
+
+from render_jobs import DONE, RUNNING, RenderJobQueue
+
+
+def blocking_runner(release):
+    def runner(job, cancel_event):
+        release.wait(10)
+        return job['params'], None
+    return runner
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_remote_jobs_do_not_take_local_workers():
+    release = threading.Event()
+    queue = RenderJobQueue(blocking_runner(release), workers=1).start()
+    remote_ids = [queue.submit('session', {'n': n}, remote=True) for n in range(3)]
+    local_id = queue.submit('session', {'n': 'local'})
+    try:
+        # Every remote job and the local one run at once on a one-worker queue
+        assert wait_for(lambda: all(queue.get(job_id)['status'] == RUNNING for job_id in remote_ids + [local_id]))
+        usage = queue.utilization()
+        assert usage['running'] == 1
+        assert usage['remote'] == 3
+        assert usage['queued'] == 0
+    finally:
+        release.set()
+    assert wait_for(lambda: all(queue.get(job_id)['status'] == DONE for job_id in remote_ids + [local_id]))
+    assert queue.get(remote_ids[0])['result'] == {'n': 0}
+
+
+def test_cancel_queued_local_job():
+    release = threading.Event()
+    queue = RenderJobQueue(blocking_runner(release), workers=1).start()
+    first = queue.submit('session', {})
+    second = queue.submit('session', {})
+    try:
+        assert wait_for(lambda: queue.get(first)['status'] == RUNNING)
+        assert queue.get(second)['position'] == 1
+        assert queue.cancel(second)
+        assert queue.get(second)['status'] == 'cancelled'
+    finally:
+        release.set()
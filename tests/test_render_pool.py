@@ -0,0 +1,49 @@
+import pytest
+
+from render_pool import MAX_CONCURRENT_RENDERS, plan_render_pool
+
+
+def test_cpu_bound_host():
+    plan = plan_render_pool(cpus=8, memory_mb=64000)
+    assert plan['limited_by'] == 'cpu'
+    assert plan['workers'] == 4
+    assert plan['threads'] == 2
+
+
+def test_memory_bound_host():
+    plan = plan_render_pool(cpus=16, memory_mb=1024 + 768 * 3 + 100)
+    assert plan['limited_by'] == 'memory'
+    assert plan['workers'] == 3
+    assert plan['threads'] == 5
+
+
+def test_cap_bounds_large_hosts():
+    plan = plan_render_pool(cpus=64, memory_mb=256000)
+    assert plan['limited_by'] == 'cap'
+    assert plan['workers'] == MAX_CONCURRENT_RENDERS
+    assert plan_render_pool(cpus=64, memory_mb=256000, max_renders=2)['workers'] == 2
+
+
+@pytest.mark.parametrize('cpus, memory_mb, max_renders', [
+    (1, 512, 8),
+    (2, 0, 8),
+    (4, None, 0),
+])
+def test_at_least_one_worker(cpus, memory_mb, max_renders):
+    plan = plan_render_pool(cpus=cpus, memory_mb=memory_mb, max_renders=max_renders)
+    assert plan['workers'] == 1
+    assert plan['threads'] == cpus
+
+
+def test_unknown_memory_is_not_a_limit(monkeypatch):
+    monkeypatch.setattr('render_pool.available_memory_mb', lambda: None)
+    plan = plan_render_pool(cpus=8, memory_mb=None)
+    assert plan['memory_mb'] is None
+    assert plan['limited_by'] == 'cpu'
+
+
+@pytest.mark.parametrize('cpus', [1, 2, 3, 5, 8, 12, 31, 96])
+@pytest.mark.parametrize('memory_mb', [0, 1500, 4096, 32000])
+def test_never_oversubscribes_cores(cpus, memory_mb):
+    plan = plan_render_pool(cpus=cpus, memory_mb=memory_mb)
+    assert plan['workers'] * plan['threads'] <= cpus
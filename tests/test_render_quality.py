@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from render_quality import MIN_FILE_BYTES, assess_render, suggest_light_boost
+
+
+def flat_shaded_room(path):
+    """Workbench FLAT-style frame: walls, floor and a red evidence sphere in solid colours."""
+    img = Image.new('RGB', (800, 600), (90, 90, 100))
+    draw = ImageDraw.Draw(img)
+    draw.polygon([(0, 600), (800, 600), (600, 400), (200, 400)], fill=(60, 55, 50))
+    draw.rectangle([200, 100, 600, 400], fill=(120, 120, 130))
+    draw.polygon([(0, 0), (200, 100), (200, 400), (0, 600)], fill=(100, 100, 110))
+    draw.polygon([(800, 0), (600, 100), (600, 400), (800, 600)], fill=(110, 110, 120))
+    draw.ellipse([360, 300, 440, 380], fill=(200, 20, 20))
+    img.save(path)
+    return path
+
+
+def noise_frame(path, scale=1.0):
+    rng = np.random.default_rng(0)
+    pixels = (rng.random((300, 400, 3)) * 255 * scale).astype(np.uint8)
+    Image.fromarray(pixels).save(path)
+    return path
+
+
+def test_flat_shaded_render_passes(tmp_path):
+    report = assess_render(str(flat_shaded_room(tmp_path / 'flat.png')))
+    assert report['scan_ok']
+    assert 'near_uniform' not in report['issues']
+
+
+def test_uniform_frame_is_blocked(tmp_path):
+    path = tmp_path / 'grey.png'
+    # Sparse one-level noise keeps the PNG above MIN_FILE_BYTES so only the uniformity check fires
+    rng = np.random.default_rng(1)
+    pixels = (128 + (rng.random((300, 400, 3)) < 0.1)).astype(np.uint8)
+    Image.fromarray(pixels).save(path)
+    assert path.stat().st_size >= MIN_FILE_BYTES
+    report = assess_render(str(path))
+    assert 'near_uniform' in report['issues']
+    assert not report['scan_ok']
+
+
+def test_black_frame_is_blocked(tmp_path):
+    report = assess_render(str(noise_frame(tmp_path / 'black.png', scale=0.02)))
+    assert 'black_frame' in report['issues']
+    assert not report['scan_ok']
+
+
+def test_underexposed_frame_is_annotated_not_blocked(tmp_path):
+    report = assess_render(str(noise_frame(tmp_path / 'dark.png', scale=0.3)))
+    assert 'underexposed' in report['issues']
+    assert report['scan_ok']
+    assert report['light_boost'] > 1.0
+
+
+def test_tiny_and_missing_files(tmp_path):
+    tiny = tmp_path / 'tiny.png'
+    Image.new('RGB', (8, 8)).save(tiny)
+    assert 'tiny_file' in assess_render(str(tiny))['issues']
+    assert assess_render(str(tmp_path / 'missing.png'))['issues'] == ['missing_file']
+
+
+@pytest.mark.parametrize('mean, expected', [(0.5, 1.0), (0.2, 2.0), (0.0, 8.0)])
+def test_suggest_light_boost(mean, expected):
+    assert suggest_light_boost(mean) == expected
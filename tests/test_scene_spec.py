@@ -0,0 +1,76 @@
+import pytest
+
+from scene_spec import (
+    DEFAULT_SPEC, MO_MARKERS, contact_sheet_cameras, normalize_spec, spec_for_case, spec_hash,
+)
+
+
+def test_defaults_fill_an_empty_spec():
+    spec = normalize_spec()
+    assert spec == normalize_spec({})
+    assert spec['engine'] == DEFAULT_SPEC['engine']
+    assert spec['resolution'] == DEFAULT_SPEC['resolution']
+    assert [light['name'] for light in spec['lights']] == ['ForensicLight', 'CenterPointLight']
+
+
+def test_rgb_colors_are_padded_and_clamped():
+    spec = normalize_spec({'room': {'floor_color': [0.5, 1.5, -0.2]}})
+    assert spec['room']['floor_color'] == [0.5, 1.0, 0.0, 1.0]
+
+
+def test_floats_are_rounded():
+    spec = normalize_spec({'light_boost': 1.00000004, 'camera': {'location': [1, 2.0000001, 3]}})
+    assert spec['light_boost'] == 1.0
+    assert spec['camera']['location'] == [1.0, 2.0, 3.0]
+
+
+@pytest.mark.parametrize('spec', [
+    {'colour': 'red'},
+    {'room': {'height': 3}},
+    {'markers': [{'size': 1}]},
+    {'lights': [{'type': 'LASER'}]},
+    {'engine': 'POVRAY'},
+    {'resolution': [800]},
+    {'resolution': [800, 8000]},
+    {'room': {'size': 'big'}},
+    {'markers': [{'radius': 0.0}]},
+])
+def test_invalid_specs_raise(spec):
+    with pytest.raises(ValueError):
+        normalize_spec(spec)
+
+
+def test_hash_ignores_key_order_and_equivalent_values():
+    a = {'engine': 'cycles', 'light_boost': 1.5, 'room': {'size': 20, 'wall_color': [0.85, 0.85, 0.8]}}
+    b = {'room': {'wall_color': [0.85, 0.85, 0.8, 1.0], 'size': 20.0}, 'light_boost': 1.5000000001, 'engine': 'CYCLES'}
+    assert spec_hash(a) == spec_hash(b)
+    assert spec_hash(None) == spec_hash(DEFAULT_SPEC)
+
+
+def test_hash_changes_with_content_and_salt():
+    base = spec_hash({})
+    assert spec_hash({'light_boost': 1.5}) != base
+    assert spec_hash({}, salt='renderer-v2') != base
+    assert spec_hash({}, salt='renderer-v2') == spec_hash({}, salt='renderer-v2')
+
+
+def test_spec_for_case_is_stable():
+    assert spec_for_case('White Collar', 1.2, 'Fraud/Scam') == spec_for_case('White Collar', 1.2, 'Fraud/Scam')
+    assert spec_hash(spec_for_case('Domestic')) == spec_hash(spec_for_case('Domestic'))
+    assert spec_hash(spec_for_case('Domestic')) != spec_hash(spec_for_case('International'))
+
+
+def test_spec_for_case_adds_mo_markers():
+    spec = spec_for_case('Domestic', modus_operandi='Organized Crime')
+    names = [marker['name'] for marker in spec['markers']]
+    assert names == ['BreachPoint'] + [item['name'] for item in MO_MARKERS['Organized Crime']]
+
+
+def test_contact_sheet_cameras():
+    spec = normalize_spec()
+    cameras = contact_sheet_cameras(spec)
+    assert list(cameras) == ['top', 'corner', 'closeup']
+    assert cameras['corner']['location'] == spec['camera']['location']
+    assert cameras['top']['location'][2] > spec['room']['wall_height']
+    with pytest.raises(ValueError):
+        contact_sheet_cameras(spec, views=('side',))
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+from telemetry import ESTIMATED_COST_PER_CALL, TelemetryLedger, percentile
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return TelemetryLedger(tmp_path / 'ledger.sqlite3')
+
+
+def by_operation(summary):
+    return {(row['service'], row['operation']): row for row in summary}
+
+
+def test_record_defaults_cost_to_list_price(ledger):
+    ledger.record('vision', 'annotate', 120.0, payload_bytes=2048, result_bytes=1024, cache_hit=False)
+    ledger.record('vision', 'annotate', 0, cache_hit=True)
+    ledger.record('news', 'fetch', 80.0)
+    assert ledger.total_cost() == pytest.approx(ESTIMATED_COST_PER_CALL[('vision', 'annotate')])
+
+
+def test_explicit_cost_is_kept(ledger):
+    ledger.record('drive', 'upload', 10.0, cost_usd=0.25)
+    assert ledger.total_cost() == pytest.approx(0.25)
+
+
+def test_track_records_successes_and_failures(ledger):
+    with ledger.track('drive', 'upload', payload_bytes=4096) as call:
+        call['result_bytes'] = 512
+    with pytest.raises(RuntimeError):
+        with ledger.track('drive', 'upload'):
+            raise RuntimeError("quota exceeded")
+
+    row = by_operation(ledger.summarize())[('drive', 'upload')]
+    assert row['calls'] == 2
+    assert row['errors'] == 1
+    assert row['payload_kb'] == 4.0
+    assert row['result_kb'] == 0.5
+    assert row['cache_hit_rate'] is None
+
+
+def test_summarize_percentiles_and_hit_rate(ledger):
+    for latency in (10, 20, 30, 40, 50):
+        ledger.record('vision', 'annotate', latency, cache_hit=False)
+    ledger.record('vision', 'annotate', 0, cache_hit=True)
+    ledger.record('news', 'fetch', 200)
+
+    summary = ledger.summarize()
+    assert [(row['service'], row['operation']) for row in summary] == [('news', 'fetch'), ('vision', 'annotate')]
+    row = by_operation(summary)[('vision', 'annotate')]
+    assert row['calls'] == 6
+    assert row['p50_ms'] == 25.0
+    assert row['p99_ms'] == pytest.approx(49.5)
+    assert row['cache_hit_rate'] == round(1 / 6, 2)
+    assert row['cost_usd'] == round(5 * ESTIMATED_COST_PER_CALL[('vision', 'annotate')], 4)
+
+
+def test_summarize_since_excludes_older_calls(ledger):
+    ledger.record('news', 'fetch', 100)
+    cutoff = time.time()
+    time.sleep(0.01)
+    ledger.record('news', 'fetch', 300)
+
+    assert by_operation(ledger.summarize())[('news', 'fetch')]['calls'] == 2
+    row = by_operation(ledger.summarize(since=cutoff))[('news', 'fetch')]
+    assert row['calls'] == 1
+    assert row['p50_ms'] == 300.0
+    assert ledger.summarize(since=time.time() + 60) == []
+
+
+def test_percentile():
+    assert percentile([], 50) is None
+    assert percentile([7], 99) == 7
+    assert percentile([0, 10], 50) == 5
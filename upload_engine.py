@@ -0,0 +1,213 @@
+"""
+Upload Engine - Concurrent, resumable Drive uploads for case archiving.
+All artifacts of a case are pushed through a bounded thread pool. Large files use
+resumable chunked uploads where each chunk is retried with exponential backoff,
+so a transient failure only repeats one chunk instead of the whole archive.
+
+Artifacts are plain dicts (title, mimetype, properties) carrying either in-memory
+'data' bytes or a file 'path'; build them with memory_artifact() / file_artifact().
+"""
+
+import io
+import os
+import random
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import httplib2
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
+
+from drive_client import with_folder
+
+# Concurrent uploads per archive operation
+DEFAULT_MAX_WORKERS = 4
+
+# Files at or above this size use resumable chunked uploads
+RESUMABLE_THRESHOLD = 1024 * 1024
+
+# Chunk size for resumable uploads (Drive requires a multiple of 256 KB)
+CHUNK_SIZE = 4 * 256 * 1024
+
+# Per-chunk retry policy
+MAX_CHUNK_RETRIES = 5
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 16.0
+
+RETRIABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def is_retriable(error):
+    """
+    True for transient errors worth retrying (rate limits, 5xx, dropped connections).
+    ResumableUploadError subclasses HttpError, so chunk failures are judged by their status too.
+    """
+    if isinstance(error, HttpError):
+        return getattr(error.resp, 'status', None) in RETRIABLE_STATUS_CODES
+    return isinstance(error, (socket.error, ConnectionError, TimeoutError, httplib2.HttpLib2Error))
+
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter for the given retry attempt (0-based)."""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+
+def memory_artifact(title, data, mimetype, properties=None):
+    """Artifact uploaded straight from memory (str is encoded as UTF-8)."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return {'title': title, 'data': bytes(data), 'mimetype': mimetype, 'properties': properties or {}}
+
+
+def file_artifact(title, path, mimetype, properties=None):
+    """Artifact streamed from a file on disk."""
+    return {'title': title, 'path': str(path), 'mimetype': mimetype, 'properties': properties or {}}
+
+
+def artifact_size(artifact):
+    """Size in bytes of an artifact's content."""
+    if artifact.get('data') is not None:
+        return len(artifact['data'])
+    return os.path.getsize(artifact['path'])
+
+
+def build_media(artifact, chunk_size=CHUNK_SIZE, resumable_threshold=RESUMABLE_THRESHOLD):
+    """
+    Media upload object for an artifact: in-memory buffers and files share the same
+    resumable/chunking policy. Returns (media, resumable).
+    """
+    resumable = artifact_size(artifact) >= resumable_threshold
+    mimetype = artifact.get('mimetype', 'application/octet-stream')
+    chunksize = chunk_size if resumable else -1
+    if artifact.get('data') is not None:
+        media = MediaIoBaseUpload(io.BytesIO(artifact['data']), mimetype=mimetype,
+                                  chunksize=chunksize, resumable=resumable)
+    else:
+        media = MediaFileUpload(str(artifact['path']), mimetype=mimetype,
+                                chunksize=chunksize, resumable=resumable)
+    return media, resumable
+
+
+def drive_link(file_id):
+    """Browser link for a Drive file."""
+    return f"https://drive.google.com/file/d/{file_id}/view"
+
+
+def build_file_body(title, folder_id, properties=None):
+    """Drive v2 file metadata for an archived artifact."""
+    return {
+        'title': title,
+        'parents': [{'id': folder_id}],
+        'properties': [
+            {'key': key, 'value': value, 'visibility': 'PUBLIC'}
+            for key, value in (properties or {}).items()
+        ]
+    }
+
+
+def run_resumable(session, request):
+    """
+    Drive a resumable upload to completion chunk by chunk.
+    Each failed chunk is retried with backoff; the upload session resumes from the
+    last byte Drive acknowledged. Returns (response, chunk_retries).
+    """
+    response = None
+    retries = 0
+    attempt = 0
+    while response is None:
+        try:
+            session.ensure_fresh()
+            _, response = request.next_chunk(http=session.http())
+            attempt = 0
+        except Exception as e:
+            if not is_retriable(e) or attempt >= MAX_CHUNK_RETRIES:
+                raise
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+            retries += 1
+    return response, retries
+
+
+def upload_one(session, folder_id, artifact, chunk_size=CHUNK_SIZE, resumable_threshold=RESUMABLE_THRESHOLD):
+    """
+    Upload a single artifact into folder_id.
+    An artifact carrying a 'file_id' replaces that file's content (files.update)
+    instead of creating a new file.
+    Returns dict with id, link, bytes, seconds, resumable and chunk_retries.
+    """
+    size = artifact_size(artifact)
+    media, resumable = build_media(artifact, chunk_size, resumable_threshold)
+    body = build_file_body(artifact['title'], folder_id, artifact.get('properties'))
+    if artifact.get('file_id'):
+        request = session.service.files().update(
+            fileId=artifact['file_id'],
+            body=body,
+            media_body=media,
+            fields='id'
+        )
+    else:
+        request = session.service.files().insert(body=body, media_body=media, fields='id')
+
+    start = time.perf_counter()
+    if resumable:
+        uploaded, retries = run_resumable(session, request)
+    else:
+        uploaded, retries = session.execute(request, num_retries=MAX_CHUNK_RETRIES), 0
+    return {
+        'id': uploaded['id'],
+        'link': drive_link(uploaded['id']),
+        'bytes': size,
+        'seconds': time.perf_counter() - start,
+        'resumable': resumable,
+        'chunk_retries': retries,
+    }
+
+
+def upload_artifacts(session, folder_name, folder_cache, artifacts, max_workers=DEFAULT_MAX_WORKERS,
+                     telemetry=None, chunk_size=CHUNK_SIZE, resumable_threshold=RESUMABLE_THRESHOLD,
+                     progress=None):
+    """
+    Upload all artifacts of a case concurrently through a bounded thread pool.
+    artifacts maps a result key (e.g. 'render', 'findings') to an artifact dict.
+    Each upload resolves the folder through the cache and re-resolves it on 404.
+    progress(key, result, error) is called as each upload finishes.
+
+    Returns a report dict: per-key results, per-key errors, total bytes, wall time
+    and aggregate throughput (MB/s).
+    """
+    def run_task(artifact):
+        def upload(folder_id):
+            return upload_one(session, folder_id, artifact, chunk_size, resumable_threshold)
+        if telemetry is None:
+            return with_folder(session, folder_name, folder_cache, upload)
+        with telemetry.track('drive', 'upload', payload_bytes=artifact_size(artifact)) as call:
+            result = with_folder(session, folder_name, folder_cache, upload)
+            call['result_bytes'] = len(result['id'])
+        return result
+
+    results = {}
+    errors = {}
+    start = time.perf_counter()
+    workers = max(1, min(max_workers, len(artifacts)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='drive-upload') as pool:
+        futures = {pool.submit(run_task, artifact): key for key, artifact in artifacts.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                errors[key] = str(e)
+            if progress is not None:
+                progress(key, results.get(key), errors.get(key))
+    elapsed = time.perf_counter() - start
+
+    total_bytes = sum(result['bytes'] for result in results.values())
+    return {
+        'results': results,
+        'errors': errors,
+        'bytes': total_bytes,
+        'seconds': round(elapsed, 3),
+        'throughput_mbps': round(total_bytes / (1024.0 * 1024.0) / elapsed, 3) if elapsed > 0 else None,
+        'chunk_retries': sum(result['chunk_retries'] for result in results.values()),
+    }